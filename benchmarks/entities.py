@@ -0,0 +1,192 @@
+"""Microbenchmark of entity state and attribute evaluation for every entity description.
+
+Each farm size is served by the fake Tdarr server and set up in a minimal Home Assistant instance, so the
+coordinator data is a realistic snapshot of a farm of that size. The state, attributes and availability of every
+entity are then evaluated repeatedly without writing to the state machine, timing each entity description and
+counting the memory allocated by evaluating every entity once, as happens when all data changes in a refresh.
+
+Save a baseline, then compare later runs against it. The benchmark fails if any description or farm size is slower
+than the baseline by more than the threshold:
+
+    python -m benchmarks.entities --save baseline.json
+    python -m benchmarks.entities --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.tdarr import TdarrEntity
+from custom_components.tdarr.const import DOMAIN
+
+from .fake_server import FakeFarmConfig, FakeTdarrServer
+from .ha import async_create_hass, async_setup_entry
+
+FARM_SIZES: Dict[str, FakeFarmConfig] = {
+    "1-node": FakeFarmConfig(nodes=1, workers_per_node=5, libraries=5, queue_length=100),
+    "10-node": FakeFarmConfig(nodes=10, workers_per_node=5, libraries=20, queue_length=1000),
+    "50-node": FakeFarmConfig(nodes=50, workers_per_node=5, libraries=100, queue_length=1000),
+    "100-node": FakeFarmConfig(nodes=100, workers_per_node=5, libraries=200, queue_length=1000),
+}
+
+# Differences smaller than this are treated as timing noise rather than a regression
+NOISE_FLOOR_US = 5
+
+
+@dataclass
+class EntityGroupResult:
+    """Timing of all entities sharing an entity description"""
+
+    entities: int
+    total_us: float # Time to evaluate every entity in the group once
+
+    @property
+    def us_per_entity(self) -> float:
+        return self.total_us / self.entities
+
+
+@dataclass
+class EntityBenchmarkResult:
+    """Measurements for a single farm size"""
+
+    size: str
+    farm: Dict[str, Any]
+    entities: int = 0
+    total_us: float = 0 # Time to evaluate every entity once
+    allocations: int = 0 # Memory blocks allocated for the states and attributes of every entity
+    allocated_kb: float = 0
+    groups: Dict[str, EntityGroupResult] = field(default_factory=dict)
+
+
+def evaluate(entities: List[TdarrEntity]) -> List[tuple]:
+    # Everything written to the state machine by a state write
+    return [entity._get_state_fingerprint() for entity in entities]
+
+
+def time_entities(entities: List[TdarrEntity], iterations: int, repeat: int) -> float:
+    """Get the best time in microseconds to evaluate the entities once, taken from several repeats."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            evaluate(entities)
+        elapsed = (time.perf_counter_ns() - started) / iterations / 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def async_benchmark_size(size: str, farm: FakeFarmConfig, iterations: int, repeat: int, options: Dict[str, Any]) -> EntityBenchmarkResult:
+    result = EntityBenchmarkResult(size, asdict(farm))
+    async with FakeTdarrServer(farm) as server, async_create_hass() as hass:
+        entry, _ = await async_setup_entry(hass, server, options)
+
+        groups: Dict[str, List[TdarrEntity]] = defaultdict(list)
+        for platform in async_get_platforms(hass, DOMAIN):
+            for entity in platform.entities.values():
+                groups[f"{platform.domain}.{entity.entity_description.key}"].append(entity)
+        all_entities = [entity for entities in groups.values() for entity in entities]
+        result.entities = len(all_entities)
+
+        for group, entities in sorted(groups.items()):
+            result.groups[group] = EntityGroupResult(len(entities), time_entities(entities, iterations, repeat))
+        result.total_us = time_entities(all_entities, iterations, repeat)
+
+        # The evaluated states are kept, as they would be by the state machine, so that they are counted
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            states = evaluate(all_entities)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        differences = after.compare_to(before, "filename")
+        result.allocations = sum(difference.count_diff for difference in differences)
+        result.allocated_kb = sum(difference.size_diff for difference in differences) / 1024
+        del states
+
+        await hass.config_entries.async_unload(entry.entry_id)
+    return result
+
+
+def print_result(result: EntityBenchmarkResult) -> None:
+    print(f"{result.size}: {result.entities} entities, {result.total_us / 1000:.3f} ms, {result.allocations} allocations ({result.allocated_kb:.0f} KB) per refresh")
+    rows = [["description", "entities", "us/entity", "us total"]] + [
+        [group, str(group_result.entities), f"{group_result.us_per_entity:.2f}", f"{group_result.total_us:.1f}"]
+        for group, group_result in sorted(result.groups.items(), key=lambda item: -item[1].total_us)
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  " + "  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row)))
+    print()
+
+
+def find_regressions(results: List[EntityBenchmarkResult], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Compare results against a baseline saved by a previous run, returning a description of each regression."""
+    regressions = []
+
+    def check(name: str, current: float, previous: float | None) -> None:
+        if previous is None:
+            return
+        if current > previous * (1 + threshold) and current - previous > NOISE_FLOOR_US:
+            regressions.append(f"{name}: {current:.1f} us, baseline {previous:.1f} us (+{(current / previous - 1) * 100:.0f}%)")
+
+    for result in results:
+        size_baseline = baseline.get(result.size)
+        if not size_baseline:
+            continue
+        check(f"{result.size} total", result.total_us, size_baseline.get("total_us"))
+        for group, group_result in result.groups.items():
+            check(f"{result.size} {group}", group_result.total_us, size_baseline.get("groups", {}).get(group, {}).get("total_us"))
+    return regressions
+
+
+async def async_main(args: argparse.Namespace) -> List[EntityBenchmarkResult]:
+    options = { "full_attributes": args.full_attributes, "worker_sensors": args.worker_sensors }
+    return [
+        await async_benchmark_size(size, FARM_SIZES[size], args.iterations, args.repeat, options)
+        for size in args.sizes.split(",")
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(FARM_SIZES), help=f"Comma separated farm sizes from {', '.join(FARM_SIZES)}")
+    parser.add_argument("--iterations", type=int, default=20, help="Number of times all entities are evaluated per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repeats, of which the fastest is used")
+    parser.add_argument("--full-attributes", action="store_true", help="Enable full attributes on all entities")
+    parser.add_argument("--worker-sensors", action="store_true", help="Enable sensors for each running worker")
+    parser.add_argument("--save", help="Write the results to a JSON file to use as a baseline")
+    parser.add_argument("--baseline", help="Compare the results against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown against the baseline, e.g. 0.25 for 25%%")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = asyncio.run(async_main(args))
+    for result in results:
+        print_result(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({ result.size: asdict(result) for result in results }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"Regressions of more than {args.threshold * 100:.0f}% against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions of more than {args.threshold * 100:.0f}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""A stand-in Tdarr server for benchmarking and developing the integration without a real farm.
+
+Serves the subset of the Tdarr API used by the integration from generated data. The size of the farm and the
+latency of responses are configurable. A minimal Engine.IO v4 websocket endpoint stands in for the Socket.IO
+channel used for push updates. Run directly to serve a farm until interrupted:
+
+    python -m benchmarks.fake_server --nodes 10 --workers 4 --libraries 20 --port 8266
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+WORKER_TYPES = ["transcodecpu", "transcodegpu", "healthcheckcpu", "healthcheckgpu"]
+CODECS = ["hevc", "h264", "av1", "mpeg4"]
+CONTAINERS = ["mkv", "mp4", "avi"]
+RESOLUTIONS = ["480p", "720p", "1080p", "4KUHD"]
+
+# Status table IDs used by client/status-tables, with the share of the queue length in each
+STATUS_TABLES = {
+    "table1": 1, # Transcode queue
+    "table2": 0.5, # Transcode success
+    "table3": 0.01, # Transcode error
+    "table4": 0.2, # Health check queue
+    "table5": 0.5, # Health check success
+    "table6": 0.01, # Health check error
+}
+
+
+@dataclass
+class FakeFarmConfig:
+    """Size and behaviour of the farm served by FakeTdarrServer"""
+
+    nodes: int = 3
+    workers_per_node: int = 4
+    libraries: int = 5
+    queue_length: int = 1000
+    latency: float = 0 # Seconds added to every response
+    latency_jitter: float = 0 # Maximum additional random seconds added to every response
+    seed: int = 0
+
+
+class FakeTdarrServer(object):
+    """aiohttp server imitating the Tdarr API.
+
+    Requests are counted per endpoint in `requests`. Worker progress advances each time node data is requested, so
+    that consecutive refreshes see changed data as they would on a busy farm. Endpoints added to `failures` respond
+    with the given status instead, to simulate a failing server.
+
+    Socket.IO clients connected to the push endpoint are sent a ping every `ping_interval` seconds, and the pongs
+    received are counted in `pongs`. Events are only sent when requested with `async_emit`, as the events sent by a
+    real Tdarr server are not known.
+    """
+
+    def __init__(self, config: FakeFarmConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeFarmConfig()
+        self.host = host
+        self.port = port
+        self.requests: Counter[str] = Counter()
+        self.failures: Dict[str, int] = {} # Status to respond with, keyed by endpoint
+        self._random = random.Random(self.config.seed)
+        self._runner: web.AppRunner | None = None
+        self._statistics: Dict[str, dict] = {}
+        self._sockets: Dict[str, web.WebSocketResponse] = {} # Connected Socket.IO clients, keyed by session ID
+        self.ping_interval: float = 25
+        self.pongs = 0
+
+        self.nodes = self._generate_nodes()
+        self.libraries = [
+            { "_id": f"library{i}", "name": f"Library {i}", "folder": f"/media/library{i}" }
+            for i in range(self.config.libraries)
+        ]
+        self.global_settings = { "_id": "globalsettings", "pauseAllNodes": False, "ignoreSchedules": False }
+        self.tables: Dict[str, List[dict]] = {
+            "staged": self._generate_files("staged", self.config.queue_length // 10),
+            **{
+                table: self._generate_files(table, int(self.config.queue_length * share))
+                for table, share in STATUS_TABLES.items()
+            },
+        }
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v2/"
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/v2/status", self._handle_status)
+        app.router.add_get("/api/v2/get-nodes", self._handle_get_nodes)
+        app.router.add_post("/api/v2/cruddb", self._handle_cruddb)
+        app.router.add_post("/api/v2/stats/get-pies", self._handle_get_pies)
+        app.router.add_post("/api/v2/client/staged", self._handle_staged)
+        app.router.add_post("/api/v2/client/status-tables", self._handle_status_tables)
+        app.router.add_post("/api/v2/update-node", self._handle_update_node)
+        app.router.add_post("/api/v2/alter-worker-limit", self._handle_alter_worker_limit)
+        app.router.add_post("/api/v2/scan-files", self._handle_scan_files)
+        app.router.add_post("/api/v2/cancel-worker-item", self._handle_cancel_worker_item)
+        app.router.add_get("/socket.io/", self._handle_socket)
+        return app
+
+    async def async_start(self) -> None:
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Find the port assigned by the OS if none was requested
+        self.port = self._runner.addresses[0][1]
+
+    async def async_stop(self) -> None:
+        await self.async_close_sockets()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeTdarrServer":
+        await self.async_start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.async_stop()
+
+    def _generate_nodes(self) -> Dict[str, dict]:
+        nodes = {}
+        for i in range(self.config.nodes):
+            node_id = f"node{i}id"
+            workers = {}
+            for j in range(self.config.workers_per_node):
+                worker_type = WORKER_TYPES[j % len(WORKER_TYPES)]
+                worker_id = f"{node_id}-worker{j}"
+                workers[worker_id] = self._generate_worker(worker_id, worker_type)
+            nodes[node_id] = {
+                "_id": node_id,
+                "nodeName": f"Node {i}",
+                "remoteAddress": f"192.168.1.{i % 250 + 1}",
+                "nodePaused": False,
+                "workerLimits": { worker_type: 1 for worker_type in WORKER_TYPES },
+                "resStats": {
+                    "os": {
+                        "cpuPerc": "0",
+                        "memUsedGB": "4.0",
+                        "memTotalGB": "16.0",
+                    },
+                },
+                "workers": workers,
+            }
+        return nodes
+
+    def _generate_worker(self, worker_id: str, worker_type: str) -> dict:
+        return {
+            "_id": worker_id,
+            "workerType": worker_type,
+            "idle": False,
+            "file": f"/media/library0/{worker_id}.mkv",
+            "percentage": self._random.uniform(0, 100),
+            "fps": self._random.uniform(10, 200),
+            "ETA": "0:10:00",
+            "status": "Processing",
+        }
+
+    def _generate_files(self, table: str, count: int) -> List[dict]:
+        return [
+            {
+                "_id": f"/media/library{i % max(self.config.libraries, 1)}/{table}-{i}.mkv",
+                "file": f"/media/library{i % max(self.config.libraries, 1)}/{table}-{i}.mkv",
+                "DB": f"library{i % max(self.config.libraries, 1)}",
+                "file_size": self._random.randint(100, 50000),
+                "video_codec_name": self._random.choice(CODECS),
+                "container": self._random.choice(CONTAINERS),
+            }
+            for i in range(count)
+        ]
+
+    def _advance(self) -> None:
+        """Advance worker progress and resource usage, as between two requests to a real server."""
+        for node in self.nodes.values():
+            node["resStats"]["os"]["cpuPerc"] = f"{self._random.uniform(0, 100):.1f}"
+            for worker in node["workers"].values():
+                worker["percentage"] = (worker["percentage"] + self._random.uniform(0, 5)) % 100
+                worker["fps"] = self._random.uniform(10, 200)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        endpoint = request.path.removeprefix("/api/v2/").strip("/")
+        self.requests[endpoint] += 1
+        delay = self.config.latency + self._random.uniform(0, self.config.latency_jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if endpoint in self.failures:
+            return web.Response(status=self.failures[endpoint], text="Simulated failure")
+        return await handler(request)
+
+    @staticmethod
+    async def _get_data(request: web.Request) -> Dict[str, Any]:
+        return (await request.json()).get("data", {})
+
+    def _get_node(self, node_id: str) -> dict:
+        if node_id not in self.nodes:
+            raise web.HTTPBadRequest(text=f"Node {node_id} not found")
+        return self.nodes[node_id]
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "good",
+            "isProduction": True,
+            "os": "linux",
+            "version": "2.0.0",
+            "uptime": 1000,
+        })
+
+    async def _handle_get_nodes(self, request: web.Request) -> web.Response:
+        self._advance()
+        return web.json_response(self.nodes)
+
+    async def _handle_cruddb(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        collection = data.get("collection")
+        mode = data.get("mode")
+        if collection == "StatisticsJSONDB" and mode == "getById":
+            return web.json_response(self._get_statistics(""))
+        if collection == "LibrarySettingsJSONDB" and mode == "getAll":
+            return web.json_response(self.libraries)
+        if collection == "SettingsGlobalJSONDB" and mode == "getById":
+            return web.json_response(self.global_settings)
+        if collection == "SettingsGlobalJSONDB" and mode == "update":
+            self.global_settings.update(data.get("obj", {}))
+            return web.Response(text="OK")
+        raise web.HTTPBadRequest(text=f"Unsupported {mode} request to {collection}")
+
+    def _get_statistics(self, library_id: str) -> dict:
+        # Cached so that the time taken to generate statistics is not included in benchmarks of large farms
+        if library_id not in self._statistics:
+            self._statistics[library_id] = self._generate_statistics(library_id)
+        return self._statistics[library_id]
+
+    def _generate_statistics(self, library_id: str) -> dict:
+        files = [
+            item for table in self.tables.values() for item in table
+            if not library_id or item["DB"] == library_id
+        ]
+        return {
+            "totalFiles": len(files),
+            "totalFileCount": len(files),
+            "totalTranscodeCount": len(self.tables["table2"]),
+            "totalHealthCheckCount": len(self.tables["table5"]),
+            **{ f"{table}Count": len(self.tables[table]) for table in STATUS_TABLES },
+            "sizeDiff": sum(item["file_size"] for item in files) / 10000,
+            "status": {
+                "transcode": [{ "name": "Transcode success", "value": len(self.tables["table2"]) }],
+                "healthcheck": [{ "name": "Success", "value": len(self.tables["table5"]) }],
+            },
+            "video": {
+                "codecs": self._count_values(files, "video_codec_name"),
+                "containers": self._count_values(files, "container"),
+                "resolutions": [{ "name": resolution, "value": len(files) // len(RESOLUTIONS) } for resolution in RESOLUTIONS],
+            },
+        }
+
+    @staticmethod
+    def _count_values(items: List[dict], key: str) -> List[dict]:
+        return [{ "name": name, "value": count } for name, count in Counter(item[key] for item in items).items()]
+
+    async def _handle_get_pies(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        return web.json_response({ "pieStats": self._get_statistics(data.get("libraryId", "")) })
+
+    def _get_page(self, table: str, data: Dict[str, Any]) -> web.Response:
+        start = data.get("start", 0)
+        items = self.tables[table]
+        for sort in reversed(data.get("sorts", [])):
+            items = sorted(items, key=lambda item: item.get(sort["id"], ""), reverse=sort.get("desc", False))
+        for item_filter in data.get("filters", []):
+            items = [item for item in items if str(item_filter["value"]) in str(item.get(item_filter["id"], ""))]
+        return web.json_response({
+            "array": items[start:start + data.get("pageSize", len(items))],
+            "totalCount": len(items),
+        })
+
+    async def _handle_staged(self, request: web.Request) -> web.Response:
+        return self._get_page("staged", await self._get_data(request))
+
+    async def _handle_status_tables(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        table = data.get("opts", {}).get("table")
+        if table not in self.tables:
+            raise web.HTTPBadRequest(text=f"Unknown table {table}")
+        return self._get_page(table, data)
+
+    async def _handle_update_node(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        self._get_node(data.get("nodeID")).update(data.get("nodeUpdates", {}))
+        return web.Response(text="OK")
+
+    async def _handle_alter_worker_limit(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        limits = self._get_node(data.get("nodeID"))["workerLimits"]
+        worker_type = data.get("workerType")
+        if worker_type not in limits:
+            raise web.HTTPBadRequest(text=f"Unknown worker type {worker_type}")
+        limits[worker_type] = max(0, limits[worker_type] + (1 if data.get("process") == "increase" else -1))
+        return web.Response(text="OK")
+
+    async def _handle_scan_files(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        library_id = data.get("scanConfig", {}).get("dbID")
+        if library_id not in (library["_id"] for library in self.libraries):
+            raise web.HTTPBadRequest(text=f"Unknown library {library_id}")
+        self.tables["staged"].extend(self._generate_files("scanned", 10))
+        self._statistics.clear()
+        return web.Response(text="OK")
+
+    async def _handle_cancel_worker_item(self, request: web.Request) -> web.Response:
+        data = await self._get_data(request)
+        workers = self._get_node(data.get("nodeID"))["workers"]
+        if workers.pop(data.get("workerID"), None) is None:
+            raise web.HTTPBadRequest(text=f"Worker {data.get('workerID')} not found")
+        return web.Response(text="OK")
+
+    @property
+    def socket_count(self) -> int:
+        """Number of Socket.IO clients currently connected to the push endpoint."""
+        return len(self._sockets)
+
+    async def async_emit(self, event: str, payload: Any) -> None:
+        """Send a Socket.IO event to all connected clients."""
+        packet = "42" + json.dumps([event, payload])
+        for ws in list(self._sockets.values()):
+            await ws.send_str(packet)
+
+    async def async_close_sockets(self) -> None:
+        """Close all push connections, as happens when a real server restarts."""
+        for ws in list(self._sockets.values()):
+            await ws.close()
+
+    async def _handle_socket(self, request: web.Request) -> web.StreamResponse:
+        """Engine.IO v4 over a websocket, with only the packets needed to connect and send events to a client."""
+        if request.query.get("EIO") != "4" or request.query.get("transport") != "websocket":
+            raise web.HTTPBadRequest(text="Only Engine.IO v4 websocket connections are supported")
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        sid = f"sid{self._random.getrandbits(32):08x}"
+        # Engine.IO open packet, with intervals in milliseconds
+        await ws.send_str("0" + json.dumps({
+            "sid": sid,
+            "upgrades": [],
+            "pingInterval": int(self.ping_interval * 1000),
+            "pingTimeout": 20000,
+            "maxPayload": 1000000,
+        }))
+        ping_task = asyncio.create_task(self._async_ping(ws))
+        try:
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                if msg.data == "3":
+                    self.pongs += 1
+                elif msg.data == "40":
+                    # Socket.IO connection to the default namespace
+                    self._sockets[sid] = ws
+                    await ws.send_str("40" + json.dumps({ "sid": sid }))
+                elif msg.data == "41":
+                    break
+        finally:
+            self._sockets.pop(sid, None)
+            ping_task.cancel()
+        return ws
+
+    async def _async_ping(self, ws: web.WebSocketResponse) -> None:
+        try:
+            while not ws.closed:
+                await asyncio.sleep(self.ping_interval)
+                await ws.send_str("2")
+        except ConnectionResetError:
+            pass
+
+
+async def async_serve(server: FakeTdarrServer) -> None:
+    async with server:
+        print(f"Serving fake Tdarr farm at {server.base_url}")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8266)
+    parser.add_argument("--nodes", type=int, default=FakeFarmConfig.nodes)
+    parser.add_argument("--workers", type=int, default=FakeFarmConfig.workers_per_node, help="Workers per node")
+    parser.add_argument("--libraries", type=int, default=FakeFarmConfig.libraries)
+    parser.add_argument("--queue", type=int, default=FakeFarmConfig.queue_length, help="Length of the transcode queue")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="Maximum random seconds added to every response")
+    args = parser.parse_args()
+
+    config = FakeFarmConfig(args.nodes, args.workers, args.libraries, args.queue, args.latency, args.jitter)
+    try:
+        asyncio.run(async_serve(FakeTdarrServer(config, args.host, args.port)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Minimal Home Assistant instance for running the integration outside of a full installation."""
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from homeassistant import config_entries, core, loader
+from homeassistant.components.network.network import async_get_network
+from homeassistant.helpers import (
+    area_registry as ar,
+    category_registry as cr,
+    device_registry as dr,
+    entity_registry as er,
+    floor_registry as fr,
+    frame,
+    label_registry as lr,
+)
+
+from custom_components.tdarr.const import (
+    DOMAIN,
+    COORDINATOR,
+    SERVERIP,
+    SERVERPORT,
+    APIKEY,
+)
+from custom_components.tdarr.coordinator import TdarrDataUpdateCoordinator
+
+from .fake_server import FakeTdarrServer
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@asynccontextmanager
+async def async_create_hass() -> AsyncIterator[core.HomeAssistant]:
+    """Create a running Home Assistant instance with only the registries the integration needs.
+
+    The configuration directory is temporary and links to the custom components in this repository.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(os.path.join(REPOSITORY_ROOT, "custom_components"), os.path.join(config_dir, "custom_components"))
+        hass = core.HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        frame.async_setup(hass)
+        for registry in (ar, fr, lr, cr, dr, er):
+            await registry.async_load(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        # Required by the shared client session
+        await async_get_network(hass)
+        hass.set_state(core.CoreState.running)
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+async def async_setup_entry(hass: core.HomeAssistant, server: FakeTdarrServer, options: Dict[str, Any] | None = None) -> Tuple[config_entries.ConfigEntry, TdarrDataUpdateCoordinator]:
+    """Add and set up a config entry for a fake server, returning the entry and its coordinator."""
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=f"Fake Tdarr ({server.port})",
+        data={
+            SERVERIP: server.host,
+            SERVERPORT: server.port,
+            APIKEY: "",
+        },
+        source=config_entries.SOURCE_USER,
+        options=options or {},
+        unique_id=None,
+        discovery_keys={},
+        subentries_data=None,
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    if entry.state is not config_entries.ConfigEntryState.LOADED:
+        raise RuntimeError(f"Failed to set up config entry: {entry.state} {entry.reason}")
+    return entry, hass.data[DOMAIN][entry.entry_id][COORDINATOR]
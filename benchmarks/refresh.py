@@ -0,0 +1,171 @@
+"""Benchmark of coordinator refreshes against a fake Tdarr server as the farm grows.
+
+For each farm size the integration is set up in a minimal Home Assistant instance, then every section is refreshed
+repeatedly. Reports refresh latency, HTTP requests and response sizes per refresh, the time spent updating entities
+and the memory allocated by a refresh. Run from the repository root:
+
+    python -m benchmarks.refresh --sizes small,medium,large --refreshes 20 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, callback
+
+from custom_components.tdarr.const import SECTIONS
+
+from .fake_server import FakeFarmConfig, FakeTdarrServer
+from .ha import async_create_hass, async_setup_entry
+
+FARM_SIZES: Dict[str, FakeFarmConfig] = {
+    "small": FakeFarmConfig(nodes=1, workers_per_node=2, libraries=2, queue_length=100),
+    "medium": FakeFarmConfig(nodes=10, workers_per_node=4, libraries=20, queue_length=5000),
+    "large": FakeFarmConfig(nodes=50, workers_per_node=6, libraries=100, queue_length=50000),
+    "huge": FakeFarmConfig(nodes=100, workers_per_node=5, libraries=200, queue_length=200000),
+}
+
+
+@dataclass
+class RefreshBenchmarkResult:
+    """Measurements for a single farm size"""
+
+    size: str
+    farm: Dict[str, Any]
+    entities: int = 0
+    setup_seconds: float = 0
+    refresh_seconds: Dict[str, float] = field(default_factory=dict)
+    listener_seconds: Dict[str, float] = field(default_factory=dict)
+    requests_per_refresh: float = 0
+    requests_by_endpoint: Dict[str, float] = field(default_factory=dict)
+    response_kb_per_refresh: float = 0
+    state_writes_per_refresh: float = 0
+    refresh_peak_kb: float = 0 # Peak memory allocated during a refresh
+
+
+def summarise(durations: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(durations),
+        "p50": statistics.median(durations),
+        "p95": statistics.quantiles(durations, n=20)[-1] if len(durations) > 1 else durations[0],
+        "max": max(durations),
+    }
+
+
+async def async_benchmark_size(size: str, farm: FakeFarmConfig, refreshes: int, options: Dict[str, Any]) -> RefreshBenchmarkResult:
+    result = RefreshBenchmarkResult(size, asdict(farm))
+    async with FakeTdarrServer(farm) as server, async_create_hass() as hass:
+        started = time.perf_counter()
+        entry, coordinator = await async_setup_entry(hass, server, options)
+        result.setup_seconds = time.perf_counter() - started
+        result.entities = len(hass.states.async_entity_ids())
+
+        # Time the notification of listeners, which is where entities update their state
+        listener_durations: List[float] = []
+        update_listeners = coordinator.async_update_listeners
+
+        @callback
+        def async_timed_update_listeners() -> None:
+            listener_started = time.perf_counter()
+            update_listeners()
+            listener_durations.append(time.perf_counter() - listener_started)
+
+        coordinator.async_update_listeners = async_timed_update_listeners
+
+        state_writes = 0
+
+        @callback
+        def async_count_state_write(event: Event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, async_count_state_write)
+
+        server.requests.clear()
+        response_bytes = sum(endpoint.response_bytes_total for endpoint in coordinator.tdarr.metrics.endpoints.values())
+        refresh_durations = []
+        for _ in range(refreshes):
+            coordinator.mark_sections_due(*SECTIONS)
+            refresh_started = time.perf_counter()
+            await coordinator.async_refresh()
+            refresh_durations.append(time.perf_counter() - refresh_started)
+            await hass.async_block_till_done()
+
+        result.refresh_seconds = summarise(refresh_durations)
+        result.listener_seconds = summarise(listener_durations)
+        result.requests_per_refresh = sum(server.requests.values()) / refreshes
+        result.requests_by_endpoint = { endpoint: count / refreshes for endpoint, count in sorted(server.requests.items()) }
+        result.response_kb_per_refresh = (sum(endpoint.response_bytes_total for endpoint in coordinator.tdarr.metrics.endpoints.values()) - response_bytes) / refreshes / 1024
+        result.state_writes_per_refresh = state_writes / refreshes
+
+        # Measured separately as tracing allocations slows everything else down
+        coordinator.mark_sections_due(*SECTIONS)
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result.refresh_peak_kb = (peak - before) / 1024
+
+        await hass.config_entries.async_unload(entry.entry_id)
+    return result
+
+
+def print_results(results: List[RefreshBenchmarkResult]) -> None:
+    columns = [
+        ("size", lambda r: r.size),
+        ("entities", lambda r: r.entities),
+        ("setup s", lambda r: f"{r.setup_seconds:.3f}"),
+        ("refresh mean s", lambda r: f"{r.refresh_seconds['mean']:.4f}"),
+        ("refresh p95 s", lambda r: f"{r.refresh_seconds['p95']:.4f}"),
+        ("entities mean s", lambda r: f"{r.listener_seconds['mean']:.4f}"),
+        ("requests", lambda r: f"{r.requests_per_refresh:.1f}"),
+        ("response KB", lambda r: f"{r.response_kb_per_refresh:.1f}"),
+        ("state writes", lambda r: f"{r.state_writes_per_refresh:.1f}"),
+        ("peak KB", lambda r: f"{r.refresh_peak_kb:.0f}"),
+    ]
+    rows = [[name for name, _ in columns]] + [[str(value(result)) for _, value in columns] for result in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+async def async_main(args: argparse.Namespace) -> List[RefreshBenchmarkResult]:
+    options = { "full_attributes": args.full_attributes }
+    results = []
+    for size in args.sizes.split(","):
+        farm = replace(FARM_SIZES[size], latency=args.latency, latency_jitter=args.jitter)
+        results.append(await async_benchmark_size(size, farm, args.refreshes, options))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium,large", help=f"Comma separated farm sizes from {', '.join(FARM_SIZES)}")
+    parser.add_argument("--refreshes", type=int, default=20, help="Number of refreshes to time for each farm size")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every response of the fake server")
+    parser.add_argument("--jitter", type=float, default=0, help="Maximum random seconds added to every response")
+    parser.add_argument("--full-attributes", action="store_true", help="Enable full attributes on all entities")
+    parser.add_argument("--json", help="Write the results to a JSON file, e.g. to compare against a baseline")
+    args = parser.parse_args()
+
+    # Keep expected warnings, such as the custom integration warning, out of the results
+    logging.basicConfig(level=logging.ERROR)
+    results = asyncio.run(async_main(args))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
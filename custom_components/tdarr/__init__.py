@@ -1,9 +1,11 @@
 """The Tdarr integration."""
 import asyncio
 import logging
+from contextlib import aclosing
 from typing import (
     Any,
     Dict,
+    Mapping,
 )
 
 import voluptuous as vol
@@ -13,6 +15,7 @@ from homeassistant.core import (
     HomeAssistantError,
     ServiceCall,
     SupportsResponse,
+    callback,
 )
 from homeassistant.const import (
     ATTR_IDENTIFIERS,
@@ -23,17 +26,73 @@ from homeassistant.const import (
     ATTR_VIA_DEVICE,
 )
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import (
+    device_registry as dr,
+    entity_registry as er,
+)
 from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
 )
 
+from .balancer import (
+    TdarrBalancerConfig,
+    TdarrWorkerBalancer,
+    TdarrWorkerSplitter,
+)
 from .coordinator import TdarrDataUpdateCoordinator
+from .workers import get_slot_key
 from .const import (
     DOMAIN,
     MANUFACTURER,
     UPDATE_INTERVAL,
     UPDATE_INTERVAL_DEFAULT,
+    SECTION_UPDATE_INTERVAL,
+    SECTION_UPDATE_INTERVAL_DEFAULT,
+    SECTIONS,
+    SECTION_LIBRARIES,
+    SECTION_NODES,
+    SECTION_COUNTS,
+    SECTION_WORKERS,
+    PUSH_UPDATES,
+    PUSH_UPDATES_DEFAULT,
+    FULL_ATTRIBUTES,
+    FULL_ATTRIBUTES_DEFAULT,
+    WORKER_SENSORS,
+    WORKER_SENSORS_DEFAULT,
+    NODE_RETIRE_DELAY,
+    NODE_RETIRE_DELAY_DEFAULT,
+    ADAPTIVE_POLLING,
+    ADAPTIVE_POLLING_DEFAULT,
+    UPDATE_INTERVAL_MIN,
+    UPDATE_INTERVAL_MIN_DEFAULT,
+    UPDATE_INTERVAL_MAX,
+    UPDATE_INTERVAL_MAX_DEFAULT,
+    BALANCER_MODE,
+    BALANCER_MODE_OFF,
+    BALANCER_MODE_DEFAULT,
+    BALANCER_TARGET_CPU,
+    BALANCER_TARGET_CPU_DEFAULT,
+    BALANCER_HYSTERESIS,
+    BALANCER_HYSTERESIS_DEFAULT,
+    BALANCER_MAX_MEMORY,
+    BALANCER_MAX_MEMORY_DEFAULT,
+    BALANCER_FARM_MAX_WORKERS,
+    BALANCER_FARM_MAX_WORKERS_DEFAULT,
+    WORKER_SPLIT_MODE,
+    WORKER_SPLIT_MODE_OFF,
+    WORKER_SPLIT_MODE_DEFAULT,
+    WORKER_SPLIT_MARGIN,
+    WORKER_SPLIT_MARGIN_DEFAULT,
+    WORKER_TYPES,
+    QUEUE_TABLES,
+    QUEUE_TABLE_STAGED,
+    QUEUE_PAGE_SIZE_DEFAULT,
+    QUEUE_SERVICE_LIMIT_DEFAULT,
+    QUEUE_SERVICE_LIMIT_MAX,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
     COORDINATOR
 )
 
@@ -62,10 +121,41 @@ async def async_setup(hass: HomeAssistant, config: dict):
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up Tdarr Server from a config entry."""
     update_interval = entry.options.get(UPDATE_INTERVAL, UPDATE_INTERVAL_DEFAULT)
-    coordinator = TdarrDataUpdateCoordinator(hass, update_interval, entry.data)
-
-    # Get initial data so that correct sensors can be created
-    await coordinator.async_refresh()
+    section_intervals = {
+        section: entry.options.get(SECTION_UPDATE_INTERVAL.format(section), SECTION_UPDATE_INTERVAL_DEFAULT)
+        for section in SECTIONS
+    }
+    push_updates = entry.options.get(PUSH_UPDATES, PUSH_UPDATES_DEFAULT)
+    full_attributes = entry.options.get(FULL_ATTRIBUTES, FULL_ATTRIBUTES_DEFAULT)
+    worker_sensors = entry.options.get(WORKER_SENSORS, WORKER_SENSORS_DEFAULT)
+    node_retire_delay = entry.options.get(NODE_RETIRE_DELAY, NODE_RETIRE_DELAY_DEFAULT) * 60
+    adaptive_interval = None
+    if entry.options.get(ADAPTIVE_POLLING, ADAPTIVE_POLLING_DEFAULT):
+        adaptive_interval = (
+            entry.options.get(UPDATE_INTERVAL_MIN, UPDATE_INTERVAL_MIN_DEFAULT),
+            entry.options.get(UPDATE_INTERVAL_MAX, UPDATE_INTERVAL_MAX_DEFAULT),
+        )
+    balancer = None
+    balancer_mode = entry.options.get(BALANCER_MODE, BALANCER_MODE_DEFAULT)
+    if balancer_mode != BALANCER_MODE_OFF:
+        balancer = TdarrWorkerBalancer(balancer_mode, TdarrBalancerConfig(
+            target_cpu=entry.options.get(BALANCER_TARGET_CPU, BALANCER_TARGET_CPU_DEFAULT),
+            hysteresis=entry.options.get(BALANCER_HYSTERESIS, BALANCER_HYSTERESIS_DEFAULT),
+            max_memory=entry.options.get(BALANCER_MAX_MEMORY, BALANCER_MAX_MEMORY_DEFAULT),
+            farm_max_workers=entry.options.get(BALANCER_FARM_MAX_WORKERS, BALANCER_FARM_MAX_WORKERS_DEFAULT),
+        ))
+    splitter = None
+    split_mode = entry.options.get(WORKER_SPLIT_MODE, WORKER_SPLIT_MODE_DEFAULT)
+    if split_mode != WORKER_SPLIT_MODE_OFF:
+        splitter = TdarrWorkerSplitter(split_mode, entry.options.get(WORKER_SPLIT_MARGIN, WORKER_SPLIT_MARGIN_DEFAULT))
+    coordinator = TdarrDataUpdateCoordinator(hass, update_interval, entry.data, section_intervals, push_updates, full_attributes, node_retire_delay, adaptive_interval, balancer, splitter, worker_sensors)
+
+    # Get initial data so that correct sensors can be created. If a snapshot from a previous run is available, use
+    # that instead and refresh in the background once the platforms are set up, so that setup does not wait for the
+    # server and entities are created for any items first seen by the refresh.
+    snapshot_loaded = await coordinator.async_load_snapshot()
+    if not snapshot_loaded:
+        await coordinator.async_refresh()
 
     # Registers update listener to update config entry when options are updated.
     tdarr_options_listener = entry.add_update_listener(options_update_listener)
@@ -78,7 +168,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         "tdarr_options_listener": tdarr_options_listener
     }
 
+    # Added before the entities so that they show the result of the evaluation of each update
+    if balancer or splitter:
+        entry.async_on_unload(coordinator.async_add_listener(coordinator.async_balance_workers, (SECTION_NODES,)))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if snapshot_loaded:
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh for {coordinator.serverip}")
+    coordinator.async_start_push(entry)
 
     async def async_scan_library(service_call: ServiceCall):
         library_name = service_call.data["library"]
@@ -88,6 +185,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             raise HomeAssistantError(f"Invalid scan mode '{service_call.data["mode"]}'")
 
         await coordinator.tdarr.async_scan_library(library_name, mode)
+        # Poll queue sizes quickly while the scan adds files to the queue
+        coordinator.async_mark_active()
+        await coordinator.async_request_section_refresh(SECTION_COUNTS)
 
     hass.services.async_register(
         DOMAIN,
@@ -118,10 +218,141 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         supports_response=SupportsResponse.ONLY
     )
 
+    async def async_set_worker_limits(service_call: ServiceCall):
+        node_names = service_call.data["nodes"]
+        if isinstance(node_names, str):
+            node_names = [node_names]
+
+        limits = {
+            worker_type: int(service_call.data[worker_type])
+            for worker_type in WORKER_TYPES
+            if service_call.data.get(worker_type) is not None
+        }
+        if not limits:
+            raise HomeAssistantError("At least one worker limit must be provided.")
+
+        results = await coordinator.tdarr.async_set_worker_limits({ node_name: limits for node_name in node_names })
+        await coordinator.async_request_section_refresh(SECTION_NODES)
+
+        failed = [result for result in results if not result.success]
+        if failed and not service_call.return_response:
+            raise HomeAssistantError("Failed to update worker limits: " + ", ".join(
+                f"{result.node_key} {result.worker_type} is {result.actual} (target {result.target})"
+                for result in failed))
+
+        response = {}
+        for result in results:
+            response.setdefault(result.node_key, {})[result.worker_type] = result.as_dict()
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        "set_worker_limits",
+        async_set_worker_limits,
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+    async def async_stop_nodes(service_call: ServiceCall):
+        node_names = service_call.data["nodes"]
+        if isinstance(node_names, str):
+            node_names = [node_names]
+        worker_types = service_call.data.get("worker_types")
+        if isinstance(worker_types, str):
+            worker_types = [worker_types]
+
+        results = await coordinator.tdarr.async_stop_nodes(node_names, worker_types, service_call.data.get("reason"))
+        await coordinator.async_request_section_refresh(SECTION_NODES)
+
+        errors = [
+            f"{node_name}: {node_result['error']}"
+            for node_name, node_result in results.items()
+            if node_result["error"]
+        ] + [
+            f"{node_name} worker {worker_id}: {worker_result['error']}"
+            for node_name, node_result in results.items()
+            for worker_id, worker_result in node_result["workers"].items()
+            if worker_result["error"]
+        ]
+        if errors and not service_call.return_response:
+            raise HomeAssistantError("Failed to stop nodes: " + ", ".join(errors))
+
+        return results
+
+    hass.services.async_register(
+        DOMAIN,
+        "stop_nodes",
+        async_stop_nodes,
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+    async def async_get_queue(service_call: ServiceCall):
+        table = service_call.data.get("table", QUEUE_TABLE_STAGED)
+        if table not in QUEUE_TABLES:
+            raise HomeAssistantError(f"Invalid queue table '{table}'")
+
+        start = int(service_call.data.get("start", 0))
+        limit = int(service_call.data.get("limit", QUEUE_SERVICE_LIMIT_DEFAULT))
+        if start < 0 or not 0 < limit <= QUEUE_SERVICE_LIMIT_MAX:
+            raise HomeAssistantError(f"Start cannot be negative and limit must be between 1 and {QUEUE_SERVICE_LIMIT_MAX}.")
+
+        filters = service_call.data.get("filters") or {}
+        if not isinstance(filters, Mapping):
+            raise HomeAssistantError("Filters must map each field to the value to search for.")
+        filters = [{ "id": key, "value": value } for key, value in filters.items()]
+        sort = service_call.data.get("sort")
+        sorts = [{ "id": sort, "desc": bool(service_call.data.get("descending", False)) }] if sort else []
+        fields = service_call.data.get("fields")
+        if isinstance(fields, str):
+            fields = [fields]
+
+        total_count = 0
+        items = []
+        pages = coordinator.tdarr.async_iter_queue(table, QUEUE_PAGE_SIZE_DEFAULT, filters=filters, sorts=sorts, start=start, limit=limit)
+        async with aclosing(pages):
+            async for page in pages:
+                total_count = page.total_count
+                items.extend(
+                    { field: item.get(field) for field in fields } if fields else item
+                    for item in page.items
+                )
+
+        return {
+            "table": table,
+            "total_count": total_count,
+            "start": start,
+            "items": items,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_queue",
+        async_get_queue,
+        supports_response=SupportsResponse.ONLY
+    )
+
+    async def async_get_data(service_call: ServiceCall):
+        sections = service_call.data.get("sections") or SECTIONS
+        if isinstance(sections, str):
+            sections = [sections]
+        invalid_sections = set(sections).difference(SECTIONS)
+        if invalid_sections:
+            raise HomeAssistantError(f"Section must be one of {', '.join(SECTIONS)}")
+
+        return { section: coordinator.get_raw_section_data(section) for section in sections }
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_data",
+        async_get_data,
+        supports_response=SupportsResponse.ONLY
+    )
+
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
+    # Send setting changes which are still waiting for further changes
+    await hass.data[DOMAIN][entry.entry_id][COORDINATOR].tdarr.writes.async_flush()
     unload_ok = all(
         await asyncio.gather(
             *[
@@ -137,6 +368,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the snapshot when a config entry is removed."""
+    await Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY.format(entry.entry_id)).async_remove()
+
+async def async_remove_config_entry_device(hass: HomeAssistant, entry: ConfigEntry, device_entry: dr.DeviceEntry) -> bool:
+    """Allow devices for nodes which are no longer connected to be removed manually."""
+    coordinator: TdarrDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    for identifier in device_entry.identifiers:
+        if identifier[0] == DOMAIN and len(identifier) == 4 and identifier[2] == "node":
+            return identifier[3] not in coordinator.data.get(SECTION_NODES, {})
+    return False
+
 async def options_update_listener(hass: HomeAssistant,  entry: ConfigEntry):
     _LOGGER.info("Options updated")
     await hass.config_entries.async_reload(entry.entry_id)
@@ -150,14 +393,64 @@ class TdarrEntity(CoordinatorEntity[TdarrDataUpdateCoordinator]):
         super().__init__(coordinator)
         self.entity_description = entity_description
 
-        # Required for HA 2022.7
-        self.coordinator_context = object()
+        # Only notified of changes to the section used by the entity. See TdarrDataUpdateCoordinator.async_update_listeners
+        self.coordinator_context = (self.section,) if self.section else None
+
+        # State and attributes last written from coordinator data
+        self._state_fingerprint: tuple | None = None
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        if self.coordinator_context and len(self.coordinator_context) == 2:
+            self.async_on_remove(self.coordinator.async_add_items_removed_listener(self._handle_items_removed))
         self._handle_coordinator_update()
 
+    @callback
+    def _handle_items_removed(self, section: str, keys: list[str]) -> None:
+        """Remove the entity if the item it represents has been removed from the server."""
+        item_section, item_key = self.coordinator_context
+        if section != item_section or item_key not in keys:
+            return
+        if self.registry_entry:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove())
+
+    def _get_state_fingerprint(self) -> tuple:
+        """Get a comparable representation of everything written to the state machine."""
+        if not self.available:
+            return (False,)
+        return (True, self.state, self.extra_state_attributes)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator. The state is only written if it has changed."""
+        fingerprint = self._get_state_fingerprint()
+        if fingerprint == self._state_fingerprint:
+            return
+        self.async_write_ha_state()
+        self._state_fingerprint = fingerprint
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        # State may be written outside of a coordinator update (e.g. after a change is made), in which case the
+        # next coordinator update must be written even if the data has not changed.
+        self._state_fingerprint = None
+        super().async_write_ha_state()
+
+    @property
+    def section(self) -> str | None:
+        """The section of coordinator data used by the entity."""
+        return getattr(self.entity_description, "section", None)
+
+    @property
+    def available(self) -> bool:
+        """Return if the entity is available. Only depends on the section of data used by the entity if known."""
+        if not super().available:
+            return False
+        return self.section is None or self.coordinator.is_section_available(self.section)
+
     @property
     def data(self) -> dict:
         return self.coordinator.data
@@ -174,10 +467,14 @@ class TdarrEntity(CoordinatorEntity[TdarrDataUpdateCoordinator]):
 
     @property
     def base_attributes(self) -> Dict[str, Any] | None:
-        return {
+        attributes = {
             "server_ip": self.coordinator.serverip,
             "entity_key": self.entity_description.key,
         }
+        if self.section and self.coordinator.section_states[self.section].from_snapshot:
+            # Data is from a previous run and has not been refreshed from the server yet
+            attributes["stale"] = True
+        return attributes
 
 
 class TdarrServerEntity(TdarrEntity):
@@ -201,31 +498,41 @@ class TdarrLibraryEntity(TdarrEntity):
         """Initialize the entity."""
         super().__init__(coordinator, entity_description)
         self.library_id = library_id
+        self.coordinator_context = (self.section, library_id)
 
     @property
     def unique_id(self):
         """Return the unique ID of the entity."""
         return f"{self.coordinator.serverip}-library-{self.library_id}-{self.entity_description.key}"
 
+    @property
+    def section(self) -> str:
+        return SECTION_LIBRARIES
+
     @property
     def data(self) -> dict:
         return self.coordinator.data.get("libraries", {}).get(self.library_id)
 
     @property
     def base_attributes(self) -> Dict[str, Any] | None:
-        video_info = self.data.get("video", {})
-        return {
+        attributes = {
             **super().base_attributes,
-            "codecs": {x["name"]: x["value"] for x in video_info.get("codecs", {})},
-            "containers": {x["name"]: x["value"] for x in video_info.get("containers", {})},
             "library_id": self.library_id,
             "library_name": self.data.get("name"),
-            "resolutions": {x["name"]: x["value"] for x in video_info.get("resolutions", {})},
             "space_saved_gb": round(self.data.get("sizeDiff"), 0),
             "total_files": self.data.get("totalFiles"),
             "total_health_checks": self.data.get("totalHealthCheckCount"),
             "total_transcodes": self.data.get("totalTranscodeCount"),
         }
+        if self.coordinator.full_attributes:
+            # Breakdowns can be large, so are only included if requested
+            video_info = self.data.get("video", {})
+            attributes.update({
+                "codecs": {x["name"]: x["value"] for x in video_info.get("codecs", {})},
+                "containers": {x["name"]: x["value"] for x in video_info.get("containers", {})},
+                "resolutions": {x["name"]: x["value"] for x in video_info.get("resolutions", {})},
+            })
+        return attributes
 
 
 class TdarrNodeEntity(TdarrEntity):
@@ -234,12 +541,17 @@ class TdarrNodeEntity(TdarrEntity):
         """Initialize the entity."""
         super().__init__(coordinator, entity_description)
         self.node_key = node_key
+        self.coordinator_context = (self.section, node_key)
 
     @property
     def unique_id(self):
         """Return the unique ID of the entity."""
         return f"{self.coordinator.serverip}-node-{self.node_key}-{self.entity_description.key}"
 
+    @property
+    def section(self) -> str:
+        return SECTION_NODES
+
     @property
     def tdarr_node_id(self) -> str | None:
         return self.data.get("_id")
@@ -272,3 +584,40 @@ class TdarrNodeEntity(TdarrEntity):
             "node_name": self.data.get("nodeName"),
             "remote_address": self.data.get("remoteAddress"),
         }
+
+
+class TdarrWorkerEntity(TdarrNodeEntity):
+    """An entity of a worker slot of a node, which only exists while a worker is assigned to the slot.
+
+    See TdarrWorkerSlots for how workers are assigned to slots.
+    """
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, node_key: str, slot: int, entity_description: EntityDescription):
+        """Initialize the entity."""
+        super().__init__(coordinator, node_key, entity_description)
+        self.slot = slot
+        self.slot_key = get_slot_key(node_key, slot)
+        # Only notified when the worker in the slot changes, not when anything else on the node does
+        self.coordinator_context = (SECTION_WORKERS, self.slot_key)
+
+    @property
+    def unique_id(self):
+        """Return the unique ID of the entity."""
+        return f"{self.coordinator.serverip}-node-{self.node_key}-worker-{self.slot}-{self.entity_description.key}"
+
+    @property
+    def worker_data(self) -> dict:
+        return self.coordinator.data.get(SECTION_WORKERS, {}).get(self.slot_key, {})
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.slot_key in self.coordinator.data.get(SECTION_WORKERS, {})
+
+    @property
+    def base_attributes(self) -> Dict[str, Any] | None:
+        return {
+            **super().base_attributes,
+            "worker_slot": self.slot,
+            "worker_id": self.worker_data.get("_id"),
+            "worker_type": self.worker_data.get("workerType"),
+        }
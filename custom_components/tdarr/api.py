@@ -1,8 +1,18 @@
 import asyncio
+import json
 import logging
+import time
+from collections import defaultdict, deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
     Dict,
+    List,
+    Tuple,
 )
 import aiohttp
 
@@ -10,15 +20,124 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
+from .metrics import TdarrMetrics
+from .resilience import (
+    RETRYABLE_ERRORS,
+    RETRYABLE_STATUSES,
+    REQUEST_LIBRARY_PIES,
+    REQUEST_LIBRARY_SETTINGS,
+    REQUEST_QUEUE_PAGE,
+    TdarrCircuitBreaker,
+    get_retry_policy,
+)
+from .push import TdarrPushClient
+from .writes import TdarrWriteQueue
 from .const import (
     APIKEY,
     SERVERIP,
     SERVERPORT,
     WORKER_TYPES,
+    QUEUE_TABLES,
+    QUEUE_TABLE_STAGED,
+    QUEUE_PAGE_SIZE_DEFAULT,
+    QUEUE_CONCURRENCY_DEFAULT,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of alter-worker-limit requests in progress at once
+WORKER_LIMIT_MAX_CONCURRENT_REQUESTS = 8
+
+
+@dataclass
+class TdarrResponse:
+    """A response received from the Tdarr server"""
+
+    status: int
+    reason: str | None
+    text: str
+    data: Any = None # Decoded JSON body. Only populated for successful read requests.
+
+
+class TdarrResponseError(HomeAssistantError):
+    """Raised when the server responds to a read request with an error status"""
+
+    def __init__(self, description: str, response: TdarrResponse):
+        super().__init__(f"Error response received retrieving {description}: {response.status} {response.reason}")
+        self.response = response
+
+
+@dataclass
+class TdarrWorkerLimitResult:
+    """Outcome of changing the worker limit for a worker type on a node"""
+
+    node_key: str
+    worker_type: str
+    target: int
+    previous: int | None = None
+    actual: int | None = None # Limit read back from the server after the change
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None and self.actual == self.target
+
+    def as_error(self) -> HomeAssistantError | None:
+        """Get the error to raise for an unsuccessful change."""
+        if self.error:
+            return HomeAssistantError(f"Error updating {self.worker_type} worker limit for '{self.node_key}': {self.error}")
+        if not self.success:
+            return HomeAssistantError(
+                f"{self.worker_type} worker limit for '{self.node_key}' was only partially updated. "
+                f"Limit is {self.actual} after changing from {self.previous} to {self.target}.")
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "previous": self.previous,
+            "target": self.target,
+            "actual": self.actual,
+            "success": self.success,
+            "error": self.error,
+        }
+
+
+@dataclass
+class TdarrQueuePage:
+    """A page of items from a queue table"""
+
+    start: int
+    total_count: int # Number of items in the table matching the filters, not just this page
+    items: List[dict]
+
+
+@dataclass
+class TdarrNodeIndexEntry:
+    """Details of a node required for writes"""
+
+    node_id: str
+    worker_limits: Dict[str, int]
+
+
+class TdarrNodeIndex(object):
+    """Lookup of node keys to the current Tdarr node ID and worker limits.
+
+    Rebuilt each time node data is retrieved so that writes do not need to download all node data to find a node.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, TdarrNodeIndexEntry] = {}
+
+    def update(self, nodes: Dict[str, dict]) -> None:
+        self._entries = {
+            key: TdarrNodeIndexEntry(value["_id"], dict(value.get("workerLimits", {})))
+            for key, value in nodes.items()
+            if "_id" in value
+        }
+
+    def get(self, node_key: str) -> TdarrNodeIndexEntry | None:
+        return self._entries.get(node_key)
+
 
 class TdarrApiClient(object):
     """API Client for interacting with a Tdarr server"""
@@ -40,37 +159,142 @@ class TdarrApiClient(object):
     def __init__(self, id: str, session: aiohttp.ClientSession):
         self._id = id
         self._session = session
+        self._inflight_reads: Dict[Tuple[str, str, str], asyncio.Task[TdarrResponse]] = {}
+        self._worker_limit_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock) # Keyed by node key and worker type
+        self.node_index = TdarrNodeIndex()
+        self.metrics = TdarrMetrics()
+        self.breaker = TdarrCircuitBreaker()
+        self.writes = TdarrWriteQueue(self)
 
-    async def async_get_nodes(self):
-        try:
-            _LOGGER.debug("Retrieving nodes from %s", self._id)
-            r = await self._session.get('get-nodes')
-            if r.status == 200:
-                data = await r.json()
+    def create_push_client(self, on_event: Callable[[str, Any], None], on_connection_change: Callable[[bool], None]) -> TdarrPushClient:
+        """Create a client for receiving events pushed from the server using the same connection details."""
+        return TdarrPushClient(self._id, self._session, on_event, on_connection_change)
 
-                # Node IDs can change when node is restarted, so replace with node name instead.
-                # Fallback to ID if node name is unavailable for some reason.
-                data = { value.get("nodeName", key): value for key, value in data.items()}
+    async def _async_request(self, method: str, endpoint: str, payload: Any = None, decode: bool = False, timeout: float | None = None) -> TdarrResponse:
+        """Send a single request. Fails immediately with TdarrCircuitOpenError while the server is considered down.
 
-                return data
+        args:
+            timeout: Optional timeout in seconds for the request, instead of the session default.
+        """
+        self.breaker.check()
+        metrics = self.metrics.endpoint(endpoint)
+        request_kwargs: Dict[str, Any] = { "json": payload }
+        if timeout:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        started = time.perf_counter()
+        try:
+            async with self._session.request(method, endpoint, **request_kwargs) as r:
+                body = await r.read()
+                text = body.decode(r.get_encoding())
+        except BaseException as e:
+            # Includes cancellation so that requests abandoned by a timeout are still counted
+            metrics.record_error(time.perf_counter() - started, e)
+            if isinstance(e, asyncio.CancelledError):
+                self.breaker.record_cancelled()
             else:
-                return "ERROR"
-        except Exception as err:
-            _LOGGER.warning("Failed to retrieve node data.", err)
-            raise HomeAssistantError("Failed to retrieve node data.") from err
+                self.breaker.record_failure()
+            raise
+        latency = time.perf_counter() - started
+        if r.status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
 
-    async def async_get_status(self):
+        data = None
+        decode_seconds = None
+        if decode and r.status == 200:
+            decode_started = time.perf_counter()
+            data = json.loads(text)
+            decode_seconds = time.perf_counter() - decode_started
+
+        metrics.record_response(latency, r.status, len(body), decode_seconds)
+        return TdarrResponse(r.status, r.reason, text, data)
+
+    async def _async_read(self, method: str, endpoint: str, payload: Any = None, join: bool = True, request: str | None = None) -> TdarrResponse:
+        """Perform a request which does not modify the server.
+
+        Identical requests which are already in progress are joined rather than sent again, so that concurrent
+        callers share a single request and JSON decode. Callers must not modify the returned data.
+
+        args:
+            join: Whether an in-progress request can be joined. Use False when the response must reflect writes
+                which completed after any in-progress request was sent. Later callers will join the new request.
+            request: The request being made, to find its retry policy. The default policy is used if not provided.
+        """
+        key = (method, endpoint, json.dumps(payload, sort_keys=True))
+        task = self._inflight_reads.get(key) if join else None
+        if task is None:
+            task = asyncio.create_task(self._async_retry_read(method, endpoint, payload, request))
+            self._inflight_reads[key] = task
+            task.add_done_callback(lambda t: self._on_read_done(key, t))
+        else:
+            _LOGGER.debug("Joining in-flight %s request to %s", endpoint, self._id)
+
+        # Shield so that a cancelled caller does not cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    async def _async_retry_read(self, method: str, endpoint: str, payload: Any = None, request: str | None = None) -> TdarrResponse:
+        """Send a read request, retrying failures which may be temporary according to the request's retry policy.
+
+        Writes are never retried automatically, as a write which appeared to fail may still have been applied.
+        """
+        policy = get_retry_policy(request)
+        for attempt in range(1, policy.attempts + 1):
+            try:
+                response = await self._async_request(method, endpoint, payload, decode=True, timeout=policy.timeout)
+                if response.status not in RETRYABLE_STATUSES or attempt == policy.attempts:
+                    return response
+                reason = f"HTTP {response.status}"
+            except RETRYABLE_ERRORS as e:
+                if attempt == policy.attempts:
+                    raise
+                reason = str(e) or type(e).__name__
+
+            delay = policy.get_delay(attempt - 1)
+            _LOGGER.debug("Retrying %s request to %s in %.2f seconds after %s", endpoint, self._id, delay, reason)
+            self.metrics.endpoint(endpoint).retries += 1
+            await asyncio.sleep(delay)
+
+    def _on_read_done(self, key: Tuple[str, str, str], task: asyncio.Task) -> None:
+        if self._inflight_reads.get(key) is task:
+            del self._inflight_reads[key]
+        # Prevent "exception never retrieved" warnings when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_get_data(self, description: str, method: str, endpoint: str, payload: Any = None, join: bool = True, request: str | None = None) -> Any:
+        """Retrieve decoded data, raising HomeAssistantError if the request fails or the server responds with an error.
+
+        Errors are raised rather than returned so that the coordinator keeps the last good data for the section.
+
+        args:
+            description: What is being retrieved, for error messages.
+            request: The request being made, to find its retry policy.
+        """
         try:
-            _LOGGER.debug("Retrieving status from %s", self._id)
-            r = await self._session.get('status')
-            if r.status == 200:
-                result = await r.json()
-                return result
-            else:
-                return "ERROR"
+            r = await self._async_read(method, endpoint, payload, join=join, request=request)
         except Exception as err:
-            _LOGGER.warning("Failed to retrieve status data.", err)
-            raise HomeAssistantError("Failed to retrieve status data.") from err
+            _LOGGER.warning("Failed to retrieve %s: %s", description, str(err) or type(err).__name__)
+            raise HomeAssistantError(f"Failed to retrieve {description}.") from err
+
+        if r.status != 200:
+            raise TdarrResponseError(description, r)
+        return r.data
+
+    async def async_get_nodes(self, join: bool = True):
+        _LOGGER.debug("Retrieving nodes from %s", self._id)
+        data = await self._async_get_data("node data", 'GET', 'get-nodes', join=join)
+
+        # Node IDs can change when node is restarted, so replace with node name instead.
+        # Fallback to ID if node name is unavailable for some reason.
+        data = { value.get("nodeName", key): value for key, value in data.items()}
+        self.node_index.update(data)
+
+        return data
+
+    async def async_get_status(self):
+        _LOGGER.debug("Retrieving status from %s", self._id)
+        return await self._async_get_data("status data", 'GET', 'status')
 
     async def async_get_libraries(self):
         _LOGGER.debug("Retrieving libraries from %s", self._id)
@@ -93,138 +317,234 @@ class TdarrApiClient(object):
         return libraries
 
     async def async_get_stats(self):
-        try:
-            _LOGGER.debug("Retrieving stats from %s", self._id)
-            post = {
-                "data": {
-                    "collection":"StatisticsJSONDB",
-                    "mode":"getById",
-                    "docID":"statistics",
-                    "obj":{}
-                    },
-                "timeout":1000
-            }
-            r = await self._session.post('cruddb', json = post)
-            if r.status == 200:
-                return await r.json()
-            else:
-                return "ERROR"
-        except Exception as err:
-            _LOGGER.warning("Failed to retrieve stats data.", err)
-            raise HomeAssistantError("Failed to retrieve stats data.") from err
+        _LOGGER.debug("Retrieving stats from %s", self._id)
+        post = {
+            "data": {
+                "collection":"StatisticsJSONDB",
+                "mode":"getById",
+                "docID":"statistics",
+                "obj":{}
+                },
+            "timeout":1000
+        }
+        return await self._async_get_data("stats data", 'POST', 'cruddb', post)
 
     async def async_get_library_settings(self):
-        try:
-            _LOGGER.debug("Retrieving library settings from %s", self._id)
-            post = {
-                "data": {
-                    "collection":"LibrarySettingsJSONDB",
-                    "mode":"getAll",
-                    },
-                "timeout":20000
-            }
-            r = await self._session.post('cruddb', json = post)
-            if r.status == 200:
-                return await r.json()
-            else:
-                return
-        except Exception as err:
-            _LOGGER.warning("Failed to retrieve status data.", err)
-            raise HomeAssistantError("Failed to retrieve status data.") from err
+        _LOGGER.debug("Retrieving library settings from %s", self._id)
+        post = {
+            "data": {
+                "collection":"LibrarySettingsJSONDB",
+                "mode":"getAll",
+                },
+            "timeout":20000
+        }
+        return await self._async_get_data("library settings", 'POST', 'cruddb', post, request=REQUEST_LIBRARY_SETTINGS)
 
     async def async_get_pies(self, library_id=""):
-        try:
-            _LOGGER.debug("Retrieving pies for library ID '%s' from %s", library_id, self._id)
-            post = {
-                "data": {
-                    "libraryId": library_id
+        _LOGGER.debug("Retrieving pies for library ID '%s' from %s", library_id, self._id)
+        post = {
+            "data": {
+                "libraryId": library_id
+            },
+        }
+        data = await self._async_get_data(f"pie data for library '{library_id}'", 'POST', 'stats/get-pies', post, request=REQUEST_LIBRARY_PIES)
+        return data["pieStats"]
+
+    async def async_get_queue_page(
+            self,
+            table: str,
+            start: int = 0,
+            page_size: int = QUEUE_PAGE_SIZE_DEFAULT,
+            filters: List[Dict[str, Any]] | None = None,
+            sorts: List[Dict[str, Any]] | None = None) -> TdarrQueuePage:
+        """Retrieve a single page of a queue table.
+
+        args:
+            table: One of QUEUE_TABLES.
+            start: Index of the first item to retrieve.
+            page_size: Maximum number of items to retrieve.
+            filters: Server side filters in the form `{"id": <field>, "value": <value>}`.
+            sorts: Server side sorts in the form `{"id": <field>, "desc": <bool>}`.
+        """
+        if table not in QUEUE_TABLES:
+            raise HomeAssistantError(f"Queue table must be one of {', '.join(QUEUE_TABLES)}")
+
+        table_id = QUEUE_TABLES[table]
+        endpoint = 'client/staged' if table_id is None else 'client/status-tables'
+        post = {
+            "data": {
+                "filters": filters or [],
+                "start": start,
+                "pageSize": page_size,
+                "sorts": sorts or [],
+                "opts": {} if table_id is None else { "table": table_id }
                 },
-            }
-            r = await self._session.post('stats/get-pies', json = post)
-            if r.status == 200:
-                data = await r.json()
-                return data["pieStats"]
-            else:
-                return "ERROR"
-        except Exception as err:
-            _LOGGER.warning("Failed to retrieve pie data for library %s.", library_id, err)
-            raise HomeAssistantError(f"Failed to retrieve pie data for library {library_id}.") from err
+            "timeout": 1000
+        }
 
-    async def async_get_staged(self):
         try:
-            _LOGGER.debug("Retrieving staged files from %s", self._id)
-            post = {
-                "data": {
-                    "filters":[],
-                    "start":0,
-                    "pageSize":10,
-                    "sorts":[],
-                    "opts":{}
-                    },
-                "timeout":1000
-            }
-            r = await self._session.post('client/staged', json = post)
-            if r.status == 200:
-                return await r.json()
-            else:
-                return "ERROR"
+            _LOGGER.debug("Retrieving %s items %d-%d from %s", table, start, start + page_size, self._id)
+            r = await self._async_read('POST', endpoint, post, request=REQUEST_QUEUE_PAGE)
         except Exception as err:
-            _LOGGER.warning("Failed to retrieve staged file data.", err)
-            raise HomeAssistantError("Failed to retrieve staged file data.") from err
+            raise HomeAssistantError(f"Failed to retrieve {table} queue data.") from err
 
-    async def async_get_global_settings(self):
+        if r.status != 200 or not isinstance(r.data, dict):
+            raise HomeAssistantError(f"Error response received retrieving {table} queue data: {r.status} {r.reason}")
+
+        return TdarrQueuePage(start, r.data.get("totalCount", 0), r.data.get("array", []))
+
+    async def async_iter_queue(
+            self,
+            table: str,
+            page_size: int = QUEUE_PAGE_SIZE_DEFAULT,
+            concurrency: int = QUEUE_CONCURRENCY_DEFAULT,
+            filters: List[Dict[str, Any]] | None = None,
+            sorts: List[Dict[str, Any]] | None = None,
+            start: int = 0,
+            limit: int | None = None) -> AsyncIterator[TdarrQueuePage]:
+        """Page through a queue table, yielding each page in order.
+
+        The first page is retrieved to find the number of items, then up to `concurrency` further pages are
+        requested at once. Only the pages waiting to be consumed are held in memory. As the queue can change while
+        paging, items may be skipped or repeated at page boundaries.
+
+        Close the iterator (e.g. with contextlib.aclosing) when stopping early so that outstanding requests are
+        cancelled.
+
+        args:
+            page_size: Number of items to request per page.
+            concurrency: Maximum number of page requests in progress at once.
+            start: Index of the first item to retrieve.
+            limit: Maximum number of items to retrieve. All remaining items are retrieved if not provided.
+        """
+        if page_size < 1 or concurrency < 1:
+            raise HomeAssistantError("Page size and concurrency must be at least 1.")
+        if limit is not None:
+            page_size = max(1, min(page_size, limit))
+
+        def get_page(offset: int) -> Awaitable[TdarrQueuePage]:
+            return self.async_get_queue_page(table, offset, page_size, filters, sorts)
+
+        page = await get_page(start)
+        end = page.total_count if limit is None else min(page.total_count, start + limit)
+        offsets = iter(range(start + page_size, end, page_size))
+        pending: deque[asyncio.Task] = deque()
         try:
-            _LOGGER.debug("Retrieving global settings from %s", self._id)
-            post = {
-                "data": {
-                    "collection":"SettingsGlobalJSONDB",
-                    "mode":"getById",
-                    "docID":"globalsettings",
-                    "obj":{}
-                    },
-                "timeout":1000
-            }
-            r = await self._session.post('cruddb', json = post)
-            if r.status == 200:
-                return await r.json()
-            else:
-                return {"message": r.text, "status_code": r.status, "status": "ERROR"}
-        except Exception as err:
-            _LOGGER.warning("Failed to retrieve global settings.", err)
-            raise HomeAssistantError("Failed to retrieve global settings.") from err
+            while True:
+                # Request the following pages while this one is being consumed
+                while len(pending) < concurrency and (offset := next(offsets, None)) is not None:
+                    pending.append(asyncio.create_task(get_page(offset)))
+
+                page.items = page.items[:max(0, end - page.start)]
+                if not page.items:
+                    return
+                yield page
+
+                if not pending:
+                    return
+                page = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            # Wait for the cancellations, also retrieving the errors of pages which failed before being consumed
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def async_get_queue_counts(self) -> Dict[str, int]:
+        """Retrieve the number of items in each queue table, keyed by table.
+
+        The statistics document already holds the size of each status table, so is read in place of a request per
+        table. Reads of the statistics document made at the same time, such as by the stats section, are shared.
+        Staged files are not counted in the statistics, so a single staged item is requested for the total. A page
+        size of 0 is avoided as the database may treat it as no limit.
+        """
+        _LOGGER.debug("Retrieving queue counts from %s", self._id)
+        stats, staged = await asyncio.gather(self.async_get_stats(), self.async_get_queue_page(QUEUE_TABLE_STAGED, 0, 1))
+        return {
+            QUEUE_TABLE_STAGED: staged.total_count,
+            **{ table: stats.get(f"{table_id}Count") for table, table_id in QUEUE_TABLES.items() if table_id },
+        }
+
+    async def async_get_global_settings(self):
+        _LOGGER.debug("Retrieving global settings from %s", self._id)
+        post = {
+            "data": {
+                "collection":"SettingsGlobalJSONDB",
+                "mode":"getById",
+                "docID":"globalsettings",
+                "obj":{}
+                },
+            "timeout":1000
+        }
+        return await self._async_get_data("global settings", 'POST', 'cruddb', post)
+
+    async def _async_get_node_index_entry(self, node_key: str, refresh: bool = False) -> TdarrNodeIndexEntry:
+        """Get the indexed details for a node, only retrieving node data if the node is not indexed or refresh is requested."""
+        entry = None if refresh else self.node_index.get(node_key)
+        if entry is None:
+            await self.async_get_nodes()
+            entry = self.node_index.get(node_key)
+
+        if entry is None:
+            raise HomeAssistantError(f"Could not determine ID for node '{node_key}'. Node looks to be offline.")
+        return entry
 
     async def async_get_node_id(self, node_name: str) -> str:
-        all_node_data = await self.async_get_nodes()
-        node_data = all_node_data.get(node_name)
-        if node_data:
-            return node_data["_id"]
-        else:
-            raise HomeAssistantError(f"Could not determine ID for node '{node_name}'.")
+        return (await self._async_get_node_index_entry(node_name)).node_id
+
+    async def _async_node_write(self, node_key: str, endpoint: str, payload_fn: Callable[[str], dict]) -> TdarrResponse:
+        """Send a write request for a node using the indexed node ID.
+
+        If the request is rejected the node ID is refreshed, as it changes when a node restarts, and the request is
+        retried once with the new ID.
+        """
+        entry = await self._async_get_node_index_entry(node_key)
+        response = await self._async_request('POST', endpoint, payload_fn(entry.node_id))
+        if response.status < 400:
+            return response
+
+        current_entry = await self._async_get_node_index_entry(node_key, refresh=True)
+        if current_entry.node_id == entry.node_id:
+            return response
+
+        _LOGGER.info("ID for node '%s' has changed. Retrying %s request.", node_key, endpoint)
+        return await self._async_request('POST', endpoint, payload_fn(current_entry.node_id))
 
     async def async_set_global_setting(self, setting_key, value):
-        _LOGGER.debug("Setting global setting '%s' for %s", setting_key, self._id)
+        return await self.async_set_global_settings({setting_key: value})
+
+    async def async_set_global_settings(self, settings: Dict[str, Any]):
+        """Set multiple global settings in a single update."""
+        setting_keys = ", ".join(settings)
+        _LOGGER.debug("Setting global settings %s for %s", setting_keys, self._id)
         data = {
             "data":{
                 "collection":"SettingsGlobalJSONDB",
                 "mode":"update",
                 "docID":"globalsettings",
-                "obj":{
-                    setting_key: value
-                }
+                "obj": settings
             },
             "timeout":20000
         }
 
         try:
-            response = await self._session.post('cruddb', json=data)
+            response = await self._async_request('POST', 'cruddb', data)
         except aiohttp.ClientError as e:
-            raise HomeAssistantError(f"Error writing Tdarr global setting {setting_key}: {e}") from e
+            raise HomeAssistantError(f"Error writing Tdarr global setting {setting_keys}: {e}") from e
 
         if response.status >= 400:
-            raise HomeAssistantError(f"Error response received writing Tdarr global setting {setting_key}: {response.status} {response.reason}")
+            raise HomeAssistantError(f"Error response received writing Tdarr global setting {setting_keys}: {response.status} {response.reason}")
 
         return response
 
+    @staticmethod
+    def _node_setting_payload(node_id: str, updates: Dict[str, Any]) -> dict:
+        return {
+            "data": {
+                "nodeID": node_id,
+                "nodeUpdates": updates
+            }
+        }
+
     async def async_set_node_setting(self, node_id: str, setting_key: str, value: Any):
         """Set the paused state of a node.
 
@@ -234,17 +554,10 @@ class TdarrApiClient(object):
             state: The paused state to set
         """
         _LOGGER.debug("Setting node '%s' %s state to '%s' for %s", node_id, setting_key, value, self._id)
-        data = {
-            "data": {
-                "nodeID": node_id,
-                "nodeUpdates": {
-                    setting_key: value
-                }
-            }
-        }
+        data = self._node_setting_payload(node_id, {setting_key: value})
 
         try:
-            response = await self._session.post('update-node', json=data)
+            response = await self._async_request('POST', 'update-node', data)
         except aiohttp.ClientError as e:
             raise HomeAssistantError(f"Error writing node '{node_id}' setting '{setting_key}': {e}") from e
 
@@ -253,56 +566,176 @@ class TdarrApiClient(object):
 
         return response
 
+    async def async_update_node(self, node_key: str, setting_key: str, value: Any):
+        """Set a setting of a node.
+
+        args:
+            node_key: The internal ID of the node for the integration. This is usually the node name.
+            setting_key: The setting to update for the node.
+            value: The value to set
+        """
+        return await self.async_update_node_settings(node_key, {setting_key: value})
+
+    async def async_update_node_settings(self, node_key: str, updates: Dict[str, Any]):
+        """Set multiple settings of a node in a single update.
+
+        args:
+            node_key: The internal ID of the node for the integration. This is usually the node name.
+            updates: The value to set for each setting.
+        """
+        setting_keys = ", ".join(updates)
+        _LOGGER.debug("Setting node '%s' settings %s for %s", node_key, updates, self._id)
+        try:
+            response = await self._async_node_write(
+                node_key,
+                'update-node',
+                lambda node_id: self._node_setting_payload(node_id, updates))
+        except aiohttp.ClientError as e:
+            raise HomeAssistantError(f"Error writing node '{node_key}' setting '{setting_keys}': {e}") from e
+
+        if response.status >= 400:
+            raise HomeAssistantError(f"Error response received writing node '{node_key}' setting '{setting_keys}': {response.status} {response.reason}")
+
+        return response
+
     async def async_set_node_worker_limit(self, node_key: str,  worker_type: str, value: int):
-        """Set the paused state of a node.
+        """Set the worker limit for a single worker type of a node.
 
         args:
             node_key: The internal ID of the node for the integration. This is usually the node name.
             worker_type: The type of worker to set.
             value: The number to set the worker limit to.
         """
-        if value < 0:
-            raise HomeAssistantError("Worker limit cannot be negative.")
+        result = (await self.async_set_worker_limits({node_key: {worker_type: value}}))[0]
+        if error := result.as_error():
+            raise error
 
-        if worker_type not in WORKER_TYPES:
-            raise HomeAssistantError(f"Worker type must be one of {', '.join(WORKER_TYPES)}")
+    async def async_set_worker_limits(self, limits: Dict[str, Dict[str, int]]) -> List[TdarrWorkerLimitResult]:
+        """Set worker limits for multiple nodes and worker types concurrently.
 
-        _LOGGER.info("Setting %s worker limit for '%s' to %d", worker_type, node_key, value)
+        Tdarr only allows limits to be changed one step at a time, so the steps for all changes are sent
+        concurrently, up to WORKER_LIMIT_MAX_CONCURRENT_REQUESTS at once. The limits are then read back from the
+        server to confirm the result of each change.
 
-        current_node_data = (await self.async_get_nodes()).get(node_key, {})
-        if not current_node_data:
-            raise HomeAssistantError("Could not determine current worker limit. Node looks to be offline.")
+        The number of steps is worked out from limits read from the server once any other change to the same limits
+        has finished, so that changes made since node data was last retrieved are not stepped past the target.
 
-        current_worker_limit = current_node_data.get('workerLimits', {}).get(worker_type)
-        if current_worker_limit is None:
-            raise HomeAssistantError("Could not determine current worker limit.")
+        args:
+            limits: The target limit for each worker type, keyed by the internal ID of the node for the integration.
+        """
+        for node_limits in limits.values():
+            for worker_type, value in node_limits.items():
+                if value < 0:
+                    raise HomeAssistantError("Worker limit cannot be negative.")
+                if worker_type not in WORKER_TYPES:
+                    raise HomeAssistantError(f"Worker type must be one of {', '.join(WORKER_TYPES)}")
+
+        results = [
+            TdarrWorkerLimitResult(node_key, worker_type, value)
+            for node_key, node_limits in limits.items()
+            for worker_type, value in node_limits.items()
+        ]
+        async with self._async_lock_worker_limits(results):
+            # Refresh the current limits, ignoring any request sent before earlier changes were made
+            try:
+                await self.async_get_nodes(join=False)
+            except HomeAssistantError as e:
+                _LOGGER.warning("Unable to retrieve current worker limits: %s", e)
+                for result in results:
+                    result.error = str(e)
+                return results
+
+            semaphore = asyncio.Semaphore(WORKER_LIMIT_MAX_CONCURRENT_REQUESTS)
+            await asyncio.gather(*[self._async_step_worker_limit(result, semaphore) for result in results])
+
+            # Read back the limits to confirm the changes
+            try:
+                nodes = await self.async_get_nodes(join=False)
+            except HomeAssistantError as e:
+                nodes = {}
+                _LOGGER.warning("Unable to verify worker limits: %s", e)
+
+        for result in results:
+            result.actual = nodes.get(result.node_key, {}).get("workerLimits", {}).get(result.worker_type)
+            if result.error is None and result.actual is None:
+                result.error = "Unable to read back the updated worker limit."
+            if result.success:
+                _LOGGER.info("Worker %s limit for '%s' updated to %d", result.worker_type, result.node_key, result.target)
+            else:
+                _LOGGER.warning(
+                    "Worker %s limit for '%s' is %s after changing from %s to %s: %s",
+                    result.worker_type, result.node_key, result.actual, result.previous, result.target, result.error)
 
-        process = ''
-        if current_worker_limit < value:
-            process = 'increase'
-        elif current_worker_limit > value:
-            process = 'decrease'
-        else:
-            _LOGGER.warning("Worker %s limit for '%s' is already at %s", worker_type, node_key, value)
-            return
+        return results
 
-        difference = abs(current_worker_limit - value)
+    @asynccontextmanager
+    async def _async_lock_worker_limits(self, results: List[TdarrWorkerLimitResult]) -> AsyncIterator[None]:
+        """Hold the lock for each node and worker type being changed, so changes to the same limit are not interleaved.
+
+        Locks are always acquired in the same order so that overlapping changes cannot deadlock.
+        """
+        async with AsyncExitStack() as stack:
+            for key in sorted({(result.node_key, result.worker_type) for result in results}):
+                await stack.enter_async_context(self._worker_limit_locks[key])
+            yield
+
+    async def _async_step_worker_limit(self, result: TdarrWorkerLimitResult, semaphore: asyncio.Semaphore) -> TdarrWorkerLimitResult:
+        """Step a worker limit to its target from the limit in the node index, which must have just been refreshed."""
+        node_key = result.node_key
+        worker_type = result.worker_type
+        try:
+            entry = await self._async_get_node_index_entry(node_key)
+        except HomeAssistantError as e:
+            result.error = str(e)
+            return result
+
+        result.previous = entry.worker_limits.get(worker_type)
+        if result.previous is None:
+            result.error = "Could not determine current worker limit."
+            return result
+
+        difference = abs(result.target - result.previous)
+        if difference == 0:
+            _LOGGER.debug("Worker %s limit for '%s' is already at %s", worker_type, node_key, result.target)
+            return result
+
+        process = 'increase' if result.previous < result.target else 'decrease'
         _LOGGER.debug("Stepping %s worker limit for %s by %d %s", worker_type, node_key, difference, process)
 
-        data = {
-            'data': {
-                'nodeID': current_node_data['_id'],
-                'process': process,
-                'workerType': worker_type
+        def payload_fn(node_id: str) -> dict:
+            return {
+                'data': {
+                    'nodeID': node_id,
+                    'process': process,
+                    'workerType': worker_type
+                }
             }
-        }
+
+        async def async_step(node_id: str) -> None:
+            async with semaphore:
+                response = await self._async_request('POST', 'alter-worker-limit', payload_fn(node_id))
+            if response.status >= 400:
+                raise HomeAssistantError(f"Error response received: {response.status} {response.reason}")
+
         try:
-            for i in range(difference):
-                _LOGGER.debug("Step %d...", (i + 1))
-                await self._session.post('alter-worker-limit', json=data)
-            _LOGGER.info("Worker limit updated.")
+            # The first step resolves the node ID, retrying if it has changed
+            async with semaphore:
+                response = await self._async_node_write(node_key, 'alter-worker-limit', payload_fn)
+            if response.status >= 400:
+                raise HomeAssistantError(f"Error response received: {response.status} {response.reason}")
+
+            node_id = self.node_index.get(node_key).node_id
+            step_results = await asyncio.gather(
+                *[async_step(node_id) for _ in range(difference - 1)],
+                return_exceptions=True
+            )
+            errors = [r for r in step_results if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
         except Exception as e:
-            raise HomeAssistantError("Error while updating worker limit. Potentially only partially updated.") from e
+            result.error = f"Error while updating worker limit: {e}"
+
+        return result
 
     async def async_scan_library(self, library_name, mode):
         _LOGGER.debug("Scanning library '%s' using mode '%s' for %s", library_name, mode, self._id)
@@ -325,35 +758,83 @@ class TdarrApiClient(object):
         }
 
         try:
-            response = await self._session.post('scan-files', json=data)
+            response = await self._async_request('POST', 'scan-files', data)
         except aiohttp.ClientError as e:
             raise HomeAssistantError(f"Error starting library scan for '{library_name}': {e}") from e
 
         if response.status >= 400:
             raise HomeAssistantError(f"Error response received starting library scan for '{library_name}': {response.status} {response.reason}")
 
-        response_text = await response.text()
-        if response_text.casefold() != "OK".casefold():
-            raise HomeAssistantError(f"Unexpected response starting library scan: {response_text}")
+        if response.text.casefold() != "OK".casefold():
+            raise HomeAssistantError(f"Unexpected response starting library scan: {response.text}")
 
     async def async_cancel_worker_item(self, node_name: str, worker_id: str, reason: str) -> None:
-        node_id = await self.async_get_node_id(node_name)
-        data = {
-            "data": {
-                "nodeID": node_id,
-                "workerID": worker_id,
-                "cause": reason or "user"
+        def payload_fn(node_id: str) -> dict:
+            return {
+                "data": {
+                    "nodeID": node_id,
+                    "workerID": worker_id,
+                    "cause": reason or "user"
+                }
             }
-        }
 
         try:
-            response = await self._session.post("cancel-worker-item", json=data)
+            response = await self._async_node_write(node_name, 'cancel-worker-item', payload_fn)
         except aiohttp.ClientError as e:
             raise HomeAssistantError(f"Error cancelling worker item: {e}") from e
 
         if response.status >= 400:
             raise HomeAssistantError(f"Error response recieved cancelling worker item: {response.status} {response.reason}")
 
-        response_text = await response.text()
-        if response_text.casefold() != "OK".casefold():
-            raise HomeAssistantError(f"Unexpected response cancelling worker item: {response_text}")
+        if response.text.casefold() != "OK".casefold():
+            raise HomeAssistantError(f"Unexpected response cancelling worker item: {response.text}")
+
+    async def async_stop_nodes(self, node_keys: List[str], worker_types: List[str] | None = None, reason: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """Pause nodes and cancel their running workers.
+
+        Workers are found from a single retrieval of node data, then all pause and cancel requests are sent
+        concurrently. Failures are reported per node and per worker rather than raised.
+
+        args:
+            node_keys: The internal IDs of the nodes for the integration. These are usually the node names.
+            worker_types: Only cancel workers of these types. All workers are cancelled if not provided.
+            reason: The reason for cancelling the workers. Shown in the Tdarr logs.
+        """
+        if worker_types:
+            invalid_worker_types = set(worker_types).difference(WORKER_TYPES)
+            if invalid_worker_types:
+                raise HomeAssistantError(f"Worker type must be one of {', '.join(WORKER_TYPES)}")
+
+        _LOGGER.info("Stopping nodes %s for %s", node_keys, self._id)
+        nodes = await self.async_get_nodes(join=False)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        requests: List[Tuple[Dict[str, Any], str, Awaitable]] = []
+        for node_key in node_keys:
+            node_result = results[node_key] = {"paused": False, "error": None, "workers": {}}
+            node_data = nodes.get(node_key)
+            if node_data is None:
+                node_result["error"] = f"Node '{node_key}' not found. Node looks to be offline."
+                continue
+
+            requests.append((node_result, "paused", self.async_update_node(node_key, "nodePaused", True)))
+            for worker_id, worker_data in node_data.get("workers", {}).items():
+                worker_type = worker_data.get("workerType")
+                if worker_types and worker_type not in worker_types:
+                    continue
+                worker_result = node_result["workers"][worker_id] = {
+                    "worker_type": worker_type,
+                    "file": worker_data.get("file"),
+                    "cancelled": False,
+                    "error": None,
+                }
+                requests.append((worker_result, "cancelled", self.async_cancel_worker_item(node_key, worker_id, reason)))
+
+        outcomes = await asyncio.gather(*[request for _, _, request in requests], return_exceptions=True)
+        for (result, success_key, _), outcome in zip(requests, outcomes):
+            if isinstance(outcome, Exception):
+                result["error"] = str(outcome)
+            else:
+                result[success_key] = True
+
+        return results
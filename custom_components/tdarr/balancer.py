@@ -0,0 +1,408 @@
+"""Automatic adjustment of node worker limits based on node resource usage and throughput."""
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    List,
+    Set,
+    Tuple,
+)
+
+from homeassistant.util import dt as dt_util
+
+from .summary import (
+    SUMMARY_KEY,
+    get_node_summary,
+)
+from .const import (
+    WORKER_TYPES,
+    WORKER_TYPE_HEALTHCHECK,
+    WORKER_TYPE_TRANSCODE,
+    BALANCER_MODE_DRY_RUN,
+    BALANCER_CHANGE_INTERVAL,
+    WORKER_SPLIT_MODE_RECOMMEND,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight of each new sample in the rolling throughput, so roughly the last 1 / weight samples count
+THROUGHPUT_WEIGHT = 0.2
+# Samples of both the CPU and GPU worker type needed before their throughput is compared
+THROUGHPUT_MIN_SAMPLES = 10
+
+
+@dataclass(frozen=True)
+class TdarrBalancerConfig:
+    """Targets for the worker balancer, from the integration options"""
+
+    target_cpu: float = 80 # Percent
+    hysteresis: float = 10 # Percent either side of the targets within which limits are left alone
+    max_memory: float = 90 # Percent
+    farm_max_workers: int = 0 # Total of all worker limits across the farm. 0 for no maximum.
+    change_interval: float = BALANCER_CHANGE_INTERVAL # Seconds to let a change take effect before changing a node again
+
+
+@dataclass
+class TdarrLimitChange:
+    """A change to the worker limit of a node made or proposed by the balancer"""
+
+    node_key: str
+    worker_type: str
+    previous: int
+    target: int
+    reason: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "node": self.node_key,
+            "worker_type": self.worker_type,
+            "previous": self.previous,
+            "target": self.target,
+            "reason": self.reason,
+        }
+
+
+@dataclass
+class TdarrNodeLoad:
+    """Resource usage and worker throughput of a node"""
+
+    node_key: str
+    cpu_percent: float
+    memory_percent: float
+    limits: Dict[str, int]
+    workers: Dict[str, int]
+    fps: Dict[str, float]
+
+    def get_fps_per_worker(self, worker_type: str) -> float:
+        workers = self.workers.get(worker_type, 0)
+        return self.fps.get(worker_type, 0) / workers if workers else 0
+
+    def get_idle(self, worker_type: str) -> int:
+        """Get the number of workers allowed by the limit which are not running."""
+        return max(0, self.limits.get(worker_type, 0) - self.workers.get(worker_type, 0))
+
+    def is_saturated(self, worker_type: str) -> bool:
+        """Whether every worker allowed by the limit is busy, so the limit is holding the node back."""
+        limit = self.limits.get(worker_type, 0)
+        return limit > 0 and self.workers.get(worker_type, 0) >= limit
+
+
+def get_node_load(node_key: str, node_data: dict) -> TdarrNodeLoad | None:
+    """Get the load of a node, or None if the node does not report enough to be balanced."""
+    if node_data.get("nodePaused"):
+        return None
+    limits = node_data.get("workerLimits")
+    cpu_raw = node_data.get("resStats", {}).get("os", {}).get("cpuPerc")
+    summary = get_node_summary(node_data)
+    if not isinstance(limits, dict) or cpu_raw is None or summary.memory_percent is None:
+        return None
+    try:
+        cpu_percent = float(cpu_raw)
+    except (TypeError, ValueError):
+        return None
+
+    return TdarrNodeLoad(
+        node_key,
+        cpu_percent,
+        summary.memory_percent,
+        { worker_type: limits[worker_type] for worker_type in WORKER_TYPES if isinstance(limits.get(worker_type), int) },
+        { worker_type: summary.get_workers(worker_type) for worker_type in WORKER_TYPES },
+        { worker_type: summary.get_fps(worker_type) for worker_type in WORKER_TYPES },
+    )
+
+
+class TdarrLimitAdjuster(ABC):
+    """Base for automatic changes to node worker limits, recording the changes made or, in dry run mode, proposed"""
+
+    def __init__(self, mode: str, change_interval: float):
+        self.mode = mode
+        self.change_interval = change_interval
+        self.changes: List[TdarrLimitChange] = [] # Changes proposed by the last dry run or last made
+        self.total_changes = 0 # Changes confirmed to have been made
+        self.last_evaluated: datetime | None = None
+        self._last_change: Dict[str, float] = {} # Time of the last confirmed change to each node
+        self._unconfirmed: Set[Tuple[str, str]] = set() # Node and worker type of changes still being made
+
+    @property
+    @abstractmethod
+    def dry_run(self) -> bool:
+        """Whether changes are only reported rather than made, depending on the mode."""
+
+    def is_settling(self, node_key: str, now: float) -> bool:
+        """Whether a node is being changed, or was changed too recently to measure the effect of the change."""
+        if any(changing == node_key for changing, _ in self._unconfirmed):
+            return True
+        return now - self._last_change.get(node_key, float("-inf")) < self.change_interval
+
+    def record_result(self, change: TdarrLimitChange, success: bool, now: float) -> None:
+        """Record whether a change was made, so that a node only settles after a change which was verified."""
+        self._unconfirmed.discard((change.node_key, change.worker_type))
+        if success:
+            self.total_changes += 1
+            self._last_change[change.node_key] = now
+
+    def _record(self, changes: List[TdarrLimitChange], now: float) -> None:
+        # Dry runs propose the same changes every refresh until the load changes, so only log new proposals
+        proposed = {(change.node_key, change.worker_type, change.target) for change in self.changes}
+        logged = changes if not self.dry_run else [
+            change for change in changes
+            if (change.node_key, change.worker_type, change.target) not in proposed
+        ]
+        if self.dry_run or changes:
+            self.changes = changes
+        if not self.dry_run:
+            self._unconfirmed.update((change.node_key, change.worker_type) for change in changes)
+        self.last_evaluated = dt_util.utcnow()
+        for change in logged:
+            _LOGGER.info(
+                "%s %s worker limit for '%s' from %d to %d: %s",
+                "Would change" if self.dry_run else "Changing",
+                change.worker_type, change.node_key, change.previous, change.target, change.reason)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "last_evaluated": self.last_evaluated.isoformat() if self.last_evaluated else None,
+            "changes": [change.as_dict() for change in self.changes],
+            "total_changes": self.total_changes,
+        }
+
+
+class TdarrWorkerBalancer(TdarrLimitAdjuster):
+    """Raises and lowers node worker limits to keep each node close to a target CPU utilisation.
+
+    A node above the CPU target plus the hysteresis, or above the memory maximum, has the limit lowered for the CPU
+    worker type producing the fewest frames per second per running worker. A node below the CPU target minus the
+    hysteresis has the limit raised for a worker type whose workers are all in use, preferring the type producing
+    the most frames per second per worker, as long as the farm stays within its maximum number of workers. Nodes
+    over the farm maximum first lose workers which are not in use. Only one limit of a node is changed at a time, and
+    not again until the change interval has passed, so the effect of a change is measured before making another.
+
+    In dry run mode changes are only reported.
+    """
+
+    def __init__(self, mode: str, config: TdarrBalancerConfig):
+        super().__init__(mode, config.change_interval)
+        self.config = config
+
+    @property
+    def dry_run(self) -> bool:
+        return self.mode == BALANCER_MODE_DRY_RUN
+
+    def evaluate(self, nodes: Dict[str, dict], now: float) -> List[TdarrLimitChange]:
+        """Get the worker limit changes to make for the current node data."""
+        loads = [
+            load for node_key, node_data in nodes.items()
+            if node_key != SUMMARY_KEY and isinstance(node_data, dict) and (load := get_node_load(node_key, node_data))
+        ]
+        farm_workers = sum(sum(load.limits.values()) for load in loads)
+        farm_max = self.config.farm_max_workers
+
+        changes: List[TdarrLimitChange] = []
+        # Nodes under the most pressure are considered first, so they are first to be lowered when over the maximum
+        for load in sorted(loads, key=lambda load: -load.cpu_percent):
+            if self.is_settling(load.node_key, now):
+                continue
+            over_farm_max = farm_max > 0 and farm_workers > farm_max
+            change = self._get_node_change(load, over_farm_max, farm_max <= 0 or farm_workers < farm_max)
+            if change is None:
+                continue
+            farm_workers += change.target - change.previous
+            changes.append(change)
+
+        self._record(changes, now)
+        return changes
+
+    def _get_node_change(self, load: TdarrNodeLoad, over_farm_max: bool, can_raise: bool) -> TdarrLimitChange | None:
+        config = self.config
+        reason = None
+        if load.memory_percent > config.max_memory:
+            reason = f"memory {load.memory_percent:.0f}% above {config.max_memory:.0f}%"
+            candidates = list(WORKER_TYPES)
+        elif load.cpu_percent > config.target_cpu + config.hysteresis:
+            reason = f"CPU {load.cpu_percent:.0f}% above {config.target_cpu + config.hysteresis:.0f}%"
+            # GPU workers put little load on the CPU, so only lower them if no CPU workers are running
+            candidates = [worker_type for worker_type in WORKER_TYPES if worker_type.endswith("cpu") and load.workers.get(worker_type)]
+            if not candidates:
+                candidates = list(WORKER_TYPES)
+
+        if reason is not None:
+            # Lowering a limit only reduces load once it is below the number of running workers
+            candidates = [worker_type for worker_type in candidates if load.limits.get(worker_type, 0) > 0 and load.workers.get(worker_type)]
+            if not candidates:
+                return None
+            worker_type = min(candidates, key=load.get_fps_per_worker)
+            limit = load.limits[worker_type]
+            return TdarrLimitChange(load.node_key, worker_type, limit, min(limit, load.workers[worker_type]) - 1, reason)
+
+        if over_farm_max:
+            # Remove unused workers first
+            candidates = [worker_type for worker_type in WORKER_TYPES if load.limits.get(worker_type, 0) > 0]
+            if not candidates:
+                return None
+            worker_type = max(candidates, key=lambda worker_type: (load.get_idle(worker_type), -load.get_fps_per_worker(worker_type)))
+            limit = load.limits[worker_type]
+            return TdarrLimitChange(load.node_key, worker_type, limit, limit - 1, f"farm above {config.farm_max_workers} workers")
+
+        if not can_raise:
+            return None
+        if load.cpu_percent >= config.target_cpu - config.hysteresis or load.memory_percent >= config.max_memory - config.hysteresis:
+            return None
+        candidates = [worker_type for worker_type in WORKER_TYPES if load.is_saturated(worker_type)]
+        if not candidates:
+            return None
+        # Prefer the type producing the most frames per worker, then transcodes over health checks
+        worker_type = max(candidates, key=lambda worker_type: (load.get_fps_per_worker(worker_type), worker_type.startswith(WORKER_TYPE_TRANSCODE)))
+        limit = load.limits[worker_type]
+        return TdarrLimitChange(
+            load.node_key, worker_type, limit, limit + 1,
+            f"CPU {load.cpu_percent:.0f}% below {config.target_cpu - config.hysteresis:.0f}% with all {worker_type} workers busy")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "target_cpu": self.config.target_cpu,
+            "hysteresis": self.config.hysteresis,
+            "max_memory": self.config.max_memory,
+            "farm_max_workers": self.config.farm_max_workers,
+        }
+
+
+@dataclass
+class TdarrThroughputStats:
+    """Rolling throughput of a worker type on a node"""
+
+    fps_per_worker: float = 0 # Exponentially weighted moving average
+    samples: int = 0
+
+    def add(self, fps_per_worker: float, weight: float) -> None:
+        if self.samples == 0:
+            self.fps_per_worker = fps_per_worker
+        else:
+            self.fps_per_worker += weight * (fps_per_worker - self.fps_per_worker)
+        self.samples += 1
+
+
+class TdarrThroughputTracker(object):
+    """Rolling frames per second per worker for each worker type of each node.
+
+    A sample is added for each worker type with running workers whenever node data is received. Recent samples carry
+    the most weight, so the averages follow changes such as a GPU being shared by more workers.
+    """
+
+    def __init__(self, weight: float = THROUGHPUT_WEIGHT):
+        self.weight = weight
+        self.stats: Dict[str, Dict[str, TdarrThroughputStats]] = {}
+
+    def add_samples(self, nodes: Dict[str, dict]) -> None:
+        for node_key, node_data in nodes.items():
+            if node_key == SUMMARY_KEY or not isinstance(node_data, dict):
+                continue
+            summary = get_node_summary(node_data)
+            node_stats = self.stats.setdefault(node_key, {})
+            for worker_type in WORKER_TYPES:
+                workers = summary.get_workers(worker_type)
+                if workers:
+                    node_stats.setdefault(worker_type, TdarrThroughputStats()).add(summary.get_fps(worker_type) / workers, self.weight)
+
+        for node_key in self.stats.keys() - nodes.keys():
+            del self.stats[node_key]
+
+    def get(self, node_key: str, worker_type: str) -> TdarrThroughputStats | None:
+        return self.stats.get(node_key, {}).get(worker_type)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            node_key: {
+                worker_type: { "fps_per_worker": round(stats.fps_per_worker, 1), "samples": stats.samples }
+                for worker_type, stats in node_stats.items()
+            }
+            for node_key, node_stats in self.stats.items()
+        }
+
+
+class TdarrWorkerSplitter(TdarrLimitAdjuster):
+    """Shifts worker limits of a node between its CPU and GPU worker types, towards the type with more throughput.
+
+    Transcodes and health checks are compared separately, once the rolling frames per second per worker of both the
+    CPU and GPU type have enough samples. If one is faster than the other by more than the margin, one worker is moved
+    to it from the slower type, keeping the total for the node the same. At least one worker of each type is kept so
+    that both continue to be measured, and types with a limit of 0 are left alone. As workers are added to the faster
+    type its throughput per worker falls, until the two are within the margin.
+
+    In recommend mode changes are only reported.
+    """
+
+    def __init__(self, mode: str, margin: float, min_samples: int = THROUGHPUT_MIN_SAMPLES, change_interval: float = BALANCER_CHANGE_INTERVAL):
+        super().__init__(mode, change_interval)
+        self.margin = margin # Percent
+        self.min_samples = min_samples
+        self.throughput = TdarrThroughputTracker()
+
+    @property
+    def dry_run(self) -> bool:
+        return self.mode == WORKER_SPLIT_MODE_RECOMMEND
+
+    def evaluate(self, nodes: Dict[str, dict], now: float, exclude: Set[str] = frozenset()) -> List[TdarrLimitChange]:
+        """Add throughput samples from new node data and get the worker limit changes to make.
+
+        args:
+            exclude: Nodes being changed by something else, which are left alone until measured again.
+        """
+        self.throughput.add_samples(nodes)
+
+        changes: List[TdarrLimitChange] = []
+        for node_key, node_data in nodes.items():
+            if node_key == SUMMARY_KEY or not isinstance(node_data, dict) or node_data.get("nodePaused"):
+                continue
+            if node_key in exclude or self.is_settling(node_key, now):
+                continue
+            limits = node_data.get("workerLimits")
+            if not isinstance(limits, dict):
+                continue
+            # Only one shift per node at a time, so the effect of each is measured
+            for category in (WORKER_TYPE_TRANSCODE, WORKER_TYPE_HEALTHCHECK):
+                shift = self._get_shift(node_key, limits, category)
+                if shift:
+                    changes.extend(shift)
+                    break
+
+        self._record(changes, now)
+        return changes
+
+    def _get_shift(self, node_key: str, limits: Dict[str, int], category: str) -> List[TdarrLimitChange]:
+        cpu_type = f"{category}cpu"
+        gpu_type = f"{category}gpu"
+        cpu = self.throughput.get(node_key, cpu_type)
+        gpu = self.throughput.get(node_key, gpu_type)
+        if not cpu or not gpu or min(cpu.samples, gpu.samples) < self.min_samples:
+            return []
+
+        ratio = 1 + self.margin / 100
+        if gpu.fps_per_worker > cpu.fps_per_worker * ratio:
+            faster, slower, fast, slow = gpu_type, cpu_type, gpu, cpu
+        elif cpu.fps_per_worker > gpu.fps_per_worker * ratio:
+            faster, slower, fast, slow = cpu_type, gpu_type, cpu, gpu
+        else:
+            return []
+
+        fast_limit = limits.get(faster)
+        slow_limit = limits.get(slower)
+        if not isinstance(fast_limit, int) or not isinstance(slow_limit, int) or fast_limit < 1 or slow_limit <= 1:
+            return []
+
+        reason = f"{faster} {fast.fps_per_worker:.0f} fps per worker, {slower} {slow.fps_per_worker:.0f} fps per worker"
+        return [
+            TdarrLimitChange(node_key, slower, slow_limit, slow_limit - 1, reason),
+            TdarrLimitChange(node_key, faster, fast_limit, fast_limit + 1, reason),
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "margin": self.margin,
+            "throughput": self.throughput.as_dict(),
+        }
@@ -11,6 +11,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
     BinarySensorDeviceClass,
 )
+from homeassistant.core import callback
 
 from . import (
     TdarrServerEntity,
@@ -20,6 +21,7 @@ from .coordinator import TdarrDataUpdateCoordinator
 from .const import (
     DOMAIN,
     COORDINATOR,
+    SECTION_NODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -54,12 +56,22 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         sensors.append(TdarrServerBinarySensor(entry, config_entry.options, description))
 
     # Node Binary Sensors
-    for node_id in entry.data["nodes"]:
-        for description in NODE_ENTITY_DESCRIPTIONS:
-            sensors.append(TdarrNodeBinarySensor(entry, node_id, config_entry.options, description))
+    def create_item_entities(section: str, key: str) -> list:
+        if section != SECTION_NODES:
+            return []
+        return [TdarrNodeBinarySensor(entry, key, config_entry.options, description) for description in NODE_ENTITY_DESCRIPTIONS]
+
+    for node_id in entry.data.get("nodes", {}):
+        sensors.extend(create_item_entities(SECTION_NODES, node_id))
 
     async_add_entities(sensors, True)
 
+    @callback
+    def async_add_items(section: str, keys: list[str]) -> None:
+        async_add_entities([entity for key in keys for entity in create_item_entities(section, key)], True)
+
+    config_entry.async_on_unload(entry.async_add_items_listener(async_add_items))
+
 
 class TdarrServerBinarySensor(TdarrServerEntity, BinarySensorEntity):
 
@@ -23,9 +23,45 @@ from .const import (
     SERVERPORT,
     UPDATE_INTERVAL,
     UPDATE_INTERVAL_DEFAULT,
+    SECTION_UPDATE_INTERVAL,
+    SECTION_UPDATE_INTERVAL_DEFAULT,
+    SECTIONS,
+    PUSH_UPDATES,
+    PUSH_UPDATES_DEFAULT,
+    FULL_ATTRIBUTES,
+    FULL_ATTRIBUTES_DEFAULT,
+    WORKER_SENSORS,
+    WORKER_SENSORS_DEFAULT,
+    NODE_RETIRE_DELAY,
+    NODE_RETIRE_DELAY_DEFAULT,
+    ADAPTIVE_POLLING,
+    ADAPTIVE_POLLING_DEFAULT,
+    UPDATE_INTERVAL_MIN,
+    UPDATE_INTERVAL_MIN_DEFAULT,
+    UPDATE_INTERVAL_MAX,
+    UPDATE_INTERVAL_MAX_DEFAULT,
+    BALANCER_MODE,
+    BALANCER_MODES,
+    BALANCER_MODE_DEFAULT,
+    BALANCER_TARGET_CPU,
+    BALANCER_TARGET_CPU_DEFAULT,
+    BALANCER_HYSTERESIS,
+    BALANCER_HYSTERESIS_DEFAULT,
+    BALANCER_MAX_MEMORY,
+    BALANCER_MAX_MEMORY_DEFAULT,
+    BALANCER_FARM_MAX_WORKERS,
+    BALANCER_FARM_MAX_WORKERS_DEFAULT,
+    WORKER_SPLIT_MODE,
+    WORKER_SPLIT_MODES,
+    WORKER_SPLIT_MODE_DEFAULT,
+    WORKER_SPLIT_MARGIN,
+    WORKER_SPLIT_MARGIN_DEFAULT,
     APIKEY
 )
-from .api import TdarrApiClient
+from .api import (
+    TdarrApiClient,
+    TdarrResponseError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,11 +80,12 @@ async def validate_input(hass: HomeAssistant, data):
     """
     api_client: TdarrApiClient = TdarrApiClient.from_config(hass, data)
 
-    result = await api_client.async_get_global_settings()
-    if result.get("status", "") == "ERROR":
-        if "Invalid API key" in result["message"]:
+    try:
+        result = await api_client.async_get_global_settings()
+    except TdarrResponseError as e:
+        if "Invalid API key" in e.response.text:
             raise InvalidAPIKEY
-        if "No auth token provided" in result["message"]:
+        if "No auth token provided" in e.response.text:
             raise AuthRequired
         raise ConnectionError
     if not result:
@@ -94,32 +131,97 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
 class OptionsFlowHandler(OptionsFlow):
 
     async def async_step_init(self, user_input=None):
+        errors = {}
         if user_input is not None:
-            if SERVERIP in self.config_entry.data:
-                user_input[SERVERIP] = self.config_entry.data[SERVERIP]
-            if SERVERPORT in self.config_entry.data:
-                user_input[SERVERPORT] = self.config_entry.data[SERVERPORT]
+            if user_input.get(UPDATE_INTERVAL_MIN, UPDATE_INTERVAL_MIN_DEFAULT) > user_input.get(UPDATE_INTERVAL_MAX, UPDATE_INTERVAL_MAX_DEFAULT):
+                errors[UPDATE_INTERVAL_MAX] = "interval_min_above_max"
+        if user_input is not None and not errors:
+            # Connection details are stored in the entry data, everything else is an option.
+            data = dict(self.config_entry.data)
             if APIKEY in user_input:
-                user_input[APIKEY] = user_input[APIKEY].strip()
+                data[APIKEY] = user_input.pop(APIKEY).strip()
             _LOGGER.debug(user_input)
-            self.hass.config_entries.async_update_entry(
-                self.config_entry, data=user_input, options=self.config_entry.options
-            )
-            return self.async_create_entry(title="", data={})
+            self.hass.config_entries.async_update_entry(self.config_entry, data=data)
+            return self.async_create_entry(title="", data=user_input)
         options = {
             vol.Optional(
                 UPDATE_INTERVAL,
                 default=self.config_entry.options.get(
                     UPDATE_INTERVAL, UPDATE_INTERVAL_DEFAULT
                 ),
-            ): int,
+            ): vol.All(int, vol.Range(min=1)),
+            **{
+                vol.Optional(
+                    SECTION_UPDATE_INTERVAL.format(section),
+                    default=self.config_entry.options.get(
+                        SECTION_UPDATE_INTERVAL.format(section), SECTION_UPDATE_INTERVAL_DEFAULT
+                    ),
+                ): vol.All(int, vol.Range(min=0))
+                for section in SECTIONS
+            },
+            vol.Optional(
+                PUSH_UPDATES,
+                default=self.config_entry.options.get(PUSH_UPDATES, PUSH_UPDATES_DEFAULT),
+            ): bool,
+            vol.Optional(
+                ADAPTIVE_POLLING,
+                default=self.config_entry.options.get(ADAPTIVE_POLLING, ADAPTIVE_POLLING_DEFAULT),
+            ): bool,
+            vol.Optional(
+                UPDATE_INTERVAL_MIN,
+                default=self.config_entry.options.get(UPDATE_INTERVAL_MIN, UPDATE_INTERVAL_MIN_DEFAULT),
+            ): vol.All(int, vol.Range(min=1)),
+            vol.Optional(
+                UPDATE_INTERVAL_MAX,
+                default=self.config_entry.options.get(UPDATE_INTERVAL_MAX, UPDATE_INTERVAL_MAX_DEFAULT),
+            ): vol.All(int, vol.Range(min=1)),
+            vol.Optional(
+                FULL_ATTRIBUTES,
+                default=self.config_entry.options.get(FULL_ATTRIBUTES, FULL_ATTRIBUTES_DEFAULT),
+            ): bool,
+            vol.Optional(
+                WORKER_SENSORS,
+                default=self.config_entry.options.get(WORKER_SENSORS, WORKER_SENSORS_DEFAULT),
+            ): bool,
+            vol.Optional(
+                NODE_RETIRE_DELAY,
+                default=self.config_entry.options.get(NODE_RETIRE_DELAY, NODE_RETIRE_DELAY_DEFAULT),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Optional(
+                BALANCER_MODE,
+                default=self.config_entry.options.get(BALANCER_MODE, BALANCER_MODE_DEFAULT),
+            ): vol.In(BALANCER_MODES),
+            vol.Optional(
+                BALANCER_TARGET_CPU,
+                default=self.config_entry.options.get(BALANCER_TARGET_CPU, BALANCER_TARGET_CPU_DEFAULT),
+            ): vol.All(int, vol.Range(min=1, max=100)),
+            vol.Optional(
+                BALANCER_HYSTERESIS,
+                default=self.config_entry.options.get(BALANCER_HYSTERESIS, BALANCER_HYSTERESIS_DEFAULT),
+            ): vol.All(int, vol.Range(min=0, max=50)),
+            vol.Optional(
+                BALANCER_MAX_MEMORY,
+                default=self.config_entry.options.get(BALANCER_MAX_MEMORY, BALANCER_MAX_MEMORY_DEFAULT),
+            ): vol.All(int, vol.Range(min=1, max=100)),
+            vol.Optional(
+                BALANCER_FARM_MAX_WORKERS,
+                default=self.config_entry.options.get(BALANCER_FARM_MAX_WORKERS, BALANCER_FARM_MAX_WORKERS_DEFAULT),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Optional(
+                WORKER_SPLIT_MODE,
+                default=self.config_entry.options.get(WORKER_SPLIT_MODE, WORKER_SPLIT_MODE_DEFAULT),
+            ): vol.In(WORKER_SPLIT_MODES),
+            vol.Optional(
+                WORKER_SPLIT_MARGIN,
+                default=self.config_entry.options.get(WORKER_SPLIT_MARGIN, WORKER_SPLIT_MARGIN_DEFAULT),
+            ): vol.All(int, vol.Range(min=0)),
             vol.Optional(
                 APIKEY,
                 default=self.config_entry.data.get(APIKEY, "")
             ): str,
         }
 
-        return self.async_show_form(step_id="init", data_schema=vol.Schema(options))
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(options), errors=errors)
 
 class InvalidAPIKEY(HomeAssistantError):
     """Error to indicate the wrong API key was entered"""
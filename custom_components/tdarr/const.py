@@ -4,8 +4,51 @@ MANUFACTURER = "Tdarr"
 SERVERPORT = "serverport"
 UPDATE_INTERVAL = "update_interval"
 UPDATE_INTERVAL_DEFAULT = 60
+SECTION_UPDATE_INTERVAL = "update_interval_{}"
+SECTION_UPDATE_INTERVAL_DEFAULT = 0 # Use UPDATE_INTERVAL
 COORDINATOR = "coordinator"
+PUSH_UPDATES = "push_updates"
+PUSH_UPDATES_DEFAULT = False
+FULL_ATTRIBUTES = "full_attributes"
+FULL_ATTRIBUTES_DEFAULT = False
+WORKER_SENSORS = "worker_sensors"
+WORKER_SENSORS_DEFAULT = False
+NODE_RETIRE_DELAY = "node_retire_delay"
+NODE_RETIRE_DELAY_DEFAULT = 60 # Minutes. 0 to keep entities for missing nodes indefinitely.
+ADAPTIVE_POLLING = "adaptive_polling"
+ADAPTIVE_POLLING_DEFAULT = False
+UPDATE_INTERVAL_MIN = "update_interval_min"
+UPDATE_INTERVAL_MIN_DEFAULT = 10 # Interval while workers are active or a scan is running
+UPDATE_INTERVAL_MAX = "update_interval_max"
+UPDATE_INTERVAL_MAX_DEFAULT = 600 # Limit of the back off while idle or failing
+BALANCER_MODE = "balancer_mode"
+BALANCER_MODE_OFF = "off"
+BALANCER_MODE_DRY_RUN = "dry_run"
+BALANCER_MODE_AUTO = "auto"
+BALANCER_MODES = [BALANCER_MODE_OFF, BALANCER_MODE_DRY_RUN, BALANCER_MODE_AUTO]
+BALANCER_MODE_DEFAULT = BALANCER_MODE_OFF
+BALANCER_TARGET_CPU = "balancer_target_cpu"
+BALANCER_TARGET_CPU_DEFAULT = 80 # Percent
+BALANCER_HYSTERESIS = "balancer_hysteresis"
+BALANCER_HYSTERESIS_DEFAULT = 10 # Percent
+BALANCER_MAX_MEMORY = "balancer_max_memory"
+BALANCER_MAX_MEMORY_DEFAULT = 90 # Percent
+BALANCER_FARM_MAX_WORKERS = "balancer_farm_max_workers"
+BALANCER_FARM_MAX_WORKERS_DEFAULT = 0 # 0 for no maximum
+BALANCER_CHANGE_INTERVAL = 300 # Seconds between changes to the limits of a node
+WORKER_SPLIT_MODE = "worker_split_mode"
+WORKER_SPLIT_MODE_OFF = "off"
+WORKER_SPLIT_MODE_RECOMMEND = "recommend"
+WORKER_SPLIT_MODE_AUTO = "auto"
+WORKER_SPLIT_MODES = [WORKER_SPLIT_MODE_OFF, WORKER_SPLIT_MODE_RECOMMEND, WORKER_SPLIT_MODE_AUTO]
+WORKER_SPLIT_MODE_DEFAULT = WORKER_SPLIT_MODE_OFF
+WORKER_SPLIT_MARGIN = "worker_split_margin"
+WORKER_SPLIT_MARGIN_DEFAULT = 25 # Percent more frames per second per worker needed to shift a worker
+SIGNAL_ITEMS_ADDED = "tdarr_{}_items_added"
+SIGNAL_ITEMS_REMOVED = "tdarr_{}_items_removed"
 APIKEY = "apikey"
+SNAPSHOT_STORAGE_KEY = "tdarr.{}.snapshot"
+SNAPSHOT_STORAGE_VERSION = 1
 
 WORKER_TYPE_HEALTHCHECK="healthcheck"
 WORKER_TYPE_TRANSCODE="transcode"
@@ -14,4 +57,41 @@ WORKER_TYPES=[
     f'{WORKER_TYPE_HEALTHCHECK}gpu',
     f'{WORKER_TYPE_TRANSCODE}cpu',
     f'{WORKER_TYPE_TRANSCODE}gpu'
-]
\ No newline at end of file
+]
+
+SECTION_SERVER="server"
+SECTION_NODES="nodes"
+SECTION_STATS="stats"
+SECTION_COUNTS="counts"
+SECTION_LIBRARIES="libraries"
+SECTION_GLOBAL_SETTINGS="globalsettings"
+SECTIONS=[
+    SECTION_SERVER,
+    SECTION_NODES,
+    SECTION_STATS,
+    SECTION_COUNTS,
+    SECTION_LIBRARIES,
+    SECTION_GLOBAL_SETTINGS,
+]
+# Sections of coordinator data derived from a fetched section, which share its availability
+SECTION_WORKERS="workers"
+DERIVED_SECTIONS={
+    SECTION_WORKERS: SECTION_NODES,
+}
+
+# Queue tables which can be paged through, with the status table ID used by the Tdarr UI.
+# Staged files use a separate endpoint so have no table ID.
+QUEUE_TABLE_STAGED="staged"
+QUEUE_TABLES={
+    QUEUE_TABLE_STAGED: None,
+    "transcode_queue": "table1",
+    "transcode_success": "table2",
+    "transcode_error": "table3",
+    "healthcheck_queue": "table4",
+    "healthcheck_success": "table5",
+    "healthcheck_error": "table6",
+}
+QUEUE_PAGE_SIZE_DEFAULT=250
+QUEUE_CONCURRENCY_DEFAULT=2
+QUEUE_SERVICE_LIMIT_DEFAULT=100
+QUEUE_SERVICE_LIMIT_MAX=1000
@@ -1,12 +1,32 @@
 """The Tdarr integration coordinator components."""
 import asyncio
 import logging
-from datetime import timedelta
-from typing import Dict
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+)
 
 import async_timeout
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -15,72 +35,632 @@ from homeassistant.helpers.update_coordinator import (
 from .const import (
     DOMAIN,
     SERVERIP,
+    SECTION_SERVER,
+    SECTION_NODES,
+    SECTION_STATS,
+    SECTION_COUNTS,
+    SECTION_LIBRARIES,
+    SECTION_GLOBAL_SETTINGS,
+    SECTIONS,
+    SECTION_WORKERS,
+    DERIVED_SECTIONS,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+    SIGNAL_ITEMS_ADDED,
+    SIGNAL_ITEMS_REMOVED,
 )
 
 from .api import TdarrApiClient
+from .balancer import (
+    TdarrLimitAdjuster,
+    TdarrLimitChange,
+    TdarrWorkerBalancer,
+    TdarrWorkerSplitter,
+)
+from .history import (
+    HISTORY_SECTIONS,
+    TdarrHistory,
+)
+from .resilience import (
+    REQUEST_LIBRARY_PIES,
+    REQUEST_LIBRARY_SETTINGS,
+    TdarrCircuitOpenError,
+    get_retry_policy,
+)
+from .workers import TdarrWorkerSlots
+from .summary import (
+    SUMMARY_KEY,
+    summarise_nodes,
+)
+from .push import (
+    PUSH_EVENTS,
+    PUSH_SECTIONS,
+    TdarrPushClient,
+    TdarrPushError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Allowance for scheduling jitter when deciding if a section is due for refresh
+SECTION_REFRESH_TOLERANCE = 1
+SECTION_TIMEOUT = 30
+# Sections which wait for one request before making the next, so need longer for the retries of both to finish
+SECTION_TIMEOUTS = {
+    # Library settings, then the pies of every library at once. Allows a second for handling the responses.
+    SECTION_LIBRARIES: max(
+        SECTION_TIMEOUT,
+        get_retry_policy(REQUEST_LIBRARY_SETTINGS).max_duration + get_retry_policy(REQUEST_LIBRARY_PIES).max_duration + 1
+    ),
+}
+# Minimum time in seconds between writes of the snapshot to storage
+SNAPSHOT_SAVE_DELAY = 60
+
+# Sections made up of separately updated items. Listeners can subscribe to a single item in these sections.
+KEYED_SECTIONS = {SECTION_NODES, SECTION_LIBRARIES, SECTION_WORKERS}
+# Sections listeners can be notified of changes to
+LISTENER_SECTIONS = [*SECTIONS, *DERIVED_SECTIONS]
+
+# Sections polled at the minimum adaptive interval while the farm is busy
+ACTIVITY_SECTIONS = {SECTION_NODES, SECTION_COUNTS}
+# Number of seconds after a scan is requested that the farm is treated as busy, as scan progress is not reported
+SCAN_ACTIVITY_DURATION = 600
+# Limit of the exponent of the adaptive back off, far beyond any sensible maximum interval
+ADAPTIVE_BACKOFF_LIMIT = 16
+
+
+@dataclass
+class TdarrSectionState:
+    """Refresh state of a single section of coordinator data."""
+
+    last_update_success: bool = False
+    last_success_time: datetime | None = None
+    last_exception: BaseException | None = None
+    from_snapshot: bool = False # Data was loaded from the snapshot and has not been refreshed since
+
+    @property
+    def stale_seconds(self) -> float | None:
+        """Number of seconds since the section was last successfully refreshed."""
+        if self.last_success_time is None:
+            return None
+        return (dt_util.utcnow() - self.last_success_time).total_seconds()
+
 
 class TdarrDataUpdateCoordinator(DataUpdateCoordinator[dict]):
     """DataUpdateCoordinator to handle fetching new data about the Tdarr Controller."""
 
-    def __init__(self, hass: HomeAssistant, update_interval, config_data):
-        """Initialize the coordinator and set up the Controller object."""
+    def __init__(self, hass: HomeAssistant, update_interval, config_data, section_intervals: Dict[str, int] | None = None, push_updates: bool = False, full_attributes: bool = False, node_retire_delay: int = 0, adaptive_interval: Tuple[int, int] | None = None, balancer: TdarrWorkerBalancer | None = None, splitter: TdarrWorkerSplitter | None = None, worker_sensors: bool = False):
+        """Initialize the coordinator and set up the Controller object.
+
+        args:
+            update_interval: The default interval in seconds between refreshes of each section.
+            section_intervals: Optional interval in seconds per section. Sections without a value use update_interval.
+            push_updates: Whether to receive updates pushed from the server. Pushed sections are still polled as
+                normal, as the events pushed by the server are unconfirmed.
+            full_attributes: Whether entities should include complete Tdarr documents in their attributes rather than
+                a curated subset.
+            node_retire_delay: Number of seconds a node must be missing before its entities and device are removed.
+                0 to never remove them.
+            adaptive_interval: Optional minimum and maximum interval in seconds to adapt polling to farm activity.
+                While workers are active or a scan is running, node and queue data are polled at the minimum. While
+                the farm is idle or the server is failing, intervals back off exponentially up to the maximum.
+            balancer: Optional balancer to adjust worker limits to node resource usage as node data changes.
+            splitter: Optional splitter to shift worker limits between CPU and GPU workers by observed throughput.
+            worker_sensors: Whether to assign workers to slots in the workers section, for entities of each worker.
+        """
         self._hass = hass
 
         self.serverip = config_data[SERVERIP]
         self.tdarr: TdarrApiClient = TdarrApiClient.from_config(hass, config_data)
         self._available = True
+        self.full_attributes = full_attributes
+
+        section_intervals = section_intervals or {}
+        self._section_intervals: Dict[str, int] = {
+            section: section_intervals.get(section) or update_interval
+            for section in SECTIONS
+        }
+        self._section_last_refresh: Dict[str, float] = {}
+        self._adaptive_interval = adaptive_interval
+        self._idle_refreshes = 0
+        self._failed_refreshes = 0
+        self._active_until = 0.0
+        self.balancer = balancer
+        self.splitter = splitter
+        self.history = TdarrHistory()
+        self.worker_slots = TdarrWorkerSlots() if worker_sensors else None
+        self._balanced_time: datetime | None = None # Time of the node data last balanced
+        # Refreshes can be started by the schedule, requests and setup. Only one may fetch at a time.
+        self._refresh_lock = asyncio.Lock()
+        self.section_states: Dict[str, TdarrSectionState] = {section: TdarrSectionState() for section in SECTIONS}
+        self._section_fetchers: Dict[str, Callable[[], Awaitable[Any]]] = {
+            SECTION_SERVER: self.tdarr.async_get_status,
+            SECTION_NODES: self.tdarr.async_get_nodes,
+            SECTION_STATS: self.tdarr.async_get_stats,
+            SECTION_COUNTS: self.tdarr.async_get_queue_counts,
+            SECTION_LIBRARIES: self.tdarr.async_get_libraries,
+            SECTION_GLOBAL_SETTINGS: self.tdarr.async_get_global_settings,
+        }
+
+        # Items in keyed sections which entities have been created for, and when missing nodes were last seen
+        self._known_items: Dict[str, Set[str]] = {section: set() for section in KEYED_SECTIONS}
+        self._node_retire_delay = node_retire_delay
+        self._node_missing_since: Dict[str, float] = {}
+
+        # Data and section states the listeners were last notified of, used to only notify listeners of changes
+        self._notified_data: dict | None = None
+        self._notified_states: Dict[str, Tuple[bool, bool]] = {}
+
+        # Setting changes are shown before they are sent, then the changed section is refreshed once sent
+        self.tdarr.writes.on_change = self._handle_pending_write
+        self.tdarr.writes.on_written = self.async_request_section_refresh
+
+        self._push_client: TdarrPushClient | None = None
+        if push_updates:
+            self._push_client = self.tdarr.create_push_client(self._handle_push_event, self._handle_push_connection_change)
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=self._get_tick_interval({}),
         )
 
-    async def _async_update_data(self):
-        """Fetch data from Tdarr Server."""
+        self._snapshot_store: Store[dict] = Store(
+            hass,
+            SNAPSHOT_STORAGE_VERSION,
+            SNAPSHOT_STORAGE_KEY.format(self.config_entry.entry_id)
+        )
+
+    def get_section_interval(self, section: str, data: dict | None = None) -> int:
+        """Get the current polling interval in seconds for a section.
+
+        args:
+            data: Data to judge farm activity from, if not the current coordinator data.
+        """
+        interval = self._section_intervals[section]
+        if self._adaptive_interval:
+            interval = self._get_adaptive_interval(section, interval, data if data is not None else self.data or {})
+        return interval
+
+    def _get_adaptive_interval(self, section: str, interval: int, data: dict) -> int:
+        min_interval, max_interval = self._adaptive_interval
+        if self._failed_refreshes:
+            backoff = self._failed_refreshes
+        elif self._is_active(data) and section in ACTIVITY_SECTIONS:
+            return min_interval
+        else:
+            backoff = self._idle_refreshes
+        # Backing off never shortens a section configured to poll less often than the maximum
+        return max(min_interval, min(interval * 2 ** backoff, max(max_interval, interval)))
+
+    @property
+    def is_active(self) -> bool:
+        """Whether any workers are active or a scan was recently requested."""
+        return self._is_active(self.data or {})
+
+    def _is_active(self, data: dict) -> bool:
+        if time.monotonic() < self._active_until:
+            return True
+        summary = data.get(SUMMARY_KEY)
+        return bool(summary and summary.get_workers())
+
+    @callback
+    def async_mark_active(self, duration: float = SCAN_ACTIVITY_DURATION) -> None:
+        """Treat the farm as busy for a number of seconds, e.g. after a scan is started."""
+        self._active_until = max(self._active_until, time.monotonic() + duration)
+        self._idle_refreshes = 0
+        self.update_interval = self._get_tick_interval()
+
+    def _update_adaptive_state(self, success: bool, data: dict) -> None:
+        if not self._adaptive_interval:
+            return
+        if not success:
+            self._failed_refreshes = min(self._failed_refreshes + 1, ADAPTIVE_BACKOFF_LIMIT)
+        else:
+            self._failed_refreshes = 0
+            self._idle_refreshes = 0 if self._is_active(data) else min(self._idle_refreshes + 1, ADAPTIVE_BACKOFF_LIMIT)
+        # The refresh is scheduled from update_interval once the update completes
+        self.update_interval = self._get_tick_interval(data)
+
+    def _get_tick_interval(self, data: dict | None = None) -> timedelta:
+        # Poll as often as the most frequent section requires
+        return timedelta(seconds=min(self.get_section_interval(section, data) for section in SECTIONS))
+
+    def get_due_sections(self) -> List[str]:
+        """Get the sections which should be fetched on the next refresh."""
+        now = time.monotonic()
+        return [
+            section for section in SECTIONS
+            if section not in self._section_last_refresh
+            or now - self._section_last_refresh[section] + SECTION_REFRESH_TOLERANCE >= self.get_section_interval(section)
+        ]
+
+    def mark_sections_due(self, *sections: str) -> None:
+        """Force sections to be fetched on the next refresh, regardless of their interval."""
+        for section in sections:
+            self._section_last_refresh.pop(section, None)
+
+    def is_section_available(self, section: str) -> bool:
+        """Check if the most recent refresh of a section, or the section it is derived from, succeeded."""
+        return self.section_states[DERIVED_SECTIONS.get(section, section)].last_update_success
+
+    async def async_request_section_refresh(self, *sections: str) -> None:
+        """Request a refresh which includes the given sections."""
+        self.mark_sections_due(*sections)
+        await self.async_request_refresh()
+
+    @callback
+    def async_start_push(self, entry: ConfigEntry) -> None:
+        """Start receiving pushed updates if enabled. The connection is closed when the entry is unloaded."""
+        if self._push_client:
+            entry.async_create_background_task(
+                self.hass,
+                self._push_client.async_run(),
+                f"{DOMAIN} push updates for {self.serverip}"
+            )
+
+    @callback
+    def _handle_push_connection_change(self, connected: bool) -> None:
+        if not connected and self.data:
+            # Events may have been missed, so poll the pushed sections straight away
+            self.mark_sections_due(*PUSH_SECTIONS)
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _handle_push_event(self, event: str, payload: Any) -> None:
+        if event not in PUSH_EVENTS or not self.data:
+            return
+
+        section, apply_update = PUSH_EVENTS[event]
+        _LOGGER.debug("Received pushed %s update from %s", section, self.serverip)
         try:
-            async with async_timeout.timeout(30):
-                async with asyncio.TaskGroup() as tg:
-                    status = tg.create_task(self.tdarr.async_get_status())
-                    nodes = tg.create_task(self.tdarr.async_get_nodes())
-                    stats = tg.create_task(self.tdarr.async_get_stats())
-                    staged = tg.create_task(self.tdarr.async_get_staged())
-                    libraries = tg.create_task(self.tdarr.async_get_libraries())
-                    global_settings = tg.create_task(self.tdarr.async_get_global_settings())
-
-                data = {
-                    "server": status.result(),
-                    "nodes": nodes.result(),
-                    "stats": stats.result(),
-                    "staged": staged.result(),
-                    "libraries": libraries.result(),
-                    "globalsettings": global_settings.result(),
+            section_data = apply_update(self.data.get(section, {}), payload)
+        except TdarrPushError as e:
+            _LOGGER.debug("Ignoring pushed %s event: %s", event, e)
+            return
+        self.async_set_section_data(section, section_data)
+
+    @callback
+    def async_balance_workers(self) -> None:
+        """Adjust worker limits for newly received node data, or only report the changes in dry run modes."""
+        if not self.data or not self.is_section_available(SECTION_NODES):
+            return
+        # Saved data may be long out of date, and changes shown before they are sent are not new measurements
+        state = self.section_states[SECTION_NODES]
+        if state.from_snapshot or state.last_success_time == self._balanced_time:
+            return
+        self._balanced_time = state.last_success_time
+
+        nodes = self.data.get(SECTION_NODES, {})
+        now = time.monotonic()
+        changes: List[Tuple[TdarrLimitAdjuster, TdarrLimitChange]] = []
+        if self.balancer:
+            balanced = self.balancer.evaluate(nodes, now)
+            if not self.balancer.dry_run:
+                changes.extend((self.balancer, change) for change in balanced)
+        if self.splitter:
+            # Nodes changed by the balancer are measured again before their split is changed
+            split = self.splitter.evaluate(nodes, now, {change.node_key for _, change in changes})
+            if not self.splitter.dry_run:
+                changes.extend((self.splitter, change) for change in split)
+
+        for adjuster, change in changes:
+            self.hass.async_create_task(self._async_apply_limit_change(adjuster, change))
+
+    async def _async_apply_limit_change(self, adjuster: TdarrLimitAdjuster, change: TdarrLimitChange) -> None:
+        try:
+            await self.tdarr.writes.async_set_worker_limit(change.node_key, change.worker_type, change.target)
+        except HomeAssistantError as e:
+            _LOGGER.warning("Unable to change %s worker limit for '%s': %s", change.worker_type, change.node_key, e)
+            adjuster.record_result(change, False, time.monotonic())
+        else:
+            adjuster.record_result(change, True, time.monotonic())
+
+    @callback
+    def _handle_pending_write(self, section: str) -> None:
+        if not self.data or section not in self.data:
+            return
+        self.data = {
+            **self.data,
+            section: self.tdarr.writes.apply_pending(section, self.data[section], time.monotonic())
+        }
+        self.async_update_listeners()
+
+    @callback
+    def async_set_section_data(self, section: str, section_data: Any) -> None:
+        """Replace the data for a single section outside of a refresh and notify listeners.
+
+        Unlike async_set_updated_data this does not reschedule the next refresh, so polling of other sections
+        continues as normal.
+        """
+        self.data = {**self.data, section: self.tdarr.writes.apply_pending(section, section_data, time.monotonic())}
+        if section == SECTION_NODES:
+            self._summarise_nodes(self.data)
+
+        state = self.section_states[section]
+        state.last_update_success = True
+        state.last_success_time = dt_util.utcnow()
+        state.last_exception = None
+        state.from_snapshot = False
+
+        if section == SECTION_NODES:
+            self.tdarr.node_index.update(section_data)
+        if section in HISTORY_SECTIONS:
+            self.history.record(self.data, time.monotonic(), section == SECTION_NODES)
+        self.async_update_listeners()
+        self._schedule_snapshot_save()
+
+    def _get_notified_state(self, section: str) -> Tuple[bool, bool]:
+        """Get the state of a section shown by entities other than its data: availability and the stale attribute."""
+        state = self.section_states[DERIVED_SECTIONS.get(section, section)]
+        return (self.last_update_success and state.last_update_success, state.from_snapshot)
+
+    def _get_changes(self) -> Dict[str, Set[str] | None]:
+        """Get the sections which have changed since listeners were last notified.
+
+        For keyed sections the keys of the changed items are returned. None indicates that the whole section has
+        changed, including when it becomes available or unavailable, or is first refreshed after loading from the
+        snapshot, even if the data is the same.
+        """
+        previous_data = self._notified_data or {}
+        current_data = self.data or {}
+        changes: Dict[str, Set[str] | None] = {}
+        for section in LISTENER_SECTIONS:
+            if self._notified_data is None or self._notified_states.get(section) != self._get_notified_state(section):
+                changes[section] = None
+                continue
+
+            previous = previous_data.get(section)
+            current = current_data.get(section)
+            # Sections which were not refreshed keep the same object, so can be skipped without comparing
+            if previous is current:
+                continue
+            if section in KEYED_SECTIONS and isinstance(previous, dict) and isinstance(current, dict):
+                changed_keys = {
+                    key for key in previous.keys() | current.keys()
+                    if previous.get(key) != current.get(key)
+                }
+                if changed_keys:
+                    changes[section] = changed_keys
+            elif previous != current:
+                changes[section] = None
+        return changes
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners subscribed to data which has changed.
+
+        Listener contexts are either None to always be notified, a tuple of a section to be notified of any change
+        to that section, or a tuple of a keyed section and item key to be notified of changes to that item.
+        """
+        # Create entities for new items before notifying, so that they are included
+        self._check_items()
+
+        changes = self._get_changes()
+        self._notified_data = self.data
+        self._notified_states = { section: self._get_notified_state(section) for section in LISTENER_SECTIONS }
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                update_callback()
+                continue
+
+            section, *key = context
+            if section not in changes:
+                continue
+            changed_keys = changes[section]
+            if changed_keys is None or not key or key[0] in changed_keys:
+                update_callback()
+
+    async def async_load_snapshot(self) -> bool:
+        """Populate the data from the snapshot saved by a previous run.
+
+        Allows entities to be set up without waiting for the server. Sections loaded are marked as from the snapshot
+        until they are refreshed. Returns whether a snapshot was loaded.
+        """
+        try:
+            snapshot = await self._snapshot_store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Unable to load snapshot for %s: %s", self.serverip, e)
+            return False
+        if not snapshot or not snapshot.get("sections"):
+            return False
+
+        data = {}
+        for section, section_snapshot in snapshot["sections"].items():
+            # Error responses were saved as section data by earlier versions
+            if section not in SECTIONS or not isinstance(section_snapshot.get("data"), dict):
+                continue
+            data[section] = section_snapshot["data"]
+            state = self.section_states[section]
+            state.last_update_success = True
+            state.last_success_time = dt_util.parse_datetime(section_snapshot["time"])
+            state.from_snapshot = True
+
+        self._summarise_nodes(data)
+        self._set_known_items(data)
+        if isinstance(data.get(SECTION_NODES), dict):
+            self.tdarr.node_index.update(data[SECTION_NODES])
+        self.data = data
+        _LOGGER.info("Loaded snapshot of %s for %s saved at %s", list(data), self.serverip, snapshot.get("saved"))
+        return True
+
+    def _get_snapshot(self) -> dict:
+        sections = {}
+        for section, state in self.section_states.items():
+            if section in (self.data or {}) and state.last_success_time is not None:
+                sections[section] = {
+                    "data": self.get_raw_section_data(section),
+                    "time": state.last_success_time.isoformat(),
                 }
+        return {
+            "saved": dt_util.utcnow().isoformat(),
+            "sections": sections,
+        }
+
+    @callback
+    def _schedule_snapshot_save(self) -> None:
+        self._snapshot_store.async_delay_save(self._get_snapshot, SNAPSHOT_SAVE_DELAY)
+
+    def get_raw_section_data(self, section: str) -> Any:
+        """Get the data for a section as received from the server, without any values derived by the integration."""
+        section_data = (self.data or {}).get(section)
+        if section == SECTION_NODES and isinstance(section_data, dict):
+            return {
+                node_key: { key: value for key, value in node_data.items() if key != SUMMARY_KEY }
+                for node_key, node_data in section_data.items()
+            }
+        return section_data
 
-                # If data is already available, check if we need to reload to create new node sensors
-                if self.data:
-                    def get_node_keys(node_data: Dict[str, dict]):
-                        return set(node_data.get("nodes", {}).keys())
-                    previous_nodes = get_node_keys(self.data)
-                    current_nodes = get_node_keys(data)
+    def _summarise_nodes(self, data: dict) -> None:
+        """Calculate values derived from node data once, so that entities only need to look them up."""
+        nodes = data.get(SECTION_NODES)
+        if isinstance(nodes, dict):
+            data[SECTION_NODES], data[SUMMARY_KEY] = summarise_nodes(nodes)
+            if self.worker_slots is not None:
+                data[SECTION_WORKERS] = self.worker_slots.assign(nodes)
 
-                    # Check for new nodes. Don't need to check for existing nodes disappearing.
-                    new_nodes = current_nodes.difference(previous_nodes)
-                    if new_nodes:
-                        _LOGGER.info("New nodes discovered: %s", new_nodes)
-                        self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+    @callback
+    def async_add_items_listener(self, listener: Callable[[str, List[str]], None]) -> Callable[[], None]:
+        """Listen for items being added to keyed sections. The listener is passed the section and item keys.
 
-                self._available = True
-                return data
+        Returns a function to stop listening.
+        """
+        return async_dispatcher_connect(self.hass, SIGNAL_ITEMS_ADDED.format(self.config_entry.entry_id), listener)
 
-        except Exception as ex:
+    @callback
+    def async_add_items_removed_listener(self, listener: Callable[[str, List[str]], None]) -> Callable[[], None]:
+        """Listen for items being removed from keyed sections. The listener is passed the section and item keys.
+
+        Returns a function to stop listening.
+        """
+        return async_dispatcher_connect(self.hass, SIGNAL_ITEMS_REMOVED.format(self.config_entry.entry_id), listener)
+
+    def _set_known_items(self, data: dict) -> None:
+        """Record the items in data as having entities, without notifying listeners."""
+        for section in KEYED_SECTIONS:
+            if isinstance(data.get(section), dict):
+                self._known_items[section] = set(data[section])
+
+    @callback
+    def _check_items(self) -> None:
+        """Notify listeners of items added to or removed from keyed sections since the last check.
+
+        Nodes are only removed once they have been missing for the retire delay, as they can disconnect temporarily.
+        Libraries are removed as soon as they are missing. Sections which failed to refresh are not checked.
+        """
+        for section in KEYED_SECTIONS:
+            section_data = (self.data or {}).get(section)
+            if not self.is_section_available(section) or not isinstance(section_data, dict):
+                continue
+
+            known = self._known_items[section]
+            added = [key for key in section_data if key not in known]
+            removed = [key for key in known if key not in section_data]
+
+            if section == SECTION_NODES:
+                for key in section_data:
+                    self._node_missing_since.pop(key, None)
+                now = time.monotonic()
+                removed = [
+                    key for key in removed
+                    if self._node_retire_delay and now - self._node_missing_since.setdefault(key, now) >= self._node_retire_delay
+                ]
+
+            # Workers come and go with every job, so are not worth logging
+            log_level = logging.DEBUG if section in DERIVED_SECTIONS else logging.INFO
+            if added:
+                _LOGGER.log(log_level, "New %s discovered for %s: %s", section, self.serverip, added)
+                known.update(added)
+                async_dispatcher_send(self.hass, SIGNAL_ITEMS_ADDED.format(self.config_entry.entry_id), section, added)
+            if removed:
+                _LOGGER.log(log_level, "Removing %s no longer present on %s: %s", section, self.serverip, removed)
+                known.difference_update(removed)
+                async_dispatcher_send(self.hass, SIGNAL_ITEMS_REMOVED.format(self.config_entry.entry_id), section, removed)
+                if section == SECTION_NODES:
+                    self._async_remove_node_devices(removed)
+
+    @callback
+    def _async_remove_node_devices(self, node_keys: Iterable[str]) -> None:
+        device_registry = dr.async_get(self.hass)
+        for node_key in node_keys:
+            self._node_missing_since.pop(node_key, None)
+            device = device_registry.async_get_device(identifiers={(DOMAIN, self.serverip, "node", node_key)})
+            if device:
+                device_registry.async_update_device(device.id, remove_config_entry_id=self.config_entry.entry_id)
+
+    async def _async_fetch_section(self, section: str, durations: Dict[str, float]):
+        if self.tdarr.breaker.is_open:
+            # Fail without calling the API so that each section does not log its own failure
+            raise TdarrCircuitOpenError(f"Tdarr server is unavailable, retrying in {self.tdarr.breaker.retry_in:.0f} seconds")
+        started = time.perf_counter()
+        try:
+            async with async_timeout.timeout(SECTION_TIMEOUTS.get(section, SECTION_TIMEOUT)):
+                return await self._section_fetchers[section]()
+        finally:
+            durations[section] = time.perf_counter() - started
+
+    async def _async_update_data(self):
+        """Fetch data from Tdarr Server.
+
+        Each section is fetched independently. A section which fails keeps its previous data and is marked as
+        failed so that only entities using that section become unavailable. The update only fails as a whole
+        when every section is failing.
+        """
+        async with self._refresh_lock:
+            return await self._async_update_sections()
+
+    async def _async_update_sections(self):
+        # Sections refreshed by a refresh which was waited for are no longer due
+        sections = self.get_due_sections()
+        _LOGGER.debug("Refreshing sections %s for %s", sections, self.serverip)
+        started = time.monotonic()
+        durations: Dict[str, float] = {}
+        results = await asyncio.gather(
+            *[self._async_fetch_section(section, durations) for section in sections],
+            return_exceptions=True
+        )
+        self.tdarr.metrics.record_refresh(time.monotonic() - started, durations)
+
+        # Sections which are not due or failed keep their previous values
+        data = dict(self.data or {})
+        for section, result in zip(sections, results):
+            state = self.section_states[section]
+            if isinstance(result, BaseException):
+                # The circuit breaker has already logged that the server is down
+                circuit_open = isinstance(result, TdarrCircuitOpenError) or isinstance(result.__cause__, TdarrCircuitOpenError)
+                _LOGGER.log(
+                    logging.DEBUG if circuit_open else logging.WARNING,
+                    "Error refreshing %s data from Tdarr for %s: %s", section, self.serverip, str(result) or type(result).__name__
+                )
+                state.last_update_success = False
+                state.last_exception = result
+                continue
+
+            # Changes accepted by the server after the section was fetched are not reflected yet
+            data[section] = self.tdarr.writes.apply_pending(section, result, started)
+            state.last_update_success = True
+            state.last_success_time = dt_util.utcnow()
+            state.last_exception = None
+            state.from_snapshot = False
+            self._section_last_refresh[section] = started
+
+        if not any(state.last_update_success for state in self.section_states.values()):
             self._available = False  # Mark as unavailable
-            _LOGGER.warning(str(ex))
+            self._update_adaptive_state(False, data)
             _LOGGER.warning("Error communicating with Tdarr for %s", self.serverip)
             raise UpdateFailed(
                 f"Error communicating with Tdarr for {self.serverip}"
-            ) from ex
+            ) from next((result for result in results if isinstance(result, BaseException)), None)
+
+        if SECTION_NODES in sections and self.section_states[SECTION_NODES].last_update_success:
+            self._summarise_nodes(data)
+
+        refreshed = {section for section, result in zip(sections, results) if not isinstance(result, BaseException)}
+        if refreshed & HISTORY_SECTIONS:
+            self.history.record(data, time.monotonic(), SECTION_NODES in refreshed)
+
+        self._available = True
+        self._schedule_snapshot_save()
+        self._update_adaptive_state(True, data)
+        return data
@@ -0,0 +1,55 @@
+"""Diagnostics support for the Tdarr integration."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .coordinator import TdarrDataUpdateCoordinator
+from .const import (
+    DOMAIN,
+    APIKEY,
+    COORDINATOR,
+)
+
+TO_REDACT = {APIKEY}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: TdarrDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "sections": {
+            section: {
+                "interval": coordinator.get_section_interval(section),
+                "last_update_success": state.last_update_success,
+                "last_success_time": state.last_success_time.isoformat() if state.last_success_time else None,
+                "stale_seconds": state.stale_seconds,
+                "from_snapshot": state.from_snapshot,
+                "last_exception": repr(state.last_exception) if state.last_exception else None,
+            }
+            for section, state in coordinator.section_states.items()
+        },
+        "polling": {
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "active": coordinator.is_active,
+        },
+        "circuit_breaker": {
+            "state": coordinator.tdarr.breaker.state,
+            **coordinator.tdarr.breaker.as_dict(),
+        },
+        "worker_balancer": coordinator.balancer.as_dict() if coordinator.balancer else None,
+        "worker_split": coordinator.splitter.as_dict() if coordinator.splitter else None,
+        "history": {
+            "snapshots": len(coordinator.history),
+            "rates": coordinator.history.rates.as_dict(),
+            "node_rates": { node_key: rates.as_dict() for node_key, rates in coordinator.history.node_rates.items() },
+        },
+        "metrics": coordinator.tdarr.metrics.as_dict(),
+        "data": { section: coordinator.get_raw_section_data(section) for section in coordinator.section_states },
+    }
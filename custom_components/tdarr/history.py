@@ -0,0 +1,227 @@
+"""Rolling history of farm progress, used to calculate throughput rates from data which is already fetched."""
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Set,
+    Tuple,
+)
+
+from .const import (
+    SECTION_NODES,
+    SECTION_STATS,
+    SECTION_COUNTS,
+    WORKER_TYPE_HEALTHCHECK,
+    WORKER_TYPE_TRANSCODE,
+)
+
+# Number of snapshots kept
+HISTORY_SIZE = 360
+# Seconds of history used to calculate rates
+HISTORY_WINDOW = 3600
+# Minimum seconds between snapshots, so that the snapshots kept cover the window however often data is updated
+HISTORY_INTERVAL = HISTORY_WINDOW / HISTORY_SIZE
+# Rates are not calculated from less history than this, as they would jump with every finished file
+HISTORY_MIN_SPAN = 300
+
+HOUR = 3600
+
+# Sections which snapshots are taken from
+HISTORY_SECTIONS = {SECTION_NODES, SECTION_STATS, SECTION_COUNTS}
+
+
+@dataclass
+class TdarrHistorySnapshot:
+    """Cumulative progress of the farm at a point in time"""
+
+    time: float
+    transcodes: int | None # Files which have finished transcoding, successfully or not
+    health_checks: int | None
+    space_saved_gb: float | None
+    node_jobs: Dict[str, Dict[str, int]] # Jobs seen to finish on each connected node, keyed by worker category
+
+
+@dataclass
+class TdarrRates:
+    """Rolling rates calculated from the history, per hour. None until there is enough history."""
+
+    transcodes_per_hour: float | None = None
+    health_checks_per_hour: float | None = None
+    space_saved_gb_per_hour: float | None = None
+    transcode_queue: int | None = None
+    health_check_queue: int | None = None
+    span: float = 0 # Seconds of history the rates were calculated from
+
+    @property
+    def transcode_queue_hours(self) -> float | None:
+        """Estimated hours until the transcode queue is empty at the current rate."""
+        return get_drain_hours(self.transcode_queue, self.transcodes_per_hour)
+
+    @property
+    def health_check_queue_hours(self) -> float | None:
+        """Estimated hours until the health check queue is empty at the current rate."""
+        return get_drain_hours(self.health_check_queue, self.health_checks_per_hour)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "transcodes_per_hour": self.transcodes_per_hour,
+            "health_checks_per_hour": self.health_checks_per_hour,
+            "space_saved_gb_per_hour": self.space_saved_gb_per_hour,
+            "transcode_queue_hours": self.transcode_queue_hours,
+            "health_check_queue_hours": self.health_check_queue_hours,
+            "span": self.span,
+        }
+
+
+def get_drain_hours(queue: int | None, per_hour: float | None) -> float | None:
+    if queue is None:
+        return None
+    if queue == 0:
+        return 0
+    if not per_hour:
+        return None
+    return queue / per_hour
+
+
+def _get_category(worker_type: str) -> str | None:
+    for category in (WORKER_TYPE_TRANSCODE, WORKER_TYPE_HEALTHCHECK):
+        if worker_type.startswith(category):
+            return category
+    return None
+
+
+class TdarrHistory(object):
+    """Fixed size ring buffer of snapshots of farm progress, with the rates calculated from them.
+
+    Farm rates come from the finished transcode and health check counts and the space saved statistic. Tdarr does
+    not report finished files per node, so nodes count a job as finished when a worker moves on to another file or
+    goes away. Rates are recalculated once per snapshot, so reading them costs nothing. Pushed updates can arrive
+    far more often than refreshes, so snapshots are taken at most once per interval, though finished jobs are still
+    counted from every update.
+
+    The finished jobs of a node only increase. A node which disconnects is left out of snapshots but keeps its
+    counts until no snapshot includes it, so a node which reconnects continues from where it left off.
+    """
+
+    def __init__(
+            self,
+            size: int = HISTORY_SIZE,
+            window: float = HISTORY_WINDOW,
+            min_span: float = HISTORY_MIN_SPAN,
+            interval: float = HISTORY_INTERVAL):
+        self.window = window
+        self.interval = interval
+        self.min_span = min_span
+        self.rates = TdarrRates()
+        self.node_rates: Dict[str, TdarrRates] = {}
+
+        self._snapshots: Deque[TdarrHistorySnapshot] = deque(maxlen=size)
+        self._worker_jobs: Dict[str, Dict[str, Tuple[str, Any]]] = {} # Category and file of each worker of each node
+        self._node_jobs: Dict[str, Dict[str, int]] = {}
+        self._connected_nodes: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def record(self, data: dict, now: float, nodes_updated: bool = True) -> None:
+        """Add a snapshot of coordinator data and recalculate the rates.
+
+        args:
+            nodes_updated: Whether the node data is new since the last snapshot, so finished jobs can be counted.
+        """
+        if nodes_updated and isinstance(data.get(SECTION_NODES), dict):
+            self._count_finished_jobs(data[SECTION_NODES])
+        if self._snapshots and now - self._snapshots[-1].time < self.interval:
+            return
+
+        counts = data.get(SECTION_COUNTS)
+        counts = counts if isinstance(counts, dict) else {}
+        stats = data.get(SECTION_STATS)
+        stats = stats if isinstance(stats, dict) else {}
+        self._snapshots.append(TdarrHistorySnapshot(
+            now,
+            _add(counts.get("transcode_success"), counts.get("transcode_error")),
+            _add(counts.get("healthcheck_success"), counts.get("healthcheck_error")),
+            stats.get("sizeDiff"),
+            { node_key: dict(self._node_jobs[node_key]) for node_key in self._connected_nodes },
+        ))
+        self._forget_nodes()
+        self._calculate(counts.get("transcode_queue"), counts.get("healthcheck_queue"))
+
+    def _count_finished_jobs(self, nodes: Dict[str, dict]) -> None:
+        # Workers of a node which disconnects were interrupted rather than finished
+        for node_key in self._worker_jobs.keys() - nodes.keys():
+            del self._worker_jobs[node_key]
+        self._connected_nodes = set(nodes)
+
+        for node_key, node_data in nodes.items():
+            workers = node_data.get("workers", {}) if isinstance(node_data, dict) else {}
+            current = {
+                worker_id: (category, worker_data.get("file"))
+                for worker_id, worker_data in workers.items()
+                if isinstance(worker_data, dict) and (category := _get_category(worker_data.get("workerType", "")))
+            }
+            previous = self._worker_jobs.get(node_key)
+            self._worker_jobs[node_key] = current
+            node_jobs = self._node_jobs.setdefault(node_key, { WORKER_TYPE_TRANSCODE: 0, WORKER_TYPE_HEALTHCHECK: 0 })
+            if previous is None:
+                continue
+            for worker_id, job in previous.items():
+                if current.get(worker_id) != job:
+                    node_jobs[job[0]] = node_jobs.get(job[0], 0) + 1
+
+    def _forget_nodes(self) -> None:
+        """Remove the counts of disconnected nodes once no snapshot includes them."""
+        for node_key in self._node_jobs.keys() - self._connected_nodes:
+            if not any(node_key in snapshot.node_jobs for snapshot in self._snapshots):
+                del self._node_jobs[node_key]
+
+    def _calculate(self, transcode_queue: int | None, health_check_queue: int | None) -> None:
+        latest = self._snapshots[-1]
+        snapshots = [snapshot for snapshot in self._snapshots if snapshot.time >= latest.time - self.window]
+        span = latest.time - snapshots[0].time
+
+        def get_rate(get_value: Callable[[TdarrHistorySnapshot], float | None]) -> float | None:
+            if span <= 0 or span < self.min_span:
+                return None
+            # Counts can go down when tables are cleared, so only increases are added up
+            total = 0
+            previous = None
+            for snapshot in snapshots:
+                value = get_value(snapshot)
+                if value is not None and previous is not None and value > previous:
+                    total += value - previous
+                if value is not None:
+                    previous = value
+            return total / span * HOUR
+
+        self.rates = TdarrRates(
+            get_rate(lambda snapshot: snapshot.transcodes),
+            get_rate(lambda snapshot: snapshot.health_checks),
+            get_rate(lambda snapshot: snapshot.space_saved_gb),
+            transcode_queue,
+            health_check_queue,
+            span,
+        )
+        # Finished jobs of nodes only increase, so only the first and latest snapshots of each node are needed
+        self.node_rates = {}
+        for node_key, jobs in latest.node_jobs.items():
+            first = next(snapshot for snapshot in snapshots if node_key in snapshot.node_jobs)
+            node_span = latest.time - first.time
+            if node_span <= 0 or node_span < self.min_span:
+                self.node_rates[node_key] = TdarrRates(span=node_span)
+                continue
+            self.node_rates[node_key] = TdarrRates(
+                (jobs[WORKER_TYPE_TRANSCODE] - first.node_jobs[node_key][WORKER_TYPE_TRANSCODE]) / node_span * HOUR,
+                (jobs[WORKER_TYPE_HEALTHCHECK] - first.node_jobs[node_key][WORKER_TYPE_HEALTHCHECK]) / node_span * HOUR,
+                span=node_span,
+            )
+
+
+def _add(*values: int | None) -> int | None:
+    if any(value is None for value in values):
+        return None
+    return sum(values)
@@ -0,0 +1,149 @@
+"""Request and refresh instrumentation for the Tdarr integration."""
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+# Upper bounds in seconds of the latency histogram buckets. Anything slower falls into a final overflow bucket.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Endpoints polled by the coordinator. Used to create a latency sensor for each before any requests are made.
+READ_ENDPOINTS = [
+    "status",
+    "get-nodes",
+    "cruddb",
+    "stats/get-pies",
+    "client/staged",
+    "client/status-tables",
+]
+
+
+@dataclass
+class TdarrLatencyHistogram:
+    """Distribution of durations in seconds, grouped into LATENCY_BUCKETS"""
+
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0
+    max: float = 0
+    last: float | None = None
+
+    def observe(self, duration: float) -> None:
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if duration <= bound), len(LATENCY_BUCKETS))
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Estimate a percentile as the upper bound of the bucket it falls in. The overflow bucket uses the maximum."""
+        if not self.count:
+            return None
+        target = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "last": self.last,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": {
+                **{ f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.counts) },
+                "overflow": self.counts[-1],
+            },
+        }
+
+
+@dataclass
+class TdarrEndpointMetrics:
+    """Statistics for the requests sent to a single API endpoint"""
+
+    requests: int = 0
+    errors: int = 0 # Requests which failed to complete, or completed with an error status
+    retries: int = 0 # Read requests which were sent again after a temporary failure
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    latency: TdarrLatencyHistogram = field(default_factory=TdarrLatencyHistogram)
+    decode: TdarrLatencyHistogram = field(default_factory=TdarrLatencyHistogram)
+    response_bytes_total: int = 0
+    response_bytes_last: int | None = None
+    response_bytes_max: int = 0
+    last_error: str | None = None
+
+    def record_response(self, latency: float, status: int, response_bytes: int, decode_seconds: float | None) -> None:
+        self.requests += 1
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        self.latency.observe(latency)
+        if decode_seconds is not None:
+            self.decode.observe(decode_seconds)
+        self.response_bytes_total += response_bytes
+        self.response_bytes_last = response_bytes
+        self.response_bytes_max = max(self.response_bytes_max, response_bytes)
+        if status >= 400:
+            self.errors += 1
+            self.last_error = f"HTTP {status}"
+
+    def record_error(self, latency: float, error: BaseException) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.latency.observe(latency)
+        self.last_error = str(error) or type(error).__name__
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "last_error": self.last_error,
+            "status_codes": { str(status): count for status, count in self.status_codes.items() },
+            "latency": self.latency.as_dict(),
+            "decode": self.decode.as_dict(),
+            "response_bytes": {
+                "last": self.response_bytes_last,
+                "mean": self.response_bytes_total / self.requests if self.requests else None,
+                "max": self.response_bytes_max,
+            },
+        }
+
+
+class TdarrMetrics(object):
+    """Instrumentation of the requests made to a Tdarr server and the coordinator refreshes they are part of."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, TdarrEndpointMetrics] = { endpoint: TdarrEndpointMetrics() for endpoint in READ_ENDPOINTS }
+        self.refresh = TdarrLatencyHistogram()
+        self.sections: Dict[str, TdarrLatencyHistogram] = {}
+
+    def endpoint(self, endpoint: str) -> TdarrEndpointMetrics:
+        return self.endpoints.setdefault(endpoint, TdarrEndpointMetrics())
+
+    def record_refresh(self, duration: float, section_durations: Dict[str, float]) -> None:
+        self.refresh.observe(duration)
+        for section, section_duration in section_durations.items():
+            self.sections.setdefault(section, TdarrLatencyHistogram()).observe(section_duration)
+
+    @property
+    def errors(self) -> int:
+        return sum(endpoint.errors for endpoint in self.endpoints.values())
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "refresh": self.refresh.as_dict(),
+            "sections": { section: histogram.as_dict() for section, histogram in self.sections.items() },
+            "endpoints": { endpoint: metrics.as_dict() for endpoint, metrics in self.endpoints.items() },
+        }
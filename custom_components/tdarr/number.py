@@ -14,6 +14,7 @@ from homeassistant.components.number import (
     NumberEntityDescription,
     NumberMode,
 )
+from homeassistant.core import callback
 
 from . import (
     TdarrServerEntity,
@@ -24,6 +25,7 @@ from .coordinator import TdarrDataUpdateCoordinator
 from .const import (
     DOMAIN,
     COORDINATOR,
+    SECTION_NODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -50,7 +52,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         step=1,
         mode=NumberMode.BOX,
         value_fn=lambda data: data.get("workerLimits", {}).get("healthcheckcpu"),
-        update_fn=lambda api, entity, value: api.async_set_node_worker_limit(entity.node_key, "healthcheckcpu", int(value))
+        update_fn=lambda api, entity, value: api.writes.async_set_worker_limit(entity.node_key, "healthcheckcpu", int(value))
     ),
     TdarrNumberEntityDescription[TdarrNodeEntity](
         key="worker_limit_healthcheck_gpu",
@@ -60,7 +62,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         step=1,
         mode=NumberMode.BOX,
         value_fn=lambda data: data.get("workerLimits", {}).get("healthcheckgpu"),
-        update_fn=lambda api, entity, value: api.async_set_node_worker_limit(entity.node_key, "healthcheckgpu", int(value))
+        update_fn=lambda api, entity, value: api.writes.async_set_worker_limit(entity.node_key, "healthcheckgpu", int(value))
     ),
     TdarrNumberEntityDescription[TdarrNodeEntity](
         key="worker_limit_transcode_cpu",
@@ -70,7 +72,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         step=1,
         mode=NumberMode.BOX,
         value_fn=lambda data: data.get("workerLimits", {}).get("transcodecpu"),
-        update_fn=lambda api, entity, value: api.async_set_node_worker_limit(entity.node_key, "transcodecpu", int(value))
+        update_fn=lambda api, entity, value: api.writes.async_set_worker_limit(entity.node_key, "transcodecpu", int(value))
     ),
     TdarrNumberEntityDescription[TdarrNodeEntity](
         key="worker_limit_transcode_gpu",
@@ -80,7 +82,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         step=1,
         mode=NumberMode.BOX,
         value_fn=lambda data: data.get("workerLimits", {}).get("transcodegpu"),
-        update_fn=lambda api, entity, value: api.async_set_node_worker_limit(entity.node_key, "transcodegpu", int(value))
+        update_fn=lambda api, entity, value: api.writes.async_set_worker_limit(entity.node_key, "transcodegpu", int(value))
     ),
 }
 
@@ -94,12 +96,22 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         sensors.append(TdarrServerNumberEntity(entry, config_entry.options, description))
 
     # Node Number Entities
-    for node_id in entry.data["nodes"]:
-        for description in NODE_ENTITY_DESCRIPTIONS:
-            sensors.append(TdarrNodeNumberEntity(entry, node_id, config_entry.options, description))
+    def create_item_entities(section: str, key: str) -> list:
+        if section != SECTION_NODES:
+            return []
+        return [TdarrNodeNumberEntity(entry, key, config_entry.options, description) for description in NODE_ENTITY_DESCRIPTIONS]
+
+    for node_id in entry.data.get("nodes", {}):
+        sensors.extend(create_item_entities(SECTION_NODES, node_id))
 
     async_add_entities(sensors, True)
 
+    @callback
+    def async_add_items(section: str, keys: list[str]) -> None:
+        async_add_entities([entity for key in keys for entity in create_item_entities(section, key)], True)
+
+    config_entry.async_on_unload(entry.async_add_items_listener(async_add_items))
+
 
 class TdarrServerNumberEntity(TdarrServerEntity, NumberEntity):
 
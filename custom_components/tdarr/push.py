@@ -0,0 +1,167 @@
+"""Push updates from a Tdarr server over Socket.IO."""
+import asyncio
+import json
+import logging
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Tuple,
+)
+
+import aiohttp
+
+from .const import SECTION_NODES
+
+_LOGGER = logging.getLogger(__name__)
+
+SOCKET_PATH = "/socket.io/?EIO=4&transport=websocket"
+
+RECONNECT_DELAY_MIN = 5
+RECONNECT_DELAY_MAX = 300
+
+# Engine.IO packet types
+EIO_OPEN = "0"
+EIO_CLOSE = "1"
+EIO_PING = "2"
+EIO_PONG = "3"
+EIO_MESSAGE = "4"
+
+# Socket.IO packet types (inside an Engine.IO message)
+SIO_CONNECT = "0"
+SIO_DISCONNECT = "1"
+SIO_EVENT = "2"
+SIO_CONNECT_ERROR = "4"
+
+
+class TdarrPushError(Exception):
+    """Error to indicate the push connection could not be established or was rejected."""
+
+
+def apply_node_update(nodes: Dict[str, dict], payload: Any) -> Dict[str, dict]:
+    """Apply a pushed node update to node data keyed by node name.
+
+    The payload can either be a complete set of nodes keyed by ID, as returned by get-nodes, or a partial update
+    for a single node which includes the node `_id`. A partial update for a node which is not in the data is
+    rejected, as it would add a node without a name or workers. A new dictionary is always returned so that the
+    previous data is left untouched.
+    """
+    if not isinstance(payload, dict):
+        raise TdarrPushError(f"Unexpected node payload type {type(payload).__name__}")
+
+    if "_id" not in payload:
+        return { value.get("nodeName", key): value for key, value in payload.items() }
+
+    node_key = next((key for key, value in nodes.items() if value.get("_id") == payload["_id"]), None)
+    if node_key is None:
+        raise TdarrPushError(f"Update for unknown node {payload['_id']}")
+    return {
+        **nodes,
+        node_key: {**nodes[node_key], **payload},
+    }
+
+
+# Socket.IO events emitted by the Tdarr server, with the section of coordinator data they update and the function
+# used to apply the event payload to the current section data.
+#
+# Tdarr does not document the events sent over its Socket.IO channel, and these names and payload shapes have not
+# been verified against a real server. They are assumptions: "nodes" carrying the same document as get-nodes, and
+# "node" carrying part of a single node including its `_id`. The fake server used by the tests only sends the events
+# a test asks it to, so it cannot confirm them either. Other events are ignored, and pushed sections are still polled
+# as normal, so pushed updates can only make data more current between polls.
+PUSH_EVENTS: Dict[str, Tuple[str, Callable[[Any, Any], Any]]] = {
+    "nodes": (SECTION_NODES, apply_node_update),
+    "node": (SECTION_NODES, apply_node_update),
+}
+PUSH_SECTIONS = {section for section, _ in PUSH_EVENTS.values()}
+
+
+class TdarrPushClient(object):
+    """Minimal Socket.IO client for receiving events pushed from a Tdarr server.
+
+    Only the subset of the Engine.IO v4 and Socket.IO v5 protocols required to receive events over a websocket
+    is implemented. The connection is retried with an increasing delay until stopped.
+    """
+
+    def __init__(
+            self,
+            id: str,
+            session: aiohttp.ClientSession,
+            on_event: Callable[[str, Any], None],
+            on_connection_change: Callable[[bool], None]):
+        self._id = id
+        self._session = session
+        self._on_event = on_event
+        self._on_connection_change = on_connection_change
+        self.connected = False
+
+    async def async_run(self) -> None:
+        """Maintain the connection to the server until cancelled."""
+        delay = RECONNECT_DELAY_MIN
+        while True:
+            try:
+                await self._async_listen()
+            except asyncio.CancelledError:
+                self.connected = False
+                raise
+            except Exception as e:
+                _LOGGER.debug("Push connection to %s failed: %s", self._id, e)
+
+            # Only back off further if the server could not be connected to
+            if self.connected:
+                delay = RECONNECT_DELAY_MIN
+            self._set_connected(False)
+
+            _LOGGER.debug("Reconnecting push connection to %s in %d seconds", self._id, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+    def _set_connected(self, connected: bool) -> None:
+        if self.connected != connected:
+            _LOGGER.info("Push connection to %s %s", self._id, "established" if connected else "lost")
+            self.connected = connected
+            self._on_connection_change(connected)
+
+    async def _async_listen(self) -> None:
+        async with self._session.ws_connect(SOCKET_PATH) as ws:
+            open_packet = await ws.receive_str(timeout=30)
+            if not open_packet.startswith(EIO_OPEN):
+                raise TdarrPushError(f"Unexpected handshake packet '{open_packet[:20]}'")
+            handshake = json.loads(open_packet[1:])
+            # Server sends a ping every interval, so anything longer means the connection is dead.
+            receive_timeout = (handshake.get("pingInterval", 25000) + handshake.get("pingTimeout", 20000)) / 1000
+
+            await ws.send_str(EIO_MESSAGE + SIO_CONNECT)
+
+            while True:
+                msg = await ws.receive(timeout=receive_timeout)
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
+                    return
+                if msg.type == aiohttp.WSMsgType.ERROR:
+                    raise TdarrPushError(f"Websocket error: {ws.exception()}")
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+
+                packet: str = msg.data
+                if packet == EIO_PING:
+                    await ws.send_str(EIO_PONG)
+                elif packet == EIO_CLOSE:
+                    return
+                elif packet.startswith(EIO_MESSAGE):
+                    self._handle_message(packet[1:])
+
+    def _handle_message(self, message: str) -> None:
+        if message.startswith(SIO_CONNECT):
+            self._set_connected(True)
+        elif message.startswith(SIO_CONNECT_ERROR):
+            raise TdarrPushError(f"Connection rejected: {message[1:]}")
+        elif message.startswith(SIO_DISCONNECT):
+            raise TdarrPushError("Disconnected by server")
+        elif message.startswith(SIO_EVENT):
+            # Event may include a namespace and acknowledgement ID before the payload
+            try:
+                event, *args = json.loads(message[message.index("["):])
+            except ValueError as e:
+                _LOGGER.debug("Ignoring malformed push event from %s: %s", self._id, e)
+                return
+            self._on_event(event, args[0] if args else None)
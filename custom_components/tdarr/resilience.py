@@ -0,0 +1,160 @@
+"""Retry and circuit breaker handling for requests to the Tdarr server."""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import aiohttp
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Response statuses which indicate the server is temporarily unable to handle requests
+RETRYABLE_STATUSES = {502, 503, 504}
+# Errors raised by a request which may succeed if sent again
+RETRYABLE_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_STATES = [CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN]
+
+
+class TdarrCircuitOpenError(HomeAssistantError):
+    """Raised instead of sending a request while the server is considered to be down"""
+
+
+@dataclass(frozen=True)
+class TdarrRetryPolicy:
+    """How often and how quickly a failed read request is retried"""
+
+    attempts: int = 3 # Including the first attempt
+    base_delay: float = 0.5
+    max_delay: float = 5
+    timeout: float = 9 # Timeout in seconds of each attempt
+
+    @property
+    def max_duration(self) -> float:
+        """Longest time in seconds a request can take, including every attempt and delay.
+
+        This must fit within the timeout of refreshing the section the request is part of, along with any requests
+        the section waits for first, otherwise the last attempts could never finish.
+        """
+        delays = sum(min(self.max_delay, self.base_delay * 2 ** retry) for retry in range(self.attempts - 1))
+        return self.attempts * self.timeout + delays
+
+    def get_delay(self, retry: int) -> float:
+        """Get the delay in seconds before a retry, using exponential back off with full jitter.
+
+        Jitter spreads out the retries of the requests made by a refresh, so they do not all arrive together when
+        the server comes back.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+# Read requests with their own retry policy. Policies are keyed by request rather than endpoint, as reads of
+# different data can share an endpoint but not their timing, such as the reads made through cruddb.
+REQUEST_LIBRARY_PIES = "library pies"
+REQUEST_LIBRARY_SETTINGS = "library settings"
+REQUEST_QUEUE_PAGE = "queue page"
+
+DEFAULT_RETRY_POLICY = TdarrRetryPolicy()
+# Requests which differ from the default policy
+RETRY_POLICIES: Dict[str, TdarrRetryPolicy] = {
+    # A request is made per library, so keep retries of these short
+    REQUEST_LIBRARY_PIES: TdarrRetryPolicy(attempts=2),
+    # Queue pages and counts are cheap to request again on the next refresh
+    REQUEST_QUEUE_PAGE: TdarrRetryPolicy(attempts=2),
+    # Library settings are requested with a 20 second database timeout, which leaves no time to retry
+    REQUEST_LIBRARY_SETTINGS: TdarrRetryPolicy(attempts=1, timeout=25),
+}
+
+
+def get_retry_policy(request: str | None) -> TdarrRetryPolicy:
+    return RETRY_POLICIES.get(request, DEFAULT_RETRY_POLICY)
+
+
+class TdarrCircuitBreaker(object):
+    """Stops requests being sent to a server which is down.
+
+    The circuit opens after a number of consecutive failed requests. While open, requests fail immediately with
+    TdarrCircuitOpenError. Once the reset timeout has passed, a single request is let through to test the server (half
+    open), and others are rejected until it completes: a success closes the circuit, a failure opens it again with
+    the reset timeout doubled, up to max_reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, max_reset_timeout: float = 300):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0 # Consecutive failed requests
+        self.reset_timeout = reset_timeout
+        self.opened_at: float | None = None
+        self.rejected = 0 # Requests which failed immediately as the circuit was open
+        self.trips = 0 # Number of times the circuit has opened
+
+    @property
+    def retry_in(self) -> float | None:
+        """Number of seconds until a request will be let through to test the server, if open."""
+        if self.state != CIRCUIT_OPEN:
+            return None
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the circuit is open and not yet ready to test the server."""
+        return self.state == CIRCUIT_OPEN and self.retry_in > 0
+
+    def check(self) -> None:
+        """Check a request can be sent. Raises TdarrCircuitOpenError if not.
+
+        A request allowed through once the reset timeout has passed tests the server, and must be followed by
+        record_success, record_failure or record_cancelled.
+        """
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if self.state == CIRCUIT_HALF_OPEN or self.is_open:
+            self.rejected += 1
+            raise TdarrCircuitOpenError("Tdarr server is unavailable, not sending request")
+        _LOGGER.debug("Circuit half open, testing server")
+        self.state = CIRCUIT_HALF_OPEN
+
+    def record_success(self) -> None:
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("Tdarr server is responding again, circuit closed")
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+        elif self.state == CIRCUIT_OPEN or self.failures < self.failure_threshold:
+            return
+        else:
+            _LOGGER.warning("Tdarr server failed %s requests in a row, pausing requests for %s seconds", self.failures, self.reset_timeout)
+            self.trips += 1
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """Record a request which was cancelled before completing, so the server is tested by the next request."""
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.state = CIRCUIT_OPEN
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "retry_in": self.retry_in,
+            "rejected": self.rejected,
+            "trips": self.trips,
+        }
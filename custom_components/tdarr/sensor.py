@@ -12,18 +12,45 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorStateClass,
 )
+from homeassistant.const import MATCH_ALL, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.entity import EntityCategory
 
 from . import (
     TdarrServerEntity,
     TdarrLibraryEntity,
     TdarrNodeEntity,
+    TdarrWorkerEntity,
 )
 from .coordinator import TdarrDataUpdateCoordinator
+from .summary import (
+    get_farm_summary,
+    get_node_summary,
+)
+from .metrics import (
+    READ_ENDPOINTS,
+    TdarrMetrics,
+)
+from .resilience import CIRCUIT_STATES
+from .balancer import TdarrLimitAdjuster
+from .history import TdarrRates
+from .workers import (
+    get_worker_eta_seconds,
+    get_worker_file_name,
+    get_worker_percentage,
+    split_slot_key,
+)
 from .const import (
     DOMAIN,
     COORDINATOR,
     WORKER_TYPE_HEALTHCHECK,
     WORKER_TYPE_TRANSCODE,
+    SECTION_SERVER,
+    SECTION_NODES,
+    SECTION_LIBRARIES,
+    SECTION_STATS,
+    SECTION_COUNTS,
+    SECTION_WORKERS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,29 +61,45 @@ class TdarrSensorEntityDescription(SensorEntityDescription):
  
     value_fn: Callable[[dict], str | int | float | None]
     attributes_fn: Callable[[dict], dict | None] = None
+    full_attributes_fn: Callable[[dict], dict | None] | None = None # Used instead of attributes_fn if full attributes are enabled
+    section: str | None = None
 
-def get_node_fps(node_data: dict, worker_type: str = "") -> int:
-    return sum([worker_data.get("fps", 0) for _, worker_data in node_data.get("workers", {}).items() if worker_data.get("workerType", "").startswith(worker_type)])
+@dataclass(frozen=True, kw_only=True)
+class TdarrLimitAdjusterSensorEntityDescription(SensorEntityDescription):
+    """Details of a Tdarr sensor entity reporting automatic worker limit changes"""
 
-def get_node_memory_percent(node_data: dict) -> float:
-    os_resource_stats: Dict[str, str] = node_data.get("resStats", {}).get("os", {})
-    used_gb_raw = os_resource_stats.get("memUsedGB")
-    total_gb_raw = os_resource_stats.get("memTotalGB")
-    if used_gb_raw is None or total_gb_raw is None:
-        return None
-    
-    return (float(used_gb_raw) / float(total_gb_raw)) * 100
+    adjuster_fn: Callable[[TdarrDataUpdateCoordinator], TdarrLimitAdjuster | None]
+
+@dataclass(frozen=True, kw_only=True)
+class TdarrRateSensorEntityDescription(SensorEntityDescription):
+    """Details of a Tdarr sensor entity reporting a rate calculated from the rolling history"""
+
+    value_fn: Callable[[TdarrRates], float | None]
+
+@dataclass(frozen=True, kw_only=True)
+class TdarrMetricsSensorEntityDescription(SensorEntityDescription):
+    """Details of a Tdarr sensor entity reporting request and refresh metrics"""
+
+    value_fn: Callable[[TdarrMetrics], str | int | float | None]
+    attributes_fn: Callable[[TdarrMetrics], dict | None] = None
+
+def pick(data: dict, *keys: str) -> dict:
+    """Get a subset of a dictionary, skipping any keys which are not present."""
+    return { key: data[key] for key in keys if key in data }
 
 SERVER_ENTITY_DESCRIPTIONS = {
     TdarrSensorEntityDescription(
         key="status",
+        section=SECTION_SERVER,
         translation_key="status",
         icon="mdi:server",
         value_fn=lambda data: data.get("server", {}).get("status"),
-        attributes_fn=lambda data: data.get("server", {})
+        attributes_fn=lambda data: pick(data.get("server", {}), "version", "os", "uptime"),
+        full_attributes_fn=lambda data: data.get("server", {})
     ),
     TdarrSensorEntityDescription(
         key="space_saved",
+        section=SECTION_STATS,
         translation_key="space_saved",
         icon="mdi:harddisk",
         native_unit_of_measurement="GB",
@@ -64,89 +107,236 @@ SERVER_ENTITY_DESCRIPTIONS = {
         device_class=SensorDeviceClass.DATA_SIZE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data.get("stats", {}).get("sizeDiff"),
-        attributes_fn=lambda data: data.get("stats" ,{})
+        attributes_fn=lambda data: pick(data.get("stats", {}), "totalFileCount", "totalTranscodeCount", "totalHealthCheckCount"),
+        full_attributes_fn=lambda data: data.get("stats" ,{})
     ),
     TdarrSensorEntityDescription(
         key="staged",
+        section=SECTION_COUNTS,
         translation_key="staged",
         icon="mdi:file-sync",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("staged", {}).get("totalCount"),
+        value_fn=lambda data: data.get("counts", {}).get("staged"),
     ),
     TdarrSensorEntityDescription(
         key="transcode_queued",
+        section=SECTION_COUNTS,
         translation_key="transcode_queued",
         icon="mdi:file-arrow-up-down",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("stats", {}).get("table1Count"),
+        value_fn=lambda data: data.get("counts", {}).get("transcode_queue"),
     ),
     TdarrSensorEntityDescription(
         key="transcode_success",
+        section=SECTION_COUNTS,
         translation_key="transcode_success",
         icon="mdi:file-check",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("stats", {}).get("table2Count"),
+        value_fn=lambda data: data.get("counts", {}).get("transcode_success"),
     ),
     TdarrSensorEntityDescription(
         key="transcode_error",
+        section=SECTION_COUNTS,
         translation_key="transcode_error",
         icon="mdi:file-alert",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("stats", {}).get("table3Count"),
+        value_fn=lambda data: data.get("counts", {}).get("transcode_error"),
     ),
     TdarrSensorEntityDescription(
         key="healthcheck_queued",
+        section=SECTION_COUNTS,
         translation_key="healthcheck_queued",
         icon="mdi:heart-pulse",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("stats", {}).get("table4Count"),
+        value_fn=lambda data: data.get("counts", {}).get("healthcheck_queue"),
     ),
     TdarrSensorEntityDescription(
         key="healthcheck_success",
+        section=SECTION_COUNTS,
         translation_key="healthcheck_success",
         icon="mdi:heart",
         native_unit_of_measurement="files",
-        value_fn=lambda data: data.get("stats", {}).get("table5Count"),
+        value_fn=lambda data: data.get("counts", {}).get("healthcheck_success"),
     ),
     TdarrSensorEntityDescription(
         key="healthcheck_error",
+        section=SECTION_COUNTS,
         translation_key="healthcheck_error",
         icon="mdi:heart-broken",
         native_unit_of_measurement="files",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: data.get("stats", {}).get("table6Count"),
+        value_fn=lambda data: data.get("counts", {}).get("healthcheck_error"),
     ),
     TdarrSensorEntityDescription(
         key="total_frame_rate",
+        section=SECTION_NODES,
         translation_key="total_frame_rate",
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: sum([get_node_fps(node_data) for _, node_data in data.get("nodes", {}).items()]),
+        value_fn=lambda data: get_farm_summary(data).get_fps(),
     ),
     TdarrSensorEntityDescription(
         key="total_healthcheck_frame_rate",
+        section=SECTION_NODES,
         translation_key="total_healthcheck_frame_rate",
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: sum([get_node_fps(node_data, worker_type=WORKER_TYPE_HEALTHCHECK) for _, node_data in data.get("nodes", {}).items()]),
+        value_fn=lambda data: get_farm_summary(data).get_fps(WORKER_TYPE_HEALTHCHECK),
     ),
     TdarrSensorEntityDescription(
         key="total_transcode_frame_rate",
+        section=SECTION_NODES,
         translation_key="total_transcode_frame_rate",
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: sum([get_node_fps(node_data, worker_type=WORKER_TYPE_TRANSCODE) for _, node_data in data.get("nodes", {}).items()]),
+        value_fn=lambda data: get_farm_summary(data).get_fps(WORKER_TYPE_TRANSCODE),
+    ),
+}
+
+METRICS_ENTITY_DESCRIPTIONS = {
+    TdarrMetricsSensorEntityDescription(
+        key="refresh_duration",
+        translation_key="refresh_duration",
+        icon="mdi:timer-sync",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement="s",
+        suggested_display_precision=2,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.refresh.last,
+        attributes_fn=lambda metrics: {
+            **metrics.refresh.as_dict(),
+            "sections": { section: histogram.last for section, histogram in metrics.sections.items() },
+        }
+    ),
+    TdarrMetricsSensorEntityDescription(
+        key="api_errors",
+        translation_key="api_errors",
+        icon="mdi:alert-circle",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement="errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.errors,
+        attributes_fn=lambda metrics: {
+            endpoint: { "errors": endpoint_metrics.errors, "last_error": endpoint_metrics.last_error }
+            for endpoint, endpoint_metrics in metrics.endpoints.items()
+            if endpoint_metrics.errors
+        }
+    ),
+}
+
+CIRCUIT_BREAKER_ENTITY_DESCRIPTION = SensorEntityDescription(
+    key="circuit_breaker",
+    translation_key="circuit_breaker",
+    icon="mdi:electric-switch",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    device_class=SensorDeviceClass.ENUM,
+    options=CIRCUIT_STATES,
+)
+
+WORKER_BALANCER_ENTITY_DESCRIPTION = TdarrLimitAdjusterSensorEntityDescription(
+    key="worker_balancer",
+    translation_key="worker_balancer",
+    icon="mdi:scale-balance",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    adjuster_fn=lambda coordinator: coordinator.balancer,
+)
+
+WORKER_SPLIT_ENTITY_DESCRIPTION = TdarrLimitAdjusterSensorEntityDescription(
+    key="worker_split",
+    translation_key="worker_split",
+    icon="mdi:call-split",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    adjuster_fn=lambda coordinator: coordinator.splitter,
+)
+
+TRANSCODES_PER_HOUR_ENTITY_DESCRIPTION = TdarrRateSensorEntityDescription(
+    key="transcodes_per_hour",
+    translation_key="transcodes_per_hour",
+    icon="mdi:speedometer",
+    native_unit_of_measurement="files/h",
+    suggested_display_precision=1,
+    state_class=SensorStateClass.MEASUREMENT,
+    value_fn=lambda rates: rates.transcodes_per_hour,
+)
+
+HEALTH_CHECKS_PER_HOUR_ENTITY_DESCRIPTION = TdarrRateSensorEntityDescription(
+    key="health_checks_per_hour",
+    translation_key="health_checks_per_hour",
+    icon="mdi:speedometer",
+    native_unit_of_measurement="files/h",
+    suggested_display_precision=1,
+    state_class=SensorStateClass.MEASUREMENT,
+    value_fn=lambda rates: rates.health_checks_per_hour,
+)
+
+RATE_ENTITY_DESCRIPTIONS = {
+    TRANSCODES_PER_HOUR_ENTITY_DESCRIPTION,
+    HEALTH_CHECKS_PER_HOUR_ENTITY_DESCRIPTION,
+    TdarrRateSensorEntityDescription(
+        key="space_saved_per_hour",
+        translation_key="space_saved_per_hour",
+        icon="mdi:harddisk-plus",
+        native_unit_of_measurement="GB/h",
+        suggested_display_precision=2,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda rates: rates.space_saved_gb_per_hour,
+    ),
+    TdarrRateSensorEntityDescription(
+        key="transcode_queue_time_remaining",
+        translation_key="transcode_queue_time_remaining",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda rates: rates.transcode_queue_hours,
     ),
+    TdarrRateSensorEntityDescription(
+        key="health_check_queue_time_remaining",
+        translation_key="health_check_queue_time_remaining",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda rates: rates.health_check_queue_hours,
+    ),
+}
+
+# Finished files are counted per node from workers moving on to the next file. Space saved is only known farm wide.
+NODE_RATE_ENTITY_DESCRIPTIONS = {
+    TRANSCODES_PER_HOUR_ENTITY_DESCRIPTION,
+    HEALTH_CHECKS_PER_HOUR_ENTITY_DESCRIPTION,
 }
 
+def get_api_latency_description(endpoint: str) -> TdarrMetricsSensorEntityDescription:
+    """Create a description for a sensor reporting the latency of requests to an API endpoint."""
+    return TdarrMetricsSensorEntityDescription(
+        key=f"api_latency_{endpoint.replace('/', '_').replace('-', '_')}",
+        translation_key="api_latency",
+        translation_placeholders={
+            "endpoint": endpoint
+        },
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement="s",
+        suggested_display_precision=3,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.endpoint(endpoint).latency.last,
+        attributes_fn=lambda metrics: metrics.endpoint(endpoint).as_dict()
+    )
+
 LIBRARY_ENTITY_DESCRIPTIONS = {
     TdarrSensorEntityDescription(
         key="library",
@@ -164,7 +354,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: get_node_fps(data)
+        value_fn=lambda data: get_node_summary(data).get_fps()
     ),
     TdarrSensorEntityDescription(
         key="healthcheck_frame_rate",
@@ -172,7 +362,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: get_node_fps(data, worker_type=WORKER_TYPE_HEALTHCHECK)
+        value_fn=lambda data: get_node_summary(data).get_fps(WORKER_TYPE_HEALTHCHECK)
     ),
     TdarrSensorEntityDescription(
         key="transcode_frame_rate",
@@ -180,7 +370,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         icon="mdi:video",
         native_unit_of_measurement="fps",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: get_node_fps(data, worker_type=WORKER_TYPE_TRANSCODE)
+        value_fn=lambda data: get_node_summary(data).get_fps(WORKER_TYPE_TRANSCODE)
     ),
     TdarrSensorEntityDescription(
         key="os_cpu_usage",
@@ -197,7 +387,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         native_unit_of_measurement="%",
         suggested_display_precision=2,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: get_node_memory_percent(data),
+        value_fn=lambda data: get_node_summary(data).memory_percent,
         attributes_fn=lambda data: {
             "memory_used_gb": data.get("resStats", {}).get("os", {}).get("memUsedGB"),
             "memory_total_gb": data.get("resStats", {}).get("os", {}).get("memTotalGB"),
@@ -205,6 +395,43 @@ NODE_ENTITY_DESCRIPTIONS = {
     )
 }
 
+# Values of the worker in a slot of a node. value_fn and attributes_fn are passed the data of the worker.
+WORKER_ENTITY_DESCRIPTIONS = {
+    TdarrSensorEntityDescription(
+        key="worker_progress",
+        translation_key="worker_progress",
+        icon="mdi:progress-clock",
+        native_unit_of_measurement="%",
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=get_worker_percentage,
+    ),
+    TdarrSensorEntityDescription(
+        key="worker_frame_rate",
+        translation_key="worker_frame_rate",
+        icon="mdi:video",
+        native_unit_of_measurement="fps",
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("fps"),
+    ),
+    TdarrSensorEntityDescription(
+        key="worker_time_remaining",
+        translation_key="worker_time_remaining",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=get_worker_eta_seconds,
+    ),
+    TdarrSensorEntityDescription(
+        key="worker_file",
+        translation_key="worker_file",
+        icon="mdi:file-video",
+        value_fn=get_worker_file_name,
+        attributes_fn=lambda data: pick(data, "file", "status"),
+    ),
+}
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add the Entities from the config."""
     entry = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
@@ -213,25 +440,69 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     # Server Sensors
     for description in SERVER_ENTITY_DESCRIPTIONS:
         sensors.append(TdarrServerSensor(entry, config_entry.options, description))
+    for description in METRICS_ENTITY_DESCRIPTIONS:
+        sensors.append(TdarrMetricsSensor(entry, config_entry.options, description))
+    for endpoint in READ_ENDPOINTS:
+        sensors.append(TdarrMetricsSensor(entry, config_entry.options, get_api_latency_description(endpoint)))
+    sensors.append(TdarrCircuitBreakerSensor(entry, config_entry.options, CIRCUIT_BREAKER_ENTITY_DESCRIPTION))
+    for description in RATE_ENTITY_DESCRIPTIONS:
+        sensors.append(TdarrRateSensor(entry, config_entry.options, description))
+    for description in (WORKER_BALANCER_ENTITY_DESCRIPTION, WORKER_SPLIT_ENTITY_DESCRIPTION):
+        if description.adjuster_fn(entry):
+            sensors.append(TdarrLimitAdjusterSensor(entry, config_entry.options, description))
+
+    def create_item_entities(section: str, key: str) -> list:
+        # Library Sensors
+        if section == SECTION_LIBRARIES:
+            library_name = entry.data.get("libraries", {}).get(key, {}).get("name")
+            return [
+                TdarrLibrarySensor(entry, key, config_entry.options, replace(
+                    description,
+                    translation_placeholders={
+                        "library_name": library_name
+                    }
+                ))
+                for description in LIBRARY_ENTITY_DESCRIPTIONS
+            ]
 
-    # Library Sensors
-    for library_id, data in entry.data["libraries"].items():
-        for description in LIBRARY_ENTITY_DESCRIPTIONS:
-            description = replace(
-                description,
-                translation_placeholders={
-                    "library_name": data["name"]
-                }
-            )
-            sensors.append(TdarrLibrarySensor(entry, library_id, config_entry.options, description))
-
-    # Node Sensors
-    for node_id in entry.data["nodes"]:
-        for description in NODE_ENTITY_DESCRIPTIONS:
-            sensors.append(TdarrNodeSensor(entry, node_id, config_entry.options, description))
+        # Node Sensors
+        if section == SECTION_NODES:
+            return [
+                *[TdarrNodeSensor(entry, key, config_entry.options, description) for description in NODE_ENTITY_DESCRIPTIONS],
+                *[TdarrNodeRateSensor(entry, key, config_entry.options, description) for description in NODE_RATE_ENTITY_DESCRIPTIONS],
+            ]
+
+        # Worker Sensors
+        if section == SECTION_WORKERS:
+            node_key, slot = split_slot_key(key)
+            return [
+                TdarrWorkerSensor(entry, node_key, slot, config_entry.options, replace(
+                    description,
+                    translation_placeholders={
+                        "slot": str(slot)
+                    }
+                ))
+                for description in WORKER_ENTITY_DESCRIPTIONS
+            ]
+
+        return []
+
+    for library_id in entry.data.get("libraries", {}):
+        sensors.extend(create_item_entities(SECTION_LIBRARIES, library_id))
+    for node_id in entry.data.get("nodes", {}):
+        sensors.extend(create_item_entities(SECTION_NODES, node_id))
+    # Only present if worker sensors are enabled
+    for slot_key in entry.data.get(SECTION_WORKERS, {}):
+        sensors.extend(create_item_entities(SECTION_WORKERS, slot_key))
 
     async_add_entities(sensors, True)
 
+    @callback
+    def async_add_items(section: str, keys: list[str]) -> None:
+        async_add_entities([entity for key in keys for entity in create_item_entities(section, key)], True)
+
+    config_entry.async_on_unload(entry.async_add_items_listener(async_add_items))
+
 
 class TdarrServerSensor(TdarrServerEntity, SensorEntity):
 
@@ -254,13 +525,109 @@ class TdarrServerSensor(TdarrServerEntity, SensorEntity):
     def extra_state_attributes(self) -> Dict[str, Any] | None:
         try:
             attributes = self.base_attributes
-            if self.description.attributes_fn:
-                attributes = {**attributes, **self.description.attributes_fn(self.data)}
+            attributes_fn = self.description.attributes_fn
+            if self.coordinator.full_attributes and self.description.full_attributes_fn:
+                attributes_fn = self.description.full_attributes_fn
+            if attributes_fn:
+                attributes = {**attributes, **attributes_fn(self.data)}
             return attributes
         except Exception as e:
             raise ValueError(f"Unable to get attributes for {self.entity_description.key} sensor entity") from e
 
 
+class TdarrMetricsSensor(TdarrServerEntity, SensorEntity):
+
+    # Metrics are detailed and change every refresh, so only record the state
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, options, entity_description: TdarrMetricsSensorEntityDescription):
+        _LOGGER.info("Creating server level %s metrics sensor entity", entity_description.key)
+        super().__init__(coordinator, entity_description)
+
+    @property
+    def description(self) -> TdarrMetricsSensorEntityDescription:
+        return self.entity_description
+
+    @property
+    def available(self) -> bool:
+        """Metrics are always available, as they are most useful while requests are failing."""
+        return True
+
+    @property
+    def native_value(self):
+        return self.description.value_fn(self.coordinator.tdarr.metrics)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        attributes = self.base_attributes
+        if self.description.attributes_fn:
+            attributes = {**attributes, **self.description.attributes_fn(self.coordinator.tdarr.metrics)}
+        return attributes
+
+
+class TdarrCircuitBreakerSensor(TdarrServerEntity, SensorEntity):
+
+    # The time until the next attempt changes every refresh, so only record the state
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, options, entity_description: SensorEntityDescription):
+        _LOGGER.info("Creating server level %s sensor entity", entity_description.key)
+        super().__init__(coordinator, entity_description)
+
+    @property
+    def available(self) -> bool:
+        """Always available, as the state is most useful while the server is down."""
+        return True
+
+    @property
+    def native_value(self):
+        return self.coordinator.tdarr.breaker.state
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        return {**self.base_attributes, **self.coordinator.tdarr.breaker.as_dict()}
+
+
+class TdarrRateSensor(TdarrServerEntity, SensorEntity):
+    """A farm wide rate calculated from the rolling history, which is updated by every refresh"""
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, options, entity_description: TdarrRateSensorEntityDescription):
+        _LOGGER.info("Creating server level %s sensor entity", entity_description.key)
+        super().__init__(coordinator, entity_description)
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator.history.rates)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        return {**self.base_attributes, "history_minutes": round(self.coordinator.history.rates.span / 60)}
+
+
+class TdarrLimitAdjusterSensor(TdarrServerEntity, SensorEntity):
+    """Number of worker limit changes made automatically, or currently proposed in dry run modes"""
+
+    # The changes are listed in full, so only record the state
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, options, entity_description: TdarrLimitAdjusterSensorEntityDescription):
+        _LOGGER.info("Creating server level %s sensor entity", entity_description.key)
+        super().__init__(coordinator, entity_description)
+
+    @property
+    def adjuster(self) -> TdarrLimitAdjuster:
+        return self.entity_description.adjuster_fn(self.coordinator)
+
+    @property
+    def native_value(self):
+        adjuster = self.adjuster
+        return len(adjuster.changes) if adjuster.dry_run else adjuster.total_changes
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        return {**self.base_attributes, **self.adjuster.as_dict()}
+
+
 class TdarrLibrarySensor(TdarrLibraryEntity, SensorEntity):
 
     def __init__(self, coordinator: TdarrDataUpdateCoordinator, library_id: str, options, entity_description: TdarrSensorEntityDescription):
@@ -314,4 +681,55 @@ class TdarrNodeSensor(TdarrNodeEntity, SensorEntity):
                 attributes = {**attributes, **self.description.attributes_fn(self.data)}
             return attributes
         except Exception as e:
-            raise ValueError(f"Unable to get attributes for node '{self.node_key}' {self.entity_description.key} sensor entity") from e
\ No newline at end of file
+            raise ValueError(f"Unable to get attributes for node '{self.node_key}' {self.entity_description.key} sensor entity") from e
+
+
+class TdarrNodeRateSensor(TdarrNodeEntity, SensorEntity):
+    """A rate of a node calculated from the rolling history"""
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, node_key: str, options, entity_description: TdarrRateSensorEntityDescription):
+        _LOGGER.info("Creating node %s level %s sensor entity", node_key, entity_description.key)
+        super().__init__(coordinator, node_key, entity_description)
+
+    @property
+    def rates(self) -> TdarrRates:
+        return self.coordinator.history.node_rates.get(self.node_key) or TdarrRates()
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.rates)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        return {**self.base_attributes, "history_minutes": round(self.rates.span / 60)}
+
+
+class TdarrWorkerSensor(TdarrWorkerEntity, SensorEntity):
+    """A value of the worker in a slot of a node. Created when a worker is assigned to the slot and removed when
+    the slot is no longer used."""
+
+    def __init__(self, coordinator: TdarrDataUpdateCoordinator, node_key: str, slot: int, options, entity_description: TdarrSensorEntityDescription):
+        # Workers come and go with every job, so are not worth logging at info
+        _LOGGER.debug("Creating node %s worker %d level %s sensor entity", node_key, slot, entity_description.key)
+        super().__init__(coordinator, node_key, slot, entity_description)
+
+    @property
+    def description(self) -> TdarrSensorEntityDescription:
+        return self.entity_description
+
+    @property
+    def native_value(self):
+        try:
+            return self.description.value_fn(self.worker_data)
+        except Exception as e:
+            raise ValueError(f"Unable to get value for node '{self.node_key}' worker {self.slot} {self.entity_description.key} sensor entity") from e
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any] | None:
+        try:
+            attributes = self.base_attributes
+            if self.description.attributes_fn:
+                attributes = {**attributes, **self.description.attributes_fn(self.worker_data)}
+            return attributes
+        except Exception as e:
+            raise ValueError(f"Unable to get attributes for node '{self.node_key}' worker {self.slot} {self.entity_description.key} sensor entity") from e
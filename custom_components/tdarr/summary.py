@@ -0,0 +1,100 @@
+"""Values derived from Tdarr node data, calculated once per update rather than by each entity."""
+from dataclasses import dataclass, field
+from typing import Dict
+
+from .const import (
+    WORKER_TYPE_HEALTHCHECK,
+    WORKER_TYPE_TRANSCODE,
+)
+
+# Key used for the summary in the data of each node and in the coordinator data
+SUMMARY_KEY = "summary"
+
+
+@dataclass
+class TdarrWorkerSummary:
+    """Totals for a group of workers.
+
+    Values are keyed by worker type (e.g. transcodecpu), worker category (e.g. transcode) and "" for all workers.
+    """
+
+    fps: Dict[str, float] = field(default_factory=dict)
+    workers: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, worker_type: str, fps: float, count: int = 1) -> None:
+        keys = {"", worker_type}
+        for category in (WORKER_TYPE_HEALTHCHECK, WORKER_TYPE_TRANSCODE):
+            if worker_type.startswith(category):
+                keys.add(category)
+        for key in keys:
+            self.fps[key] = self.fps.get(key, 0) + fps
+            self.workers[key] = self.workers.get(key, 0) + count
+
+    def get_fps(self, worker_type: str = "") -> float:
+        return self.fps.get(worker_type, 0)
+
+    def get_workers(self, worker_type: str = "") -> int:
+        return self.workers.get(worker_type, 0)
+
+
+@dataclass
+class TdarrNodeSummary(TdarrWorkerSummary):
+    """Values derived from the data of a single node"""
+
+    memory_percent: float | None = None
+
+
+@dataclass
+class TdarrFarmSummary(TdarrWorkerSummary):
+    """Values derived from the data of all nodes"""
+
+    nodes: int = 0
+
+
+def summarise_node(node_data: dict) -> TdarrNodeSummary:
+    summary = TdarrNodeSummary()
+    for worker_data in node_data.get("workers", {}).values():
+        summary.add(worker_data.get("workerType", ""), worker_data.get("fps", 0))
+
+    os_resource_stats: Dict[str, str] = node_data.get("resStats", {}).get("os", {})
+    used_gb_raw = os_resource_stats.get("memUsedGB")
+    total_gb_raw = os_resource_stats.get("memTotalGB")
+    # Summaries are calculated for every node update, so a node reporting unusable values must not raise
+    try:
+        used_gb = float(used_gb_raw)
+        total_gb = float(total_gb_raw)
+    except (TypeError, ValueError):
+        pass
+    else:
+        if total_gb > 0:
+            summary.memory_percent = (used_gb / total_gb) * 100
+
+    return summary
+
+
+def summarise_nodes(nodes: Dict[str, dict]) -> tuple[Dict[str, dict], TdarrFarmSummary]:
+    """Summarise all nodes in a single pass.
+
+    Returns a copy of the node data with the summary of each node added under SUMMARY_KEY, and the summary of the
+    whole farm. The node data passed in is not modified as it may be shared with other callers of the API client.
+    """
+    farm = TdarrFarmSummary(nodes=len(nodes))
+    summarised_nodes = {}
+    for node_key, node_data in nodes.items():
+        node_summary = summarise_node(node_data)
+        summarised_nodes[node_key] = {**node_data, SUMMARY_KEY: node_summary}
+        for key, fps in node_summary.fps.items():
+            farm.fps[key] = farm.fps.get(key, 0) + fps
+        for key, count in node_summary.workers.items():
+            farm.workers[key] = farm.workers.get(key, 0) + count
+    return summarised_nodes, farm
+
+
+def get_node_summary(node_data: dict) -> TdarrNodeSummary:
+    """Get the summary added to node data by the coordinator, calculating it if not available."""
+    return node_data.get(SUMMARY_KEY) or summarise_node(node_data)
+
+
+def get_farm_summary(data: dict) -> TdarrFarmSummary:
+    """Get the summary of all nodes from coordinator data, calculating it if not available."""
+    return data.get(SUMMARY_KEY) or summarise_nodes(data.get("nodes", {}))[1]
@@ -20,7 +20,12 @@ from . import (
     TdarrNodeEntity,
 )
 from .coordinator import TdarrDataUpdateCoordinator
-from .const import DOMAIN, COORDINATOR
+from .const import (
+    DOMAIN,
+    COORDINATOR,
+    SECTION_GLOBAL_SETTINGS,
+    SECTION_NODES,
+)
 from .api import TdarrApiClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,21 +40,24 @@ class TdarrSwitchEntityDescription(SwitchEntityDescription, Generic[TEntity]):
     value_fn: Callable[[dict], bool | None]
     attributes_fn: Callable[[dict], Dict[str, Any] | None] | None = None
     update_fn: Callable[[TdarrApiClient, TEntity, bool], Awaitable]
+    section: str | None = None
 
 SERVER_ENTITY_DESCRIPTIONS = {
     TdarrSwitchEntityDescription[TdarrServerEntity](
         key="pause_all",
+        section=SECTION_GLOBAL_SETTINGS,
         translation_key="pause_all",
         icon="mdi:pause-circle",
         value_fn=lambda data: data.get("globalsettings", {}).get("pauseAllNodes"),
-        update_fn=lambda server, _, state: server.async_set_global_setting("pauseAll", state),
+        update_fn=lambda server, _, state: server.writes.async_set_global_setting("pauseAll", state, "pauseAllNodes"),
     ),
     TdarrSwitchEntityDescription[TdarrServerEntity](
         key="ignore_schedules",
+        section=SECTION_GLOBAL_SETTINGS,
         translation_key="ignore_schedules",
         icon="mdi:calendar-remove",
         value_fn=lambda data: data.get("globalsettings", {}).get("ignoreSchedules"),
-        update_fn=lambda server, _, state: server.async_set_global_setting("ignoreSchedules", state),
+        update_fn=lambda server, _, state: server.writes.async_set_global_setting("ignoreSchedules", state),
     ),
 }
 
@@ -59,7 +67,7 @@ NODE_ENTITY_DESCRIPTIONS = {
         translation_key="node_paused",
         icon="mdi:pause-circle",
         value_fn=lambda data: data.get("nodePaused"),
-        update_fn=lambda server, entity, state: server.async_set_node_setting(entity.tdarr_node_id, "nodePaused", state),
+        update_fn=lambda server, entity, state: server.writes.async_update_node(entity.node_key, "nodePaused", state),
     )
 }
 
@@ -73,13 +81,22 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         switches.append(TdarrServerSwitch(entry, config_entry.options, description))
 
     # Node Switches
-    for key in entry.data["nodes"]:
-        for description in NODE_ENTITY_DESCRIPTIONS:
-            sw = TdarrNodeSwitch(entry, key, config_entry.options, description)
-            switches.append(sw)
+    def create_item_entities(section: str, key: str) -> list:
+        if section != SECTION_NODES:
+            return []
+        return [TdarrNodeSwitch(entry, key, config_entry.options, description) for description in NODE_ENTITY_DESCRIPTIONS]
+
+    for key in entry.data.get("nodes", {}):
+        switches.extend(create_item_entities(SECTION_NODES, key))
 
     async_add_entities(switches, False)
 
+    @callback
+    def async_add_items(section: str, keys: list[str]) -> None:
+        async_add_entities([entity for key in keys for entity in create_item_entities(section, key)], False)
+
+    config_entry.async_on_unload(entry.async_add_items_listener(async_add_items))
+
 
 class TdarrServerSwitch(TdarrServerEntity, SwitchEntity):
     """A Tdarr server level switch"""
@@ -109,17 +126,15 @@ class TdarrServerSwitch(TdarrServerEntity, SwitchEntity):
         return await self.async_set_state(False)
 
     async def async_set_state(self, state: bool):
+        # The new state is shown straight away, then the section is refreshed once the change has been sent
         await self.description.update_fn(self.coordinator.tdarr, self, state)
-        self._attr_is_on = state
-        self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
  
     @callback 
     def _handle_coordinator_update(self) -> None: 
         """Handle updated data from the coordinator."""
         try:
             self._attr_is_on = self.description.value_fn(self.data)
-            self.async_write_ha_state()
+            super()._handle_coordinator_update()
         except Exception as e:
             raise ValueError(f"Unable to get value for {self.entity_description.key} switch entity") from e
 
@@ -151,17 +166,15 @@ class TdarrNodeSwitch(TdarrNodeEntity, SwitchEntity):
         return await self.async_set_state(False)
 
     async def async_set_state(self, state: bool):
+        # The new state is shown straight away, then the section is refreshed once the change has been sent
         await self.description.update_fn(self.coordinator.tdarr, self, state)
-        self._attr_is_on = state 
-        self.async_write_ha_state()
-        await self.coordinator.async_request_refresh() 
  
     @callback 
     def _handle_coordinator_update(self) -> None: 
         """Handle updated data from the coordinator."""
         try:
             self._attr_is_on = self.description.value_fn(self.data)
-            self.async_write_ha_state()
+            super()._handle_coordinator_update()
         except Exception as e:
             raise ValueError(f"Unable to get value for node '{self.node_key}' {self.entity_description.key} switch entity") from e
 
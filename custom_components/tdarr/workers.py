@@ -0,0 +1,80 @@
+"""Stable numbered slots for the workers of each node, so that entities are created per slot rather than per worker."""
+from itertools import count
+from typing import (
+    Dict,
+    Tuple,
+)
+
+from homeassistant.util import dt as dt_util
+
+
+def get_slot_key(node_key: str, slot: int) -> str:
+    """Get the key of a worker slot in the workers section of coordinator data."""
+    return f"{node_key}:{slot}"
+
+
+def split_slot_key(slot_key: str) -> Tuple[str, int]:
+    """Get the node key and slot number from the key of a worker slot."""
+    node_key, _, slot = slot_key.rpartition(":")
+    return node_key, int(slot)
+
+
+def get_worker_percentage(worker_data: dict) -> float | None:
+    try:
+        return round(float(worker_data["percentage"]), 2)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_worker_eta_seconds(worker_data: dict) -> float | None:
+    """Get the estimated time remaining of a worker, which Tdarr reports as a duration string such as 0:10:00."""
+    eta = worker_data.get("ETA")
+    if not isinstance(eta, str):
+        return None
+    duration = dt_util.parse_duration(eta.strip())
+    return duration.total_seconds() if duration is not None else None
+
+
+def get_worker_file_name(worker_data: dict) -> str | None:
+    """Get the name of the file a worker is processing, without the directory, which may be a Windows path."""
+    file = worker_data.get("file")
+    if not isinstance(file, str):
+        return None
+    # States are limited to 255 characters
+    return file.replace("\\", "/").rsplit("/", 1)[-1][:255]
+
+
+class TdarrWorkerSlots(object):
+    """Assigns each worker of a node to the lowest free slot of the node, keeping it there until the worker goes away.
+
+    Worker IDs are random names which change whenever a worker is started, so entities keyed by them would be
+    recreated for every job. Slot numbers are reused, so a node running the same number of workers keeps the same
+    entities as workers come and go.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, Dict[str, int]] = {} # Slot of each worker ID of each node
+
+    def assign(self, nodes: Dict[str, dict]) -> Dict[str, dict]:
+        """Assign slots to the workers in node data, returning the data of each worker keyed by slot key."""
+        for node_key in self._slots.keys() - nodes.keys():
+            del self._slots[node_key]
+
+        workers_by_slot: Dict[str, dict] = {}
+        for node_key, node_data in nodes.items():
+            workers = node_data.get("workers") if isinstance(node_data, dict) else None
+            if not isinstance(workers, dict):
+                workers = {}
+
+            previous = self._slots.get(node_key, {})
+            slots = { worker_id: previous[worker_id] for worker_id in workers if worker_id in previous }
+            used = set(slots.values())
+            free = (slot for slot in count(1) if slot not in used)
+            for worker_id in workers:
+                if worker_id not in slots:
+                    slots[worker_id] = next(free)
+            self._slots[node_key] = slots
+
+            for worker_id, slot in slots.items():
+                workers_by_slot[get_slot_key(node_key, slot)] = workers[worker_id]
+        return workers_by_slot
@@ -0,0 +1,238 @@
+"""Optimistic, debounced and coalesced writes of settings to the Tdarr server."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+)
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    SECTION_GLOBAL_SETTINGS,
+    SECTION_NODES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for further changes before sending queued writes
+WRITE_DEBOUNCE_DELAY = 0.5
+
+
+def _with_value(data: dict, path: Tuple[str, ...], value: Any) -> dict:
+    """Copy data with the value at path replaced, only copying the dictionaries along the path.
+
+    Data which does not contain the parent of the value, e.g. a node which has been removed, is returned unchanged.
+    """
+    key, *rest = path
+    if not rest:
+        return {**data, key: value}
+    if not isinstance(data.get(key), dict):
+        return data
+    return {**data, key: _with_value(data[key], tuple(rest), value)}
+
+
+@dataclass
+class TdarrPendingWrite:
+    """A change to a value in coordinator data which the server data may not reflect yet"""
+
+    section: str
+    path: Tuple[str, ...] # Keys of the value within the section data
+    value: Any
+    written_at: float | None = None # Time the server accepted the change. None until sent.
+
+
+@dataclass
+class TdarrQueuedWrite:
+    """A change waiting to be sent, along with everyone waiting for it"""
+
+    value: Any
+    pending: TdarrPendingWrite
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+@dataclass
+class TdarrWriteBatch:
+    """Changes which are sent together in a single request"""
+
+    send: Callable[[Dict[Any, Any]], Awaitable[Dict[Any, Exception]]] # Returns the error of each failed change
+    writes: Dict[Any, TdarrQueuedWrite] = field(default_factory=dict)
+    timer: asyncio.TimerHandle | None = None
+
+
+class TdarrWriteQueue(object):
+    """Queue of setting changes which are shown straight away and sent once changes have stopped.
+
+    Each change is held for WRITE_DEBOUNCE_DELAY, restarting the delay whenever another change to the same request
+    arrives, so that dragging a slider or toggling a switch repeatedly only sends the final value. Changes which can
+    be sent in a single request are merged: global settings into one cruddb update, the settings of a node into one
+    update-node request and all worker limits into one set of alter-worker-limit steps.
+
+    Until a refresh started after a change was accepted by the server, the change is applied to the section data by
+    apply_pending, so entities do not flick back to the old value. A change which fails is dropped.
+    """
+
+    def __init__(self, client, delay: float = WRITE_DEBOUNCE_DELAY):
+        self._client = client
+        self._delay = delay
+        self._pending: Dict[Tuple[str, ...], TdarrPendingWrite] = {} # Keyed by section and path
+        self._batches: Dict[Tuple[str, ...], TdarrWriteBatch] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        # Called with the section of a change when it is queued, to show it straight away
+        self.on_change: Callable[[str], None] | None = None
+        # Called with each section changed by a sent batch, to refresh it
+        self.on_written: Callable[[str], Awaitable[None]] | None = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def apply_pending(self, section: str, section_data: Any, fetched_at: float) -> Any:
+        """Apply changes to section data which was fetched at the given time.
+
+        Changes which were accepted by the server before the data was fetched are reflected by the data, so are no
+        longer applied. The data is copied rather than modified.
+        """
+        for key, pending in list(self._pending.items()):
+            if pending.section != section:
+                continue
+            if pending.written_at is not None and pending.written_at <= fetched_at:
+                del self._pending[key]
+            elif isinstance(section_data, dict):
+                section_data = _with_value(section_data, pending.path, pending.value)
+        return section_data
+
+    def async_set_global_setting(self, setting_key: str, value: Any, data_key: str | None = None) -> Awaitable[None]:
+        """Queue a change of a global setting.
+
+        args:
+            setting_key: The setting to update.
+            value: The value to set.
+            data_key: The key of the setting in the global settings data, if it differs from the setting key.
+        """
+        return self._async_queue(
+            ("globalsettings",), self._async_send_global_settings, setting_key, value,
+            TdarrPendingWrite(SECTION_GLOBAL_SETTINGS, (data_key or setting_key,), value))
+
+    def async_update_node(self, node_key: str, setting_key: str, value: Any) -> Awaitable[None]:
+        """Queue a change of a node setting."""
+        async def async_send(updates: Dict[str, Any]) -> Dict[str, Exception]:
+            await self._client.async_update_node_settings(node_key, updates)
+            return {}
+
+        return self._async_queue(
+            ("node", node_key), async_send, setting_key, value,
+            TdarrPendingWrite(SECTION_NODES, (node_key, setting_key), value))
+
+    def async_set_worker_limit(self, node_key: str, worker_type: str, value: int) -> Awaitable[None]:
+        """Queue a change of the worker limit for a worker type of a node."""
+        return self._async_queue(
+            ("workerlimits",), self._async_send_worker_limits, (node_key, worker_type), value,
+            TdarrPendingWrite(SECTION_NODES, (node_key, "workerLimits", worker_type), value))
+
+    async def _async_send_global_settings(self, settings: Dict[str, Any]) -> Dict[str, Exception]:
+        await self._client.async_set_global_settings(settings)
+        return {}
+
+    async def _async_send_worker_limits(self, limits: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], Exception]:
+        node_limits: Dict[str, Dict[str, int]] = {}
+        for (node_key, worker_type), value in limits.items():
+            node_limits.setdefault(node_key, {})[worker_type] = value
+
+        results = await self._client.async_set_worker_limits(node_limits)
+        return {
+            (result.node_key, result.worker_type): error
+            for result in results
+            if (error := result.as_error())
+        }
+
+    def _async_queue(
+        self,
+        batch_key: Tuple[str, ...],
+        send: Callable[[Dict[Any, Any]], Awaitable[Dict[Any, Exception]]],
+        write_key: Any,
+        value: Any,
+        pending: TdarrPendingWrite
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            batch = self._batches[batch_key] = TdarrWriteBatch(send)
+        if batch.timer is not None:
+            batch.timer.cancel()
+        batch.timer = loop.call_later(self._delay, self._start_flush, batch_key)
+
+        # A later change to the same value replaces the earlier one, which then completes with the later change
+        queued = batch.writes.get(write_key)
+        if queued is None:
+            queued = batch.writes[write_key] = TdarrQueuedWrite(value, pending)
+        queued.value = value
+        queued.pending = pending
+        queued.futures.append(future)
+
+        self._pending[(pending.section, *pending.path)] = pending
+        if self.on_change is not None:
+            self.on_change(pending.section)
+        return future
+
+    def _start_flush(self, batch_key: Tuple[str, ...]) -> None:
+        task = asyncio.get_running_loop().create_task(self._async_flush(batch_key))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _async_flush(self, batch_key: Tuple[str, ...]) -> None:
+        # Changes queued from here on start a new batch. The batch may already have been sent, when a change was
+        # queued after its timer fired but before its flush started, or when flushed on unload.
+        batch = self._batches.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        _LOGGER.debug("Sending %d queued %s changes", len(batch.writes), batch_key[0])
+        try:
+            errors = await batch.send({ write_key: queued.value for write_key, queued in batch.writes.items() })
+        except Exception as e:
+            errors = { write_key: e for write_key in batch.writes }
+
+        written_at = time.monotonic()
+        sections = set()
+        for write_key, queued in batch.writes.items():
+            error = errors.get(write_key)
+            pending = queued.pending
+            key = (pending.section, *pending.path)
+            # Leave a newer change to the same value in place
+            if self._pending.get(key) is pending:
+                if error is None:
+                    pending.written_at = written_at
+                else:
+                    _LOGGER.warning("Unable to write %s: %s", write_key, error)
+                    del self._pending[key]
+            sections.add(pending.section)
+
+            for future in queued.futures:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error if isinstance(error, HomeAssistantError) else HomeAssistantError(str(error)))
+
+        if self.on_written is not None:
+            for section in sections:
+                await self.on_written(section)
+
+    async def async_flush(self) -> None:
+        """Send all queued changes now, e.g. before unloading."""
+        for batch_key in list(self._batches):
+            await self._async_flush(batch_key)
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
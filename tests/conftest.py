@@ -0,0 +1,21 @@
+"""Fixtures shared by the tests.
+
+Tests which need Home Assistant run the integration against the fake Tdarr server from the benchmarks, in the same
+minimal Home Assistant instance, so no real Tdarr server is needed.
+"""
+import pytest
+
+from benchmarks.fake_server import FakeFarmConfig, FakeTdarrServer
+from benchmarks.ha import async_create_hass
+
+
+@pytest.fixture
+async def hass():
+    async with async_create_hass() as hass:
+        yield hass
+
+
+@pytest.fixture
+async def server():
+    async with FakeTdarrServer(FakeFarmConfig(nodes=2, workers_per_node=2, libraries=2, queue_length=20)) as server:
+        yield server
@@ -0,0 +1,192 @@
+"""Tests of the API client against the fake Tdarr server."""
+import asyncio
+import json
+from contextlib import aclosing
+
+import aiohttp
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.tdarr.api import TdarrApiClient, TdarrResponseError
+from custom_components.tdarr.const import QUEUE_TABLES
+from custom_components.tdarr.resilience import DEFAULT_RETRY_POLICY
+
+
+@pytest.fixture
+async def client(server):
+    async with aiohttp.ClientSession(base_url=server.base_url) as session:
+        yield TdarrApiClient(f"{server.host}:{server.port}", session)
+
+
+async def test_worker_limit_stepped_from_current_limit(server, client):
+    await client.async_get_nodes()
+    # Changed on the server since the node index was updated
+    server.nodes["node0id"]["workerLimits"]["transcodecpu"] = 4
+
+    results = await client.async_set_worker_limits({ "Node 0": { "transcodecpu": 2 } })
+
+    assert results[0].success
+    assert results[0].previous == 4
+    assert server.nodes["node0id"]["workerLimits"]["transcodecpu"] == 2
+    assert server.requests["alter-worker-limit"] == 2
+
+
+async def test_concurrent_worker_limit_changes_are_serialised(server, client):
+    await client.async_get_nodes()
+
+    first, second = await asyncio.gather(
+        client.async_set_worker_limits({ "Node 0": { "transcodecpu": 3, "healthcheckcpu": 2 } }),
+        client.async_set_worker_limits({ "Node 0": { "transcodecpu": 5 }, "Node 1": { "transcodecpu": 0 } }),
+    )
+
+    assert all(result.success for result in first + second)
+    assert second[0].previous == 3
+    assert server.nodes["node0id"]["workerLimits"] == { "transcodecpu": 5, "transcodegpu": 1, "healthcheckcpu": 2, "healthcheckgpu": 1 }
+    assert server.nodes["node1id"]["workerLimits"]["transcodecpu"] == 0
+
+
+async def test_worker_limit_not_changed_when_current_limit_unavailable(server, client):
+    await client.async_get_nodes()
+    server.failures["get-nodes"] = 500
+
+    results = await client.async_set_worker_limits({ "Node 0": { "transcodecpu": 3 } })
+
+    assert not results[0].success
+    assert "500" in results[0].error
+    assert server.requests["alter-worker-limit"] == 0
+
+
+async def test_queue_paged_in_order(server, client):
+    expected = (await client.async_get_queue_page("transcode_queue", 0, 100)).items
+
+    items = [item async for page in client.async_iter_queue("transcode_queue", page_size=2, concurrency=3) for item in page.items]
+
+    assert len(expected) > 4
+    assert items == expected
+
+
+def get_page_tasks() -> set:
+    return { task for task in asyncio.all_tasks() if task.get_coro().__name__ == "async_get_queue_page" }
+
+
+async def test_queue_paging_stopped_early_waits_for_outstanding_pages(server, client):
+    async with aclosing(client.async_iter_queue("transcode_queue", page_size=2, concurrency=3)) as pages:
+        async for page in pages:
+            assert len(get_page_tasks()) == 3
+            break
+
+    assert get_page_tasks() == set()
+
+
+async def test_identical_reads_share_a_request(server, client):
+    first, second = await asyncio.gather(client.async_get_nodes(), client.async_get_nodes())
+
+    assert first == second
+    assert server.requests["get-nodes"] == 1
+
+
+async def test_read_which_must_be_fresh_not_joined(server, client):
+    await asyncio.gather(client.async_get_nodes(), client.async_get_nodes(join=False))
+
+    assert server.requests["get-nodes"] == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_read(server, client):
+    first = asyncio.create_task(client.async_get_nodes())
+    second = asyncio.create_task(client.async_get_nodes())
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert "Node 0" in await second
+    assert server.requests["get-nodes"] == 1
+
+
+async def test_node_write_uses_indexed_node_id(server, client):
+    await client.async_get_nodes()
+
+    await client.async_update_node("Node 0", "nodePaused", True)
+
+    assert server.nodes["node0id"]["nodePaused"] is True
+    assert server.requests["get-nodes"] == 1
+
+
+async def test_node_write_retried_with_new_id_after_node_restarts(server, client):
+    await client.async_get_nodes()
+    node = server.nodes.pop("node0id")
+    server.nodes["node0restarted"] = { **node, "_id": "node0restarted" }
+
+    await client.async_update_node("Node 0", "nodePaused", True)
+
+    assert server.nodes["node0restarted"]["nodePaused"] is True
+    assert server.requests["update-node"] == 2
+    assert client.node_index.get("Node 0").node_id == "node0restarted"
+
+
+async def test_node_write_to_missing_node(server, client):
+    with pytest.raises(HomeAssistantError):
+        await client.async_update_node("Missing", "nodePaused", True)
+
+    # Node data is retrieved as the node is not indexed
+    assert server.requests["get-nodes"] == 1
+    assert server.requests["update-node"] == 0
+
+
+async def test_stop_nodes_pauses_and_cancels_workers(server, client):
+    results = await client.async_stop_nodes(["Node 0", "Node 1"])
+
+    assert all(result["paused"] and result["error"] is None for result in results.values())
+    assert len(results["Node 0"]["workers"]) == 2
+    assert all(worker["cancelled"] for worker in results["Node 0"]["workers"].values())
+    assert all(node["nodePaused"] and not node["workers"] for node in server.nodes.values())
+    # Workers are found from a single retrieval of node data
+    assert server.requests["get-nodes"] == 1
+
+
+async def test_stop_nodes_reports_failures_per_node_and_worker(server, client):
+    server.failures["cancel-worker-item"] = 500
+
+    results = await client.async_stop_nodes(["Node 0", "Missing"], worker_types=["transcodegpu"])
+
+    assert results["Node 0"]["paused"]
+    worker = results["Node 0"]["workers"]["node0id-worker1"]
+    assert not worker["cancelled"]
+    assert "500" in worker["error"]
+    # Only workers of the given types are cancelled
+    assert list(results["Node 0"]["workers"]) == ["node0id-worker1"]
+    assert not results["Missing"]["paused"]
+    assert "not found" in results["Missing"]["error"]
+
+
+async def test_stop_nodes_rejects_unknown_worker_type(server, client):
+    with pytest.raises(HomeAssistantError):
+        await client.async_stop_nodes(["Node 0"], worker_types=["unknown"])
+
+    assert server.requests["get-nodes"] == 0
+
+
+async def test_queue_counts_read_from_statistics(server, client):
+    counts, _ = await asyncio.gather(client.async_get_queue_counts(), client.async_get_stats())
+
+    assert counts == { table: len(server.tables[table_id or table]) for table, table_id in QUEUE_TABLES.items() }
+    # The statistics document is shared with the stats read, and the status tables are not requested
+    assert server.requests["cruddb"] == 1
+    assert server.requests["client/status-tables"] == 0
+    assert server.requests["client/staged"] == 1
+    # Only a single staged item is transferred, however long the queue
+    item_bytes = len(json.dumps(server.tables["staged"][0]))
+    assert client.metrics.endpoint("client/staged").response_bytes_max < 2 * item_bytes
+
+
+async def test_reads_sharing_an_endpoint_keep_their_own_retry_policy(server, client):
+    server.failures["cruddb"] = 503
+
+    with pytest.raises(TdarrResponseError):
+        await client.async_get_stats()
+    assert server.requests["cruddb"] == DEFAULT_RETRY_POLICY.attempts
+
+    # Library settings are not retried
+    with pytest.raises(TdarrResponseError):
+        await client.async_get_library_settings()
+    assert server.requests["cruddb"] == DEFAULT_RETRY_POLICY.attempts + 1
@@ -0,0 +1,218 @@
+"""Tests of the automatic adjustment of node worker limits."""
+from typing import Dict, List
+
+import pytest
+
+from custom_components.tdarr.balancer import (
+    TdarrBalancerConfig,
+    TdarrLimitAdjuster,
+    TdarrWorkerBalancer,
+    TdarrWorkerSplitter,
+)
+from custom_components.tdarr.const import (
+    BALANCER_MODE_AUTO,
+    BALANCER_MODE_DRY_RUN,
+    WORKER_SPLIT_MODE_AUTO,
+    WORKER_SPLIT_MODE_RECOMMEND,
+)
+
+MINUTE = 60
+
+
+def get_node(limits: Dict[str, int], worker_fps: Dict[str, List[float]], cpu: float = 50, memory_used_gb: float = 4, paused: bool = False) -> dict:
+    """Get node data with running workers of each type producing the given frames per second."""
+    return {
+        "nodePaused": paused,
+        "workerLimits": { "transcodecpu": 0, "transcodegpu": 0, "healthcheckcpu": 0, "healthcheckgpu": 0, **limits },
+        "resStats": { "os": { "cpuPerc": str(cpu), "memUsedGB": str(memory_used_gb), "memTotalGB": "16" } },
+        "workers": {
+            f"{worker_type}-{i}": { "workerType": worker_type, "fps": fps }
+            for worker_type, fps_values in worker_fps.items()
+            for i, fps in enumerate(fps_values)
+        },
+    }
+
+
+def get_changes(changes) -> List[tuple]:
+    return [(change.node_key, change.worker_type, change.previous, change.target) for change in changes]
+
+
+def confirm(adjuster: TdarrLimitAdjuster, changes, now: float, success: bool = True) -> None:
+    """Record the result of making changes, as the coordinator does once they are written."""
+    for change in changes:
+        adjuster.record_result(change, success, now)
+
+
+def test_limit_adjuster_requires_dry_run():
+    class Adjuster(TdarrLimitAdjuster):
+        pass
+
+    with pytest.raises(TypeError):
+        Adjuster("auto", MINUTE)
+
+
+def test_balancer_lowers_slowest_cpu_type_when_cpu_high():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig())
+    node = get_node(
+        { "transcodecpu": 5, "healthcheckcpu": 2, "transcodegpu": 1 },
+        { "transcodecpu": [30, 30], "healthcheckcpu": [100, 100], "transcodegpu": [5] },
+        cpu=95)
+
+    # The limit is lowered below the number of running workers, so that the load is reduced
+    assert get_changes(balancer.evaluate({ "node": node }, 0)) == [("node", "transcodecpu", 5, 1)]
+
+
+def test_balancer_lowers_any_type_when_memory_high():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig())
+    node = get_node(
+        { "transcodecpu": 2, "transcodegpu": 2 },
+        { "transcodecpu": [30, 30], "transcodegpu": [10, 10] },
+        cpu=20, memory_used_gb=15)
+
+    assert get_changes(balancer.evaluate({ "node": node }, 0)) == [("node", "transcodegpu", 2, 1)]
+
+
+@pytest.mark.parametrize(("cpu", "expected"), [
+    (60, [("node", "transcodecpu", 2, 3)]),
+    (75, []),
+    (85, []),
+])
+def test_balancer_raises_busy_type_only_below_hysteresis(cpu, expected):
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig(target_cpu=80, hysteresis=10))
+    node = get_node(
+        { "transcodecpu": 2, "healthcheckcpu": 2 },
+        { "transcodecpu": [50, 50], "healthcheckcpu": [10] },
+        cpu=cpu)
+
+    assert get_changes(balancer.evaluate({ "node": node }, 0)) == expected
+
+
+def test_balancer_keeps_farm_within_maximum():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig(farm_max_workers=4))
+    nodes = {
+        "busy": get_node({ "transcodecpu": 2 }, { "transcodecpu": [50, 50] }, cpu=40),
+        "idle": get_node({ "transcodecpu": 1, "healthcheckcpu": 3 }, { "transcodecpu": [50] }, cpu=30),
+    }
+
+    # Over the maximum, limits are lowered until the farm is within it, removing unused workers first
+    changes = balancer.evaluate(nodes, 0)
+    assert get_changes(changes) == [
+        ("busy", "transcodecpu", 2, 1),
+        ("idle", "healthcheckcpu", 3, 2),
+    ]
+    confirm(balancer, changes, 0)
+
+    # Below the maximum, limits are only raised up to it
+    nodes["busy"] = get_node({ "transcodecpu": 1 }, { "transcodecpu": [50] }, cpu=40)
+    nodes["idle"] = get_node({ "transcodecpu": 1, "healthcheckcpu": 1 }, { "transcodecpu": [50] }, cpu=30)
+    assert get_changes(balancer.evaluate(nodes, 10 * MINUTE)) == [("busy", "transcodecpu", 1, 2)]
+
+
+def test_balancer_leaves_paused_and_settling_nodes():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig(change_interval=10 * MINUTE))
+    nodes = {
+        "paused": get_node({ "transcodecpu": 2 }, { "transcodecpu": [50, 50] }, cpu=95, paused=True),
+        "node": get_node({ "transcodecpu": 3 }, { "transcodecpu": [50, 50, 50] }, cpu=95),
+    }
+
+    changes = balancer.evaluate(nodes, 0)
+    assert get_changes(changes) == [("node", "transcodecpu", 3, 2)]
+    # Not changed again while the change is being made
+    assert balancer.evaluate(nodes, MINUTE) == []
+    confirm(balancer, changes, MINUTE)
+    assert balancer.evaluate(nodes, 5 * MINUTE) == []
+    changes = balancer.evaluate(nodes, 11 * MINUTE)
+    assert len(changes) == 1
+    confirm(balancer, changes, 11 * MINUTE)
+    assert balancer.total_changes == 2
+
+
+def test_balancer_failed_change_does_not_settle_node():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_AUTO, TdarrBalancerConfig(change_interval=10 * MINUTE))
+    nodes = { "node": get_node({ "transcodecpu": 3 }, { "transcodecpu": [50, 50, 50] }, cpu=95) }
+
+    confirm(balancer, balancer.evaluate(nodes, 0), 0, success=False)
+
+    assert len(balancer.evaluate(nodes, MINUTE)) == 1
+    assert balancer.total_changes == 0
+
+
+def test_balancer_dry_run_only_reports():
+    balancer = TdarrWorkerBalancer(BALANCER_MODE_DRY_RUN, TdarrBalancerConfig(change_interval=10 * MINUTE))
+    nodes = { "node": get_node({ "transcodecpu": 3 }, { "transcodecpu": [50, 50, 50] }, cpu=95) }
+
+    assert len(balancer.evaluate(nodes, 0)) == 1
+    assert len(balancer.evaluate(nodes, MINUTE)) == 1
+    assert balancer.total_changes == 0
+
+    # Proposals are cleared once the load no longer calls for them
+    nodes["node"] = get_node({ "transcodecpu": 3 }, { "transcodecpu": [50, 50, 50] }, cpu=75)
+    balancer.evaluate(nodes, 2 * MINUTE)
+    assert balancer.as_dict()["changes"] == []
+
+
+def split_node(transcode_cpu_fps: float = 20, transcode_gpu_fps: float = 100) -> dict:
+    return get_node(
+        { "transcodecpu": 3, "transcodegpu": 2, "healthcheckcpu": 1, "healthcheckgpu": 1 },
+        { "transcodecpu": [transcode_cpu_fps] * 3, "transcodegpu": [transcode_gpu_fps] * 2 })
+
+
+def test_splitter_waits_for_samples():
+    splitter = TdarrWorkerSplitter(WORKER_SPLIT_MODE_AUTO, margin=20, min_samples=3)
+    nodes = { "node": split_node() }
+
+    assert splitter.evaluate(nodes, 0) == []
+    assert splitter.evaluate(nodes, MINUTE) == []
+    changes = splitter.evaluate(nodes, 2 * MINUTE)
+
+    assert get_changes(changes) == [
+        ("node", "transcodecpu", 3, 2),
+        ("node", "transcodegpu", 2, 3),
+    ]
+
+
+@pytest.mark.parametrize(("cpu_fps", "gpu_fps", "expected"), [
+    (100, 110, []),
+    (100, 130, [("node", "transcodecpu", 3, 2), ("node", "transcodegpu", 2, 3)]),
+    (130, 100, [("node", "transcodegpu", 2, 1), ("node", "transcodecpu", 3, 4)]),
+])
+def test_splitter_shifts_towards_faster_type(cpu_fps, gpu_fps, expected):
+    splitter = TdarrWorkerSplitter(WORKER_SPLIT_MODE_AUTO, margin=20, min_samples=1)
+    assert get_changes(splitter.evaluate({ "node": split_node(cpu_fps, gpu_fps) }, 0)) == expected
+
+
+def test_splitter_keeps_one_worker_of_each_type():
+    splitter = TdarrWorkerSplitter(WORKER_SPLIT_MODE_AUTO, margin=20, min_samples=1)
+    node = get_node({ "transcodecpu": 1, "transcodegpu": 2 }, { "transcodecpu": [10], "transcodegpu": [100, 100] })
+
+    assert splitter.evaluate({ "node": node }, 0) == []
+
+
+def test_splitter_skips_paused_excluded_and_settling_nodes():
+    splitter = TdarrWorkerSplitter(WORKER_SPLIT_MODE_AUTO, margin=20, min_samples=1, change_interval=10 * MINUTE)
+    nodes = {
+        "paused": { **split_node(), "nodePaused": True },
+        "excluded": split_node(),
+        "changed": split_node(),
+    }
+
+    changes = splitter.evaluate(nodes, 0, exclude={"excluded"})
+    assert [change.node_key for change in changes] == ["changed", "changed"]
+    confirm(splitter, changes, 0)
+    assert splitter.evaluate(nodes, 5 * MINUTE, exclude={"excluded"}) == []
+    changes = splitter.evaluate(nodes, 10 * MINUTE, exclude={"excluded"})
+    assert len(changes) == 2
+    confirm(splitter, changes, 10 * MINUTE)
+    assert splitter.total_changes == 4
+
+
+def test_splitter_recommend_mode_only_reports():
+    splitter = TdarrWorkerSplitter(WORKER_SPLIT_MODE_RECOMMEND, margin=20, min_samples=1, change_interval=10 * MINUTE)
+    nodes = { "node": split_node() }
+
+    assert splitter.dry_run
+    assert len(splitter.evaluate(nodes, 0)) == 2
+    # Nothing was changed, so the node is not left to settle
+    assert len(splitter.evaluate(nodes, MINUTE)) == 2
+    assert splitter.total_changes == 0
+    assert len(splitter.as_dict()["changes"]) == 2
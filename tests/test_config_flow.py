@@ -0,0 +1,46 @@
+"""Tests of the options flow."""
+import pytest
+import voluptuous as vol
+
+from homeassistant.data_entry_flow import FlowResultType
+
+from benchmarks.ha import async_setup_entry
+from custom_components.tdarr.const import (
+    NODE_RETIRE_DELAY,
+    SECTION_NODES,
+    SECTION_UPDATE_INTERVAL,
+    UPDATE_INTERVAL_MAX,
+    UPDATE_INTERVAL_MIN,
+)
+
+
+async def async_submit_options(hass, server, user_input: dict):
+    entry, _ = await async_setup_entry(hass, server)
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    return entry, await hass.config_entries.options.async_configure(result["flow_id"], user_input)
+
+
+async def test_options_saved(hass, server):
+    entry, result = await async_submit_options(hass, server, { UPDATE_INTERVAL_MIN: 5, UPDATE_INTERVAL_MAX: 5 })
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options[UPDATE_INTERVAL_MIN] == 5
+
+
+@pytest.mark.parametrize("user_input", [
+    { SECTION_UPDATE_INTERVAL.format(SECTION_NODES): -1 },
+    { NODE_RETIRE_DELAY: -1 },
+    { UPDATE_INTERVAL_MIN: 0 },
+    { UPDATE_INTERVAL_MAX: 0 },
+])
+async def test_negative_intervals_rejected(hass, server, user_input):
+    with pytest.raises(vol.Invalid):
+        await async_submit_options(hass, server, user_input)
+
+
+async def test_adaptive_minimum_above_maximum_rejected(hass, server):
+    entry, result = await async_submit_options(hass, server, { UPDATE_INTERVAL_MIN: 60, UPDATE_INTERVAL_MAX: 30 })
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == { UPDATE_INTERVAL_MAX: "interval_min_above_max" }
+    assert UPDATE_INTERVAL_MIN not in entry.options
@@ -0,0 +1,156 @@
+"""Tests of refreshing coordinator data from the fake Tdarr server."""
+import pytest
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.helpers import (
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from benchmarks.ha import async_setup_entry
+from custom_components.tdarr.api import TdarrResponseError
+from custom_components.tdarr.const import (
+    COORDINATOR,
+    DOMAIN,
+    NODE_RETIRE_DELAY,
+    SECTION_LIBRARIES,
+    SECTION_NODES,
+    SECTION_SERVER,
+)
+
+
+def get_server_state(hass, key: str, server):
+    entity_id = er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{server.host}-server-{key}")
+    return hass.states.get(entity_id)
+
+
+def get_library_state(hass, library_id: str, server):
+    entity_id = er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{server.host}-library-{library_id}-library")
+    return hass.states.get(entity_id)
+
+
+async def test_error_response_keeps_last_good_data(hass, server):
+    _, coordinator = await async_setup_entry(hass, server)
+    status = coordinator.data[SECTION_SERVER]
+    assert get_server_state(hass, "status", server).state != STATE_UNAVAILABLE
+
+    server.failures["status"] = 500
+    coordinator.mark_sections_due(SECTION_SERVER, SECTION_NODES)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.last_update_success
+    assert coordinator.data[SECTION_SERVER] is status
+    assert not coordinator.is_section_available(SECTION_SERVER)
+    assert isinstance(coordinator.section_states[SECTION_SERVER].last_exception, TdarrResponseError)
+    assert coordinator.is_section_available(SECTION_NODES)
+    assert get_server_state(hass, "status", server).state == STATE_UNAVAILABLE
+    # The snapshot keeps the last good data rather than the error
+    assert coordinator._get_snapshot()["sections"][SECTION_SERVER]["data"] == status
+
+    del server.failures["status"]
+    coordinator.mark_sections_due(SECTION_SERVER)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.is_section_available(SECTION_SERVER)
+    assert get_server_state(hass, "status", server).state != STATE_UNAVAILABLE
+
+
+async def test_error_response_after_retries_is_raised(hass, server):
+    _, coordinator = await async_setup_entry(hass, server)
+    server.failures["get-nodes"] = 503
+
+    with pytest.raises(TdarrResponseError) as error:
+        await coordinator.tdarr.async_get_nodes(join=False)
+
+    assert "503" in str(error.value)
+    # The first attempt and each retry
+    assert server.requests["get-nodes"] == 1 + 3
+
+
+async def test_stale_attribute_cleared_when_refreshed_data_is_unchanged(hass, server):
+    _, coordinator = await async_setup_entry(hass, server)
+
+    # Libraries loaded from the snapshot are shown as stale when anything else updates first
+    coordinator.section_states[SECTION_LIBRARIES].from_snapshot = True
+    coordinator.async_set_section_data(SECTION_NODES, coordinator.get_raw_section_data(SECTION_NODES))
+    await hass.async_block_till_done()
+    assert get_library_state(hass, "library0", server).attributes.get("stale")
+
+    # The server has the same library data as the snapshot
+    coordinator.mark_sections_due(SECTION_LIBRARIES)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert not coordinator.section_states[SECTION_LIBRARIES].from_snapshot
+    assert "stale" not in get_library_state(hass, "library0", server).attributes
+
+
+async def test_listeners_only_notified_of_changes_to_their_section_or_item(hass, server):
+    _, coordinator = await async_setup_entry(hass, server)
+    notified = []
+    for context in [None, (SECTION_SERVER,), (SECTION_NODES,), (SECTION_NODES, "Node 0"), (SECTION_NODES, "Node 1")]:
+        coordinator.async_add_listener(lambda context=context: notified.append(context), context)
+    nodes = coordinator.data[SECTION_NODES]
+
+    coordinator.async_set_section_data(SECTION_NODES, { **nodes, "Node 1": { **nodes["Node 1"], "nodePaused": True } })
+    assert sorted(notified, key=str) == sorted([None, (SECTION_NODES,), (SECTION_NODES, "Node 1")], key=str)
+
+    # Unchanged data only notifies listeners without a context
+    notified.clear()
+    coordinator.async_set_section_data(SECTION_NODES, dict(coordinator.data[SECTION_NODES]))
+    assert notified == [None]
+
+    # A section becoming unavailable notifies every listener of the section
+    notified.clear()
+    server.failures["get-nodes"] = 500
+    coordinator.mark_sections_due(SECTION_NODES)
+    await coordinator.async_refresh()
+    assert (SECTION_NODES, "Node 0") in notified
+    assert (SECTION_SERVER,) not in notified
+
+
+async def test_node_entities_added_and_retired_without_reloading(hass, server):
+    entry, coordinator = await async_setup_entry(hass, server, { NODE_RETIRE_DELAY: 1 })
+    registry = er.async_get(hass)
+    node_unique_id = f"{server.host}-node-Node 2-paused"
+    assert registry.async_get_entity_id("switch", DOMAIN, node_unique_id) is None
+
+    server.nodes["node2id"] = { **server.nodes["node0id"], "_id": "node2id", "nodeName": "Node 2", "workers": {} }
+    coordinator.mark_sections_due(SECTION_NODES)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    entity_id = registry.async_get_entity_id("switch", DOMAIN, node_unique_id)
+    assert entity_id is not None
+    assert hass.states.get(entity_id).state == "off"
+    assert dr.async_get(hass).async_get_device(identifiers={(DOMAIN, server.host, "node", "Node 2")}) is not None
+
+    # Nodes which disconnect are kept until they have been missing for the retire delay
+    del server.nodes["node2id"]
+    coordinator.mark_sections_due(SECTION_NODES)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert registry.async_get(entity_id) is not None
+
+    coordinator._node_missing_since["Node 2"] -= 60
+    coordinator.mark_sections_due(SECTION_NODES)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert registry.async_get(entity_id) is None
+    assert dr.async_get(hass).async_get_device(identifiers={(DOMAIN, server.host, "node", "Node 2")}) is None
+    assert hass.data[DOMAIN][entry.entry_id][COORDINATOR] is coordinator
+
+
+async def test_entities_created_for_items_first_seen_after_warm_start(hass, server):
+    entry, coordinator = await async_setup_entry(hass, server)
+    await coordinator._snapshot_store.async_save(coordinator._get_snapshot())
+    await hass.config_entries.async_unload(entry.entry_id)
+    server.nodes["node2id"] = { **server.nodes["node0id"], "_id": "node2id", "nodeName": "Node 2", "workers": {} }
+
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    assert not coordinator.section_states[SECTION_NODES].from_snapshot
+    assert er.async_get(hass).async_get_entity_id("switch", DOMAIN, f"{server.host}-node-Node 2-paused") is not None
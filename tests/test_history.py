@@ -0,0 +1,153 @@
+"""Tests of the rolling history of farm progress and the rates calculated from it."""
+from typing import Dict
+
+import pytest
+
+from custom_components.tdarr.const import (
+    SECTION_COUNTS,
+    SECTION_NODES,
+    SECTION_STATS,
+)
+from custom_components.tdarr.history import (
+    HISTORY_INTERVAL,
+    TdarrHistory,
+    TdarrRates,
+    get_drain_hours,
+)
+
+MINUTE = 60
+
+
+def get_data(node_files: Dict[str, str], transcodes: int = 0, health_checks: int = 0, space_saved_gb: float = 0, queue: int = 0) -> dict:
+    """Get coordinator data with a single transcode worker on each node, processing the given file."""
+    return {
+        SECTION_NODES: {
+            node_key: { "workers": { f"{node_key}-worker": { "workerType": "transcodecpu", "file": file } } }
+            for node_key, file in node_files.items()
+        },
+        SECTION_COUNTS: {
+            "transcode_success": transcodes,
+            "transcode_error": 0,
+            "healthcheck_success": health_checks,
+            "healthcheck_error": 0,
+            "transcode_queue": queue,
+            "healthcheck_queue": 0,
+        },
+        SECTION_STATS: { "sizeDiff": space_saved_gb },
+    }
+
+
+def test_rates_unknown_until_min_span():
+    history = TdarrHistory()
+    for minute in range(5):
+        history.record(get_data({}, transcodes=minute, queue=10), minute * MINUTE)
+
+    assert history.rates.transcodes_per_hour is None
+    assert history.rates.transcode_queue_hours is None
+
+    history.record(get_data({}, transcodes=5), 5 * MINUTE)
+    assert history.rates.transcodes_per_hour == pytest.approx(60)
+
+
+def test_farm_rates():
+    history = TdarrHistory()
+    for minute in range(90):
+        history.record(get_data({}, transcodes=2 * minute, health_checks=5 * minute, space_saved_gb=0.1 * minute, queue=30), minute * MINUTE)
+
+    assert history.rates.transcodes_per_hour == pytest.approx(120)
+    assert history.rates.health_checks_per_hour == pytest.approx(300)
+    assert history.rates.space_saved_gb_per_hour == pytest.approx(6)
+    assert history.rates.transcode_queue_hours == pytest.approx(0.25)
+    assert history.rates.health_check_queue_hours == 0
+    # Only the window is used
+    assert history.rates.span == 60 * MINUTE
+
+
+def test_farm_rates_ignore_counts_going_down():
+    history = TdarrHistory()
+    transcodes = 0
+    for minute in range(60):
+        # The success table is cleared half way through
+        transcodes = 0 if minute == 30 else transcodes + 1
+        history.record(get_data({}, transcodes=transcodes), minute * MINUTE)
+
+    assert history.rates.transcodes_per_hour == pytest.approx(58 / 59 * 60)
+
+
+def test_frequent_updates_keep_window_covered():
+    history = TdarrHistory()
+    for minute in range(90):
+        # Pushed updates every second, with a new file every 3 minutes
+        for second in range(MINUTE):
+            history.record(get_data({ "node": f"file{minute // 3}" }, transcodes=minute), minute * MINUTE + second)
+
+    assert len(history) <= 90 * MINUTE / HISTORY_INTERVAL
+    assert history.rates.span >= 59 * MINUTE
+    assert history.rates.transcodes_per_hour == pytest.approx(60, rel=0.05)
+    # Jobs which finish between snapshots are still counted
+    assert history.node_rates["node"].transcodes_per_hour == pytest.approx(20, rel=0.05)
+
+
+def test_node_rates_count_worker_turnover():
+    history = TdarrHistory()
+    for minute in range(30):
+        # A new file every 3 minutes
+        history.record(get_data({ "node": f"file{minute // 3}" }), minute * MINUTE)
+
+    assert history.node_rates["node"].transcodes_per_hour == pytest.approx(9 / 29 * 60)
+    assert history.node_rates["node"].health_checks_per_hour == 0
+
+
+def test_node_rates_not_updated_without_new_node_data():
+    history = TdarrHistory(min_span=0)
+    history.record(get_data({ "node": "file0" }), 0)
+    history.record(get_data({ "node": "file1" }), MINUTE)
+    history.record(get_data({ "node": "file2" }), 2 * MINUTE, nodes_updated=False)
+
+    assert history.node_rates["node"].transcodes_per_hour == pytest.approx(30)
+
+
+def test_node_rates_continue_after_node_reconnects():
+    history = TdarrHistory()
+    minute = 0
+    for minute in range(100):
+        history.record(get_data({ "node": f"file{minute}" }), minute * MINUTE)
+    minute += 1
+    history.record(get_data({}), minute * MINUTE)
+    assert "node" not in history.node_rates
+    for minute in range(minute + 1, minute + 4):
+        history.record(get_data({ "node": f"file{minute}" }), minute * MINUTE)
+
+    rate = history.node_rates["node"].transcodes_per_hour
+    # Jobs interrupted by the disconnection are not counted
+    assert 50 < rate <= 60
+
+
+def test_node_counts_forgotten_once_out_of_history():
+    history = TdarrHistory(size=5, min_span=0)
+    for minute in range(10):
+        history.record(get_data({ "node": f"file{minute}" }), minute * MINUTE)
+    for minute in range(10, 15):
+        history.record(get_data({}), minute * MINUTE)
+    assert history._node_jobs == {}
+
+    for minute in range(15, 18):
+        history.record(get_data({ "node": f"file{minute}" }), minute * MINUTE)
+
+    # Counting restarts from the reconnection
+    assert history.node_rates["node"].transcodes_per_hour == pytest.approx(60)
+
+
+@pytest.mark.parametrize(("queue", "per_hour", "hours"), [
+    (None, 10, None),
+    (0, None, 0),
+    (10, None, None),
+    (10, 0, None),
+    (10, 20, 0.5),
+])
+def test_drain_hours(queue, per_hour, hours):
+    assert get_drain_hours(queue, per_hour) == hours
+
+
+def test_empty_rates():
+    assert TdarrRates().as_dict()["transcode_queue_hours"] is None
@@ -0,0 +1,148 @@
+"""Tests of receiving pushed updates from the Engine.IO endpoint of the fake Tdarr server."""
+import asyncio
+from typing import Any, Callable, List, Tuple
+
+import aiohttp
+import pytest
+
+from benchmarks.ha import async_setup_entry
+from custom_components.tdarr import push
+from custom_components.tdarr.const import (
+    PUSH_UPDATES,
+    SECTION_NODES,
+    UPDATE_INTERVAL_DEFAULT,
+)
+from custom_components.tdarr.push import (
+    TdarrPushClient,
+    TdarrPushError,
+    apply_node_update,
+)
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def reconnect_immediately(monkeypatch):
+    monkeypatch.setattr(push, "RECONNECT_DELAY_MIN", 0)
+
+
+@pytest.fixture
+async def push_client(server):
+    """Push client connected to the fake server, with the events and connection changes it reports."""
+    events: List[Tuple[str, Any]] = []
+    connection_changes: List[bool] = []
+    async with aiohttp.ClientSession(base_url=server.base_url) as session:
+        client = TdarrPushClient(
+            server.base_url,
+            session,
+            lambda event, payload: events.append((event, payload)),
+            connection_changes.append)
+        task = asyncio.create_task(client.async_run())
+        try:
+            yield client, events, connection_changes
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+
+async def test_handshake(server, push_client):
+    client, _, connection_changes = push_client
+    await wait_for(lambda: client.connected)
+
+    assert connection_changes == [True]
+    assert server.socket_count == 1
+
+
+async def test_ping_answered_with_pong(server, push_client):
+    server.ping_interval = 0.01
+    client, _, _ = push_client
+    await wait_for(lambda: server.pongs >= 3)
+
+    assert client.connected
+
+
+async def test_event_applied_to_node_data(server, push_client):
+    client, events, _ = push_client
+    await wait_for(lambda: client.connected)
+
+    await server.async_emit("node", { "_id": "node1id", "nodePaused": True })
+    await wait_for(lambda: events)
+
+    nodes = { node["nodeName"]: node for node in server.nodes.values() }
+    event, payload = events[0]
+    updated = apply_node_update(nodes, payload)
+    assert event == "node"
+    assert updated["Node 1"]["nodePaused"] is True
+    assert updated["Node 1"]["workers"] == nodes["Node 1"]["workers"]
+    assert updated["Node 0"] is nodes["Node 0"]
+    # The previous data is left untouched
+    assert nodes["Node 1"]["nodePaused"] is False
+
+    # A partial update for a node which has not been polled would add a node without a name or workers
+    with pytest.raises(TdarrPushError):
+        apply_node_update(nodes, { "_id": "node2id", "nodePaused": True })
+
+
+async def test_full_node_event_replaces_node_data(server):
+    updated = apply_node_update({ "Old node": {} }, server.nodes)
+    assert list(updated) == ["Node 0", "Node 1"]
+
+    with pytest.raises(TdarrPushError):
+        apply_node_update(updated, ["unexpected"])
+
+
+async def test_reconnects_after_server_closes_connection(server, push_client):
+    client, events, connection_changes = push_client
+    await wait_for(lambda: client.connected)
+
+    await server.async_close_sockets()
+    await wait_for(lambda: len(connection_changes) == 3)
+    assert connection_changes == [True, False, True]
+
+    # Events are received on the new connection
+    await server.async_emit("nodes", server.nodes)
+    await wait_for(lambda: events)
+    assert events[0][0] == "nodes"
+
+
+async def test_reconnects_after_rejected_upgrade(server, push_client):
+    server.failures["socket.io"] = 503
+    client, _, connection_changes = push_client
+    await wait_for(lambda: server.requests["socket.io"] >= 2)
+    assert not client.connected
+
+    del server.failures["socket.io"]
+    await wait_for(lambda: client.connected)
+    assert connection_changes == [True]
+
+
+async def test_coordinator_applies_pushed_nodes(hass, server):
+    _, coordinator = await async_setup_entry(hass, server, { PUSH_UPDATES: True })
+    await wait_for(lambda: coordinator._push_client.connected)
+    requests = server.requests["get-nodes"]
+
+    await server.async_emit("node", { "_id": "node0id", "nodePaused": True })
+    await wait_for(lambda: coordinator.data[SECTION_NODES]["Node 0"]["nodePaused"])
+    assert server.requests["get-nodes"] == requests
+
+    # Events may have been missed while disconnected, so nodes are due on the next refresh once the connection drops
+    await server.async_close_sockets()
+    await wait_for(lambda: SECTION_NODES not in coordinator._section_last_refresh)
+    await coordinator.async_refresh()
+    assert server.requests["get-nodes"] == requests + 1
+    assert coordinator.data[SECTION_NODES]["Node 0"]["nodePaused"] is False
+
+
+async def test_coordinator_polls_while_push_connected(hass, server):
+    _, coordinator = await async_setup_entry(hass, server, { PUSH_UPDATES: True })
+    await wait_for(lambda: coordinator._push_client.connected)
+    assert coordinator.get_section_interval(SECTION_NODES) == UPDATE_INTERVAL_DEFAULT
+
+    await server.async_emit("node", { "_id": "node0id", "nodePaused": True })
+    await wait_for(lambda: coordinator.data[SECTION_NODES]["Node 0"]["nodePaused"])
+    assert coordinator.get_section_interval(SECTION_NODES) == UPDATE_INTERVAL_DEFAULT
@@ -0,0 +1,90 @@
+"""Tests of retrying requests and of the circuit breaker."""
+import pytest
+
+from custom_components.tdarr.const import SECTION_LIBRARIES
+from custom_components.tdarr.coordinator import SECTION_TIMEOUT, SECTION_TIMEOUTS
+from custom_components.tdarr.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    REQUEST_LIBRARY_PIES,
+    REQUEST_LIBRARY_SETTINGS,
+    RETRY_POLICIES,
+    TdarrCircuitBreaker,
+    TdarrCircuitOpenError,
+    get_retry_policy,
+)
+
+
+@pytest.mark.parametrize("request_name", [None, *RETRY_POLICIES])
+def test_retries_finish_within_section_timeout(request_name):
+    assert get_retry_policy(request_name).max_duration < SECTION_TIMEOUT
+
+
+def test_library_retries_finish_within_libraries_timeout():
+    # Pies are only requested once the library settings have been retrieved
+    settings = get_retry_policy(REQUEST_LIBRARY_SETTINGS)
+    pies = get_retry_policy(REQUEST_LIBRARY_PIES)
+    assert settings.max_duration + pies.max_duration < SECTION_TIMEOUTS[SECTION_LIBRARIES]
+
+
+def get_tripped_breaker() -> TdarrCircuitBreaker:
+    """Get a breaker which has opened and is ready to test the server."""
+    breaker = TdarrCircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = TdarrCircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+
+    with pytest.raises(TdarrCircuitOpenError):
+        breaker.check()
+    assert breaker.rejected == 1
+    assert breaker.trips == 1
+
+
+def test_half_open_admits_single_probe():
+    breaker = get_tripped_breaker()
+
+    breaker.check()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    # Other requests are rejected until the probe completes
+    for _ in range(3):
+        with pytest.raises(TdarrCircuitOpenError):
+            breaker.check()
+    assert breaker.rejected == 3
+
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.check()
+
+
+def test_failed_probe_reopens_with_longer_timeout():
+    breaker = get_tripped_breaker()
+    breaker.base_reset_timeout = breaker.reset_timeout = 10
+
+    breaker.opened_at -= 10
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.reset_timeout == 20
+    with pytest.raises(TdarrCircuitOpenError):
+        breaker.check()
+
+
+def test_cancelled_probe_lets_next_request_test_server():
+    breaker = get_tripped_breaker()
+    breaker.check()
+
+    breaker.record_cancelled()
+
+    assert breaker.state == CIRCUIT_OPEN
+    breaker.check()
+    assert breaker.state == CIRCUIT_HALF_OPEN
@@ -0,0 +1,35 @@
+"""Tests of the services registered by the integration."""
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+
+from benchmarks.ha import async_setup_entry
+from custom_components.tdarr.const import DOMAIN
+
+
+async def async_get_queue(hass, **data) -> dict:
+    return await hass.services.async_call(DOMAIN, "get_queue", data, blocking=True, return_response=True)
+
+
+async def test_get_queue_single_field(hass, server):
+    await async_setup_entry(hass, server)
+
+    response = await async_get_queue(hass, table="transcode_queue", limit=3, fields="file")
+
+    assert response["items"] == [{ "file": item["file"] } for item in server.tables["table1"][:3]]
+
+
+async def test_get_queue_filtered(hass, server):
+    await async_setup_entry(hass, server)
+
+    response = await async_get_queue(hass, table="transcode_queue", filters={ "DB": "library1" }, fields=["file", "DB"])
+
+    assert response["items"]
+    assert all(item["DB"] == "library1" for item in response["items"])
+
+
+async def test_get_queue_rejects_filters_which_are_not_a_mapping(hass, server):
+    await async_setup_entry(hass, server)
+
+    with pytest.raises(HomeAssistantError):
+        await async_get_queue(hass, table="transcode_queue", filters="library1")
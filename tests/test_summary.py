@@ -0,0 +1,36 @@
+"""Tests of the values derived from node data."""
+import pytest
+
+from custom_components.tdarr.summary import (
+    SUMMARY_KEY,
+    summarise_node,
+    summarise_nodes,
+)
+
+
+def get_node(used_gb, total_gb) -> dict:
+    return {
+        "workers": { "worker": { "workerType": "transcodecpu", "fps": 50 } },
+        "resStats": { "os": { "memUsedGB": used_gb, "memTotalGB": total_gb } },
+    }
+
+
+def test_memory_percent():
+    assert summarise_node(get_node("4.0", "16.0")).memory_percent == pytest.approx(25)
+
+
+@pytest.mark.parametrize(("used_gb", "total_gb"), [
+    ("4.0", "0"),
+    ("4.0", "unknown"),
+    (None, "16.0"),
+    ("4.0", None),
+])
+def test_memory_percent_unknown_for_unusable_values(used_gb, total_gb):
+    assert summarise_node(get_node(used_gb, total_gb)).memory_percent is None
+
+
+def test_unusable_memory_does_not_stop_other_nodes_being_summarised():
+    nodes, farm = summarise_nodes({ "node0": get_node("4.0", "0"), "node1": get_node("4.0", "16.0") })
+
+    assert nodes["node1"][SUMMARY_KEY].memory_percent == pytest.approx(25)
+    assert farm.workers["transcodecpu"] == 2
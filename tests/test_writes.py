@@ -0,0 +1,80 @@
+"""Tests of queueing, coalescing and sending setting changes."""
+import asyncio
+from typing import Any, Dict, List
+
+from custom_components.tdarr.const import SECTION_GLOBAL_SETTINGS
+from custom_components.tdarr.writes import TdarrWriteQueue
+
+GLOBAL_SETTINGS = ("globalsettings",)
+
+
+class FakeClient(object):
+    """Client which records the global settings sent"""
+
+    def __init__(self):
+        self.global_settings: List[Dict[str, Any]] = []
+
+    async def async_set_global_settings(self, settings: Dict[str, Any]) -> None:
+        self.global_settings.append(settings)
+
+
+def fire_timer(queue: TdarrWriteQueue, batch_key: tuple) -> None:
+    """Start flushing a batch as its timer would, without giving the flush a chance to run."""
+    queue._batches[batch_key].timer.cancel()
+    queue._start_flush(batch_key)
+
+
+async def test_changes_coalesced_into_one_request():
+    client = FakeClient()
+    queue = TdarrWriteQueue(client, delay=0.01)
+
+    await asyncio.gather(
+        queue.async_set_global_setting("a", 1),
+        queue.async_set_global_setting("a", 2),
+        queue.async_set_global_setting("b", 3))
+
+    assert client.global_settings == [{ "a": 2, "b": 3 }]
+
+
+async def test_pending_change_applied_until_written_before_fetch():
+    queue = TdarrWriteQueue(FakeClient(), delay=0.01)
+    write = queue.async_set_global_setting("a", 2, data_key="dataA")
+    assert queue.apply_pending(SECTION_GLOBAL_SETTINGS, { "dataA": 1 }, 0) == { "dataA": 2 }
+
+    await write
+
+    assert queue.apply_pending(SECTION_GLOBAL_SETTINGS, { "dataA": 1 }, 0) == { "dataA": 2 }
+    assert queue.apply_pending(SECTION_GLOBAL_SETTINGS, { "dataA": 2 }, float("inf")) == { "dataA": 2 }
+    assert queue.pending_count == 0
+
+
+async def test_change_queued_after_timer_fired_sent_once():
+    client = FakeClient()
+    queue = TdarrWriteQueue(client, delay=0.01)
+    first = queue.async_set_global_setting("a", 1)
+    batch = queue._batches[GLOBAL_SETTINGS]
+
+    fire_timer(queue, GLOBAL_SETTINGS)
+    # Queued before the flush has started, so added to the same batch with a new timer
+    second = queue.async_set_global_setting("b", 2)
+    await asyncio.gather(first, second)
+    await asyncio.sleep(0.05)
+
+    assert client.global_settings == [{ "a": 1, "b": 2 }]
+    assert batch.timer.cancelled()
+    # A flush of a batch which has already been sent does nothing
+    await queue._async_flush(GLOBAL_SETTINGS)
+
+
+async def test_flush_on_unload_after_timer_fired():
+    client = FakeClient()
+    queue = TdarrWriteQueue(client, delay=0.01)
+    write = queue.async_set_global_setting("a", 1)
+    fire_timer(queue, GLOBAL_SETTINGS)
+    (task,) = queue._flush_tasks
+
+    await queue.async_flush()
+    await write
+
+    assert task.done() and task.exception() is None
+    assert client.global_settings == [{ "a": 1 }]